@@ -0,0 +1,256 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2018 Nokia
+"""
+Runner based on asyncio event loop (Python 3 only).
+
+Single event loop (in single thread) supervises all running connection-observers:
+awaits their completion and enforces their timeouts.
+Connection-observers may be awaited from synchronous code (await_done())
+as well as from coroutines (await connection_observer).
+"""
+
+__author__ = 'Grzegorz Latuszek'
+__copyright__ = 'Copyright (C) 2018, Nokia'
+__email__ = 'grzegorz.latuszek@nokia.com'
+
+import asyncio
+import functools
+import logging
+import threading
+import time
+from concurrent.futures import Future, wait
+
+from moler.exceptions import NoResultSinceCancelCalled
+from moler.exceptions import WrongUsage
+from moler.runner import ConnectionObserverRunner
+from moler.runner import _runs_till_cancelled
+from moler.runner import _timeout_exception
+
+
+async def wait_for_observer_future(connection_observer, connection_observer_future, timeout=None):
+    """
+    Coroutine awaiting for connection_observer running in background (by any runner) or timeout.
+
+    :param connection_observer: The one we are awaiting for.
+    :param connection_observer_future: concurrent.futures.Future of connection-observer returned from submit().
+    :param timeout: Max time (in float seconds) you want to await before you give up. If None then taken from connection_observer
+    :return: result of connection_observer
+    """
+    if connection_observer.done():
+        return connection_observer.result()
+    observer_done = asyncio.wrap_future(connection_observer_future)
+    start_time = time.time()
+    check_timeout_from_observer = not timeout
+    if check_timeout_from_observer:
+        timeout = connection_observer.timeout
+    remain_time = timeout
+    while remain_time > 0.0:
+        try:
+            # shield - timeout of single wait must not cancel future of connection_observer
+            return await asyncio.wait_for(asyncio.shield(observer_done), timeout=remain_time)
+        except asyncio.TimeoutError:
+            pass
+        if check_timeout_from_observer:
+            timeout = connection_observer.timeout  # may be extended meanwhile
+        remain_time = timeout - (time.time() - start_time)
+    passed = time.time() - start_time
+    connection_observer.cancel()
+    connection_observer.on_timeout()
+    raise _timeout_exception(connection_observer, timeout, passed)
+
+
+class AsyncioRunner(ConnectionObserverRunner):
+    def __init__(self, loop=None):
+        """
+        Create instance of AsyncioRunner class
+
+        :param loop: event loop to run in; if not given then runner creates its own loop
+                     running inside runner's own (single) thread
+        """
+        self._in_shutdown = False
+        self._futures = {}  # connection_observer --> its future
+        self._futures_lock = threading.Lock()
+        self._feedings = set()  # tasks of feed(); used only inside event loop
+        self.logger = logging.getLogger('moler.runner.asyncio')
+        self._loop_thread = None
+        if loop is None:
+            loop = asyncio.new_event_loop()
+            self._loop_thread = threading.Thread(target=self._run_loop, args=(loop,),
+                                                 name="moler-asyncio-runner")
+            self._loop_thread.daemon = True
+            self._loop_thread.start()
+            self.logger.debug("created own loop {!r}".format(loop))
+        else:
+            self.logger.debug("reusing provided loop {!r}".format(loop))
+        self._loop = loop
+        self.logger.debug("created")
+
+    @staticmethod
+    def _run_loop(loop):
+        asyncio.set_event_loop(loop)
+        loop.run_forever()
+
+    def shutdown(self):
+        self.logger.debug("shutting down")
+        self._in_shutdown = True
+        with self._futures_lock:
+            running_observers = list(self._futures.keys())
+        for connection_observer in running_observers:
+            self.logger.debug("shutdown so cancelling {!r}".format(connection_observer))
+            connection_observer.cancel()
+        if self._loop_thread:  # stop loop since only I use it
+            finishing = asyncio.run_coroutine_threadsafe(self._finish_feedings(), loop=self._loop)
+            wait([finishing], timeout=1.0)
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop_thread.join()
+            self._loop_thread = None
+            self._loop.close()
+
+    async def _finish_feedings(self):
+        feedings = list(self._feedings)
+        for feeding in feedings:
+            feeding.cancel()
+        await asyncio.gather(*feedings, return_exceptions=True)
+
+    def submit(self, connection_observer):
+        """
+        Submit connection observer to background execution.
+        Returns Future that could be used to await for connection_observer done.
+        """
+        self.logger.debug("go background: {!r}".format(connection_observer))
+        # subscription for data must be done early (before feeding coroutine starts)
+        # since connection may get some data even before event loop gains control
+        self.logger.debug("subscribing for data {!r}".format(connection_observer))
+        connection_observer.subscribe_for_data()
+        connection_observer_future = Future()
+        connection_observer_future.set_running_or_notify_cancel()
+        with self._futures_lock:
+            self._futures[connection_observer] = connection_observer_future
+        self._loop.call_soon_threadsafe(self._start_feeding, connection_observer, connection_observer_future)
+        return connection_observer_future
+
+    def _start_feeding(self, connection_observer, connection_observer_future):
+        feeding = self._loop.create_task(self.feed(connection_observer))
+        self._feedings.add(feeding)
+        feeding.add_done_callback(functools.partial(self._feeding_done,
+                                                    connection_observer=connection_observer,
+                                                    connection_observer_future=connection_observer_future))
+
+    def _feeding_done(self, feeding, connection_observer, connection_observer_future):
+        self._feedings.discard(feeding)
+        with self._futures_lock:
+            self._futures.pop(connection_observer, None)
+        if feeding.cancelled():
+            connection_observer_future.set_exception(NoResultSinceCancelCalled(connection_observer))
+        elif feeding.exception() is not None:
+            connection_observer_future.set_exception(feeding.exception())
+        else:
+            connection_observer_future.set_result(feeding.result())
+
+    def wait_for(self, connection_observer, connection_observer_future, timeout=None):
+        """
+        Await for connection_observer running in background or timeout.
+
+        :param connection_observer: The one we are awaiting for.
+        :param connection_observer_future: Future of connection-observer returned from submit().
+        :param timeout: Max time (in float seconds) you want to await before you give up. If None then taken from connection_observer
+        :return:
+        """
+        if self._in_loop_thread():
+            raise WrongUsage("Can't block event loop of {} - use 'await {}' instead".format(self, connection_observer))
+        self.logger.debug("go foreground: {!r} - await max. {} [sec]".format(connection_observer, timeout))
+        start_time = time.time()
+        check_timeout_from_observer = not timeout
+        if check_timeout_from_observer:
+            timeout = connection_observer.timeout
+        remain_time = timeout
+        while remain_time > 0.0:
+            done, not_done = wait([connection_observer_future], timeout=remain_time)
+            if connection_observer_future in done:
+                result = connection_observer_future.result()
+                self.logger.debug("{} returned {}".format(connection_observer, result))
+                return result
+            if check_timeout_from_observer:
+                timeout = connection_observer.timeout
+            remain_time = timeout - (time.time() - start_time)
+        passed = time.time() - start_time
+        self.logger.debug("timeouted {}".format(connection_observer))
+        connection_observer.cancel()
+        connection_observer.on_timeout()
+        raise _timeout_exception(connection_observer, timeout, passed)
+
+    def wait_for_iterator(self, connection_observer, connection_observer_future):
+        """
+        Version of wait_for() intended to be used by Python3 to implement awaitable object.
+
+        Timeout is enforced by feed() running inside event loop of runner.
+        """
+        if connection_observer.done():  # may be never submitted (no future)
+            return wait_for_observer_future(connection_observer, connection_observer_future).__await__()
+        return asyncio.wrap_future(connection_observer_future).__await__()
+
+    async def feed(self, connection_observer):
+        """
+        Feeds connection_observer by awaiting its completion inside event loop.
+        Data is pushed into connection_observer by its connection (subscription done in submit()).
+        Coroutine enforces timeout of connection_observer (also for ones never awaited)
+        except permanent events running till cancelled.
+        """
+        observer_done = self._loop.create_future()
+
+        def on_observer_done(observer):  # may be called from any thread
+            try:
+                self._loop.call_soon_threadsafe(self._set_done, observer_done)
+            except RuntimeError:  # loop already closed
+                pass
+
+        connection_observer.add_done_callback(on_observer_done)
+        if self._in_shutdown:
+            self.logger.debug("shutdown so cancelling {!r}".format(connection_observer))
+            connection_observer.cancel()
+        start_time = time.time()
+        remain_time = connection_observer.timeout
+        try:
+            if _runs_till_cancelled(connection_observer):
+                await asyncio.shield(observer_done)
+            while (remain_time > 0.0) and not observer_done.done():
+                try:
+                    await asyncio.wait_for(asyncio.shield(observer_done), timeout=remain_time)
+                except asyncio.TimeoutError:
+                    pass
+                remain_time = connection_observer.timeout - (time.time() - start_time)  # may be extended meanwhile
+        except asyncio.CancelledError:
+            self.logger.debug("feeding cancelled so cancelling {!r}".format(connection_observer))
+            connection_observer.cancel()
+            raise
+        finally:
+            self.logger.debug("done & unsubscribing {!r}".format(connection_observer))
+            connection_observer.unsubscribe_from_data()
+        if not connection_observer.done():
+            passed = time.time() - start_time
+            self.logger.debug("timeouted {}".format(connection_observer))
+            connection_observer.cancel()
+            connection_observer.on_timeout()
+            raise _timeout_exception(connection_observer, connection_observer.timeout, passed)
+        self.logger.debug("returning result {}".format(connection_observer))
+        return connection_observer.result()
+
+    @staticmethod
+    def _set_done(observer_done):
+        if not observer_done.done():
+            observer_done.set_result(True)
+
+    def _in_loop_thread(self):
+        try:
+            if hasattr(asyncio, 'get_running_loop'):
+                running_loop = asyncio.get_running_loop()
+            elif self._loop.is_running():  # Python 3.6 - get_event_loop() gives running loop inside its callbacks
+                running_loop = asyncio.get_event_loop()
+            else:
+                return False
+        except RuntimeError:  # no event loop in this thread
+            return False
+        return running_loop is self._loop
+
+    def timeout_change(self, timedelta):
+        pass
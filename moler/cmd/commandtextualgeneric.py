@@ -14,6 +14,7 @@ import six
 
 from moler.cmd import RegexHelper
 from moler.command import Command
+from moler.helpers import overrides_any_method
 
 
 class CommandTextualGeneric(Command):
@@ -36,6 +37,7 @@ class CommandTextualGeneric(Command):
         self.ret_required = True  # # Set False for commands not returning parsed result
         self.break_on_timeout = True  # If True then Ctrl+c on timeout
         self._last_not_full_line = None  # Part of line
+        self._lines_subscribed = False  # True if connection delivers data already split into lines
         self._re_prompt = CommandTextualGeneric._calculate_prompt(prompt)  # Expected prompt on device
         self._new_line_chars = new_line_chars  # New line characters on device
         if not self._new_line_chars:
@@ -87,10 +89,49 @@ class CommandTextualGeneric(Command):
                 line = self._strip_new_lines_chars(line)
             else:
                 self._last_not_full_line = line
-            if self._cmd_output_started:
-                self.on_new_line(line, is_full_line)
-            elif is_full_line:
-                self._detect_start_of_cmd_output(line)
+            self._process_line_from_output(line, is_full_line)
+
+    def lines_received(self, lines):
+        """
+        Called by connection with received data already split into lines (shared by all lines-observers)
+        :param lines: LineRecords (line, is_full_line, continued_at)
+        :return: Nothing
+        """
+        for line, is_full_line, continued_at in lines:
+            if self._last_not_full_line is not None:  # we have seen part of that line
+                continued_at = max(continued_at - len(self._last_not_full_line), 0)
+            line = line[continued_at:]
+            if is_full_line:
+                self._last_not_full_line = None
+                line = self._strip_new_lines_chars(line)
+            else:
+                self._last_not_full_line = line
+            self._process_line_from_output(line, is_full_line)
+
+    def subscribe_for_data(self):
+        """
+        Subscribe for data of own connection.
+        If possible, data is taken split into lines by connection (splitting shared with other observers).
+        """
+        self._lines_subscribed = hasattr(self.connection, 'subscribe_lines') and not overrides_any_method(
+            self, CommandTextualGeneric, ['data_received', 'has_endline_char'])
+        if self._lines_subscribed:
+            self.connection.subscribe_lines(self.lines_received, new_line_chars=self._new_line_chars)
+        else:
+            super(CommandTextualGeneric, self).subscribe_for_data()
+
+    def unsubscribe_from_data(self):
+        """Unsubscribe from data of own connection (reverts subscribe_for_data())."""
+        if self._lines_subscribed:
+            self.connection.unsubscribe_lines(self.lines_received)
+        else:
+            super(CommandTextualGeneric, self).unsubscribe_from_data()
+
+    def _process_line_from_output(self, line, is_full_line):
+        if self._cmd_output_started:
+            self.on_new_line(line, is_full_line)
+        elif is_full_line:
+            self._detect_start_of_cmd_output(line)
 
     @abc.abstractmethod
     def build_command_string(self):
@@ -13,6 +13,8 @@ from contextlib import contextmanager
 
 from . import connections as conn_cfg
 from . import devices as dev_cfg
+from . import events as event_cfg
+from . import runners as runner_cfg
 
 
 @contextmanager
@@ -58,7 +60,9 @@ def load_config(path=None, from_env_var=None, config_type='yaml'):
     config = read_yaml_configfile(path)
     # TODO: check schema
     load_connection_from_config(config)
+    load_runner_from_config(config)
     load_device_from_config(config)
+    load_event_from_config(config)
 
 
 def load_connection_from_config(config):
@@ -73,12 +77,20 @@ def load_connection_from_config(config):
                 conn_cfg.set_default_variant(io_type, variant)
 
 
+def load_runner_from_config(config):
+    if 'RUNNERS' in config:
+        if 'default_variant' in config['RUNNERS']:
+            runner_cfg.set_default_variant(config['RUNNERS']['default_variant'])
+
+
 def load_device_from_config(config):
     if 'DEVICES' in config:
         if 'DEFAULT_CONNECTION' in config['DEVICES']:
             default_conn = config['DEVICES'].pop('DEFAULT_CONNECTION')
             conn_desc = default_conn['CONNECTION_DESC']
             dev_cfg.set_default_connection(**conn_desc)
+        if 'OBSERVERS_INDEX' in config['DEVICES']:
+            dev_cfg.set_observers_index_file(config['DEVICES'].pop('OBSERVERS_INDEX'))
 
         for device_name in config['DEVICES']:
             device_def = config['DEVICES'][device_name]
@@ -90,7 +102,17 @@ def load_device_from_config(config):
             )
 
 
+def load_event_from_config(config):
+    if 'EVENTS' in config:
+        if 'OCCURRENCES_HISTORY' in config['EVENTS']:
+            history = config['EVENTS']['OCCURRENCES_HISTORY']
+            event_cfg.set_occurrences_history(size=history.get('size', event_cfg.default_history_size),
+                                              compact=history.get('compact', False))
+
+
 def clear():
     """Cleanup Moler's configuration"""
     conn_cfg.clear()
+    runner_cfg.clear()
     dev_cfg.clear()
+    event_cfg.clear()
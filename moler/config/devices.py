@@ -8,6 +8,7 @@ __email__ = 'grzegorz.latuszek@nokia.com, marcin.usielski@nokia.com, michal.erns
 
 named_devices = dict()
 default_connection = {"io_type": "terminal", "variant": "threaded"}
+observers_index_file = None  # where registry of commands/events is persisted (None - not persisted)
 
 
 def set_default_connection(io_type, variant):
@@ -21,8 +22,30 @@ def define_device(name, device_class, connection_desc, connection_hops):
     named_devices[name] = (device_class, connection_desc, connection_hops)
 
 
+def set_observers_index_file(path):
+    """
+    Set file persisting registry of commands/events found in packages used by devices.
+    Next processes read it instead of importing and inspecting all modules of these packages.
+    Registry collected so far is forgotten (next devices use the new index file).
+
+    :param path: location of index file (None - don't persist registry)
+    """
+    global observers_index_file
+    observers_index_file = path
+    _clear_observers_registry()
+
+
 def clear():
     """Cleanup configuration related to devices"""
     global default_connection
+    global observers_index_file
     default_connection = {"io_type": "terminal", "variant": "threaded"}
+    observers_index_file = None
     named_devices.clear()
+    _clear_observers_registry()
+
+
+def _clear_observers_registry():
+    from moler.device import observers_registry  # registry uses this configuration
+
+    observers_registry.clear()
@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+"""
+Events related configuration
+"""
+
+__author__ = 'Grzegorz Latuszek'
+__copyright__ = 'Copyright (C) 2018, Nokia'
+__email__ = 'grzegorz.latuszek@nokia.com'
+
+default_history_size = None  # keep all occurrences unless user limits history
+
+history_size = default_history_size  # occurrences kept by events without till_occurs_times limit (None - all)
+compact_occurrences = False  # store occurrences as namedtuples instead of dicts
+
+
+def set_occurrences_history(size, compact=False):
+    """
+    Set how occurrences are kept by events started without till_occurs_times limit (like prompts observers)
+
+    :param size: number of most recent occurrences to keep (None - keep all)
+    :param compact: store occurrences as namedtuples instead of dicts
+    """
+    global history_size
+    global compact_occurrences
+    history_size = size
+    compact_occurrences = compact
+
+
+def clear():
+    """Cleanup configuration related to events"""
+    global history_size
+    global compact_occurrences
+    history_size = default_history_size
+    compact_occurrences = False
@@ -8,8 +8,12 @@ __author__ = 'Grzegorz Latuszek'
 __copyright__ = 'Copyright (C) 2018, Nokia'
 __email__ = 'grzegorz.latuszek@nokia.com'
 
+import atexit
 import os
 import logging
+import logging.handlers
+
+from six.moves.queue import Queue
 
 logging_path = os.getcwd()  # Logging path that is used as a prefix for log file paths
 active_loggers = []  # TODO: use set()      # Active loggers created by Moler
@@ -21,6 +25,8 @@ RAW_DATA = 4  # should be used for logging data of external sources, like connec
 TEST_CASE = 45
 
 debug_level = None  # means: inactive
+async_logging = False  # if True then file handlers write logs inside single background thread
+_async_log_writer = None  # listener (thread) writing queued log records
 
 
 def configure_debug_level():
@@ -40,6 +46,32 @@ def configure_debug_level():
         pass
 
 
+def configure_async_logging():
+    """
+    Configure async_logging based on environment variable MOLER_ASYNC_LOGGING
+
+    Any of values: 1, true, yes, on - activates asynchronous writing of logs into files.
+    """
+    global async_logging
+    if os.getenv('MOLER_ASYNC_LOGGING', 'off').lower() in ('1', 'true', 'yes', 'on'):
+        async_logging = True
+
+
+def set_async_logging(active=True):
+    """
+    Switch asynchronous writing of logs for file handlers set up afterwards.
+
+    When active, log records are only formatted and put into queue by thread that logs them (like IO thread
+    feeding connection-observers). Buffered writing to files is done by single background thread,
+    so slow disks (or NFS log folders) don't stall data dispatching.
+
+    :param active: True - queue records, False - write inside logging thread
+    :return: None
+    """
+    global async_logging
+    async_logging = active
+
+
 def want_debug_details():
     """Check if we want to have debug details inside logs"""
     return debug_level is not None
@@ -65,9 +97,17 @@ def setup_new_file_handler(logger_name, log_level, log_filename, formatter):
     :param log_level: logging level
     :param log_filename: path to log file
     :param formatter: formatter for file logger
-    :return:  logging.FileHandler object
+    :return:  handler added to logger (logging.FileHandler or QueuedRecordsHandler if async logging is active)
     """
     logger = logging.getLogger(logger_name)
+    if async_logging and hasattr(logging.handlers, 'QueueHandler'):  # no QueueHandler in Python 2
+        file_handler = BufferedFileHandler(log_filename, 'w')
+        file_handler.setLevel(log_level)
+        file_handler.setFormatter(logging.Formatter(fmt="%(message)s"))  # record comes formatted
+        queued_handler = QueuedRecordsHandler(target_handler=file_handler, queue=_get_async_log_writer().queue)
+        queued_handler.setFormatter(formatter)
+        logger.addHandler(queued_handler)
+        return queued_handler
     cfh = logging.FileHandler(log_filename, 'w')
     cfh.setLevel(log_level)
     cfh.setFormatter(formatter)
@@ -75,6 +115,23 @@ def setup_new_file_handler(logger_name, log_level, log_filename, formatter):
     return cfh
 
 
+def _get_async_log_writer():
+    global _async_log_writer
+    if _async_log_writer is None:
+        _async_log_writer = AsyncLogWriter(Queue())
+        _async_log_writer.start()
+        atexit.register(stop_async_log_writer)
+    return _async_log_writer
+
+
+def stop_async_log_writer():
+    """Write all queued log records, flush log files and stop background log-writing thread"""
+    global _async_log_writer
+    if _async_log_writer is not None:
+        _async_log_writer.stop()
+        _async_log_writer = None
+
+
 def _add_new_file_handler(logger_name,
                           log_file, formatter, log_level=TRACE):
     """
@@ -221,6 +278,70 @@ class TracedIn(object):
         return _traced_method
 
 
+if hasattr(logging.handlers, 'QueueHandler'):  # Python 3
+    class QueuedRecordsHandler(logging.handlers.QueueHandler):
+        """
+        Puts log records into queue of AsyncLogWriter together with handler that should write them.
+
+        Record is formatted by thread logging it (as by QueueHandler) - so, its args can't change
+        before it is written. Writing thread only writes (and flushes) files.
+        """
+        def __init__(self, target_handler, queue):
+            super(QueuedRecordsHandler, self).__init__(queue)
+            self.target_handler = target_handler
+            self.setLevel(target_handler.level)
+
+        def prepare(self, record):
+            return self.target_handler, super(QueuedRecordsHandler, self).prepare(record)
+
+        def close(self):
+            """Close also target handler (inside writing thread - after records queued so far are written)."""
+            self.enqueue((self.target_handler, None))
+            super(QueuedRecordsHandler, self).close()
+
+    class AsyncLogWriter(logging.handlers.QueueListener):
+        """
+        Single thread writing log records of all QueuedRecordsHandlers.
+
+        Target files are flushed when there is nothing more queued.
+        """
+        def __init__(self, queue):
+            super(AsyncLogWriter, self).__init__(queue)
+            self._target_handlers = set()
+
+        def dequeue(self, block):
+            if block and self.queue.empty():
+                for handler in self._target_handlers:
+                    handler.flush_buffer()
+            return super(AsyncLogWriter, self).dequeue(block)
+
+        def handle(self, handler_and_record):
+            handler, record = handler_and_record
+            if record is None:  # QueuedRecordsHandler is closed
+                self._target_handlers.discard(handler)
+                handler.close()
+                return
+            self._target_handlers.add(handler)
+            handler.handle(record)
+
+        def stop(self):
+            super(AsyncLogWriter, self).stop()
+            for handler in self._target_handlers:
+                handler.flush_buffer()
+
+
+class BufferedFileHandler(logging.FileHandler):
+    """
+    File handler that doesn't flush file after each record.
+    Owner of handler is responsible to call flush_buffer() (closing handler also flushes file).
+    """
+    def flush(self):
+        pass
+
+    def flush_buffer(self):
+        super(BufferedFileHandler, self).flush()
+
+
 class MultilineWithDirectionFormatter(logging.Formatter):
     """
     We want logs to have non-overlapping areas
@@ -271,3 +392,4 @@ logging.addLevelName(TRACE, "TRACE")
 logging.addLevelName(RAW_DATA, "RAW_DATA")
 logging.addLevelName(TEST_CASE, "TEST_CASE")
 configure_debug_level()
+configure_async_logging()
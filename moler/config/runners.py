@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+"""
+Runners related configuration
+"""
+
+__author__ = 'Grzegorz Latuszek'
+__copyright__ = 'Copyright (C) 2018, Nokia'
+__email__ = 'grzegorz.latuszek@nokia.com'
+
+default_variant = "thread-pool"
+
+
+def set_default_variant(variant):
+    """Set variant of runner to use as default by all connection-observers"""
+    global default_variant
+    default_variant = variant
+
+
+def clear():
+    """Cleanup configuration related to runners"""
+    global default_variant
+    default_variant = "thread-pool"
@@ -15,16 +15,21 @@ __author__ = 'Grzegorz Latuszek'
 __copyright__ = 'Copyright (C) 2018, Nokia'
 __email__ = 'grzegorz.latuszek@nokia.com'
 
+import codecs
 import logging
 import platform
+import re
+import time
 import weakref
+from collections import deque, namedtuple
 from quopri import decodestring
-from threading import Lock
+from threading import Condition, Lock, Thread
 
 import six
 
 import moler.config.connections as connection_cfg
 from moler.config.loggers import RAW_DATA, TRACE
+from moler.dispatcher import ObserversDispatcher
 from moler.exceptions import WrongUsage
 from moler.helpers import instance_id
 
@@ -38,16 +43,18 @@ class Connection(object):
     """Connection API required by ConnectionObservers."""
 
     def __init__(self, how2send=None, encoder=identity_transformation, decoder=identity_transformation,
-                 name=None, newline='\n', logger_name=""):
+                 name=None, newline='\n', logger_name="", runner=None):
         """
         Create Connection via registering external-IO
 
         :param how2send: any callable performing outgoing IO
         :param encoder: callable converting data to bytes
-        :param decoder: callable restoring data from bytes
+        :param decoder: callable restoring data from bytes or codecs.IncrementalDecoder (stateful one,
+                        keeps incomplete multi-byte sequence till next data; use one instance per connection)
         :param name: name assigned to connection
         :param logger_name: take that logger from logging
         :param newline: new line character
+        :param runner: runner used by connection-observers of this connection (if None then shared one)
 
         Logger is retrieved by logging.getLogger(logger_name)
         If logger_name == "" - take logger "moler.connection.<name>"
@@ -57,9 +64,14 @@ class Connection(object):
         super(Connection, self).__init__()
         self.how2send = how2send or self._unknown_send
         self._encoder = encoder
+        self._incremental_decoder = None
+        if isinstance(decoder, codecs.IncrementalDecoder):
+            self._incremental_decoder = decoder
+            decoder = decoder.decode
         self._decoder = decoder
         self._name = self._use_or_generate_name(name)
         self.newline = newline
+        self.runner = runner
         self.logger = self._select_logger(logger_name, self._name)
 
     @property
@@ -122,6 +134,14 @@ class Connection(object):
         self._log(msg=data2send, level=RAW_DATA, extra={'transfer_direction': '>'})
         self.how2send(data2send)
 
+    def _is_log_enabled(self, level):
+        """
+        Check (cheaply) if logging at given level has any effect.
+        Allows to skip building of log messages in data-path.
+        """
+        logger = self.logger
+        return (logger is not None) and logger.isEnabledFor(level)  # cached and invalidated by logging itself
+
     def sendline(self, data, timeout=30):
         """Outgoing-IO API: Send data line over external-IO."""
         line = data + self.newline
@@ -141,6 +161,11 @@ class Connection(object):
         decoded_data = self._decoder(data)
         return decoded_data
 
+    def reset_decoder(self):
+        """Drop incomplete multi-byte sequence kept by incremental decoder (if used)"""
+        if self._incremental_decoder is not None:
+            self._incremental_decoder.reset()
+
     def _unknown_send(self, data2send):
         err_msg = "Can't send('{}')".format(data2send)
         err_msg += "\nYou haven't installed sending method of external-IO system"
@@ -151,10 +176,117 @@ class Connection(object):
         raise WrongUsage(err_msg)
 
     def _log(self, msg, level, extra=None):
-        if self.logger:
+        if self._is_log_enabled(level):
             self.logger.log(level, msg, extra=extra)
 
 
+LineRecord = namedtuple('LineRecord', ['line', 'is_full_line', 'continued_at'])
+LineRecord.__doc__ = """
+Line (or its beginning) of data received by connection.
+
+line - whole line received so far (new line chars removed from full line)
+is_full_line - True if line is ended by new line chars
+continued_at - where line continues previously delivered not full line (0 for line starting in this record)
+"""
+
+
+class _LinesSplitter(object):
+    """Splits chunks of data into LineRecords (keeps not full line till next chunk)."""
+
+    def __init__(self, new_line_chars):
+        self.new_line_chars = new_line_chars
+        self.last_not_full_line = None
+        self.subscribers_count = 0
+
+    def split(self, data):
+        records = []
+        for line in data.splitlines(True):
+            continued_at = 0
+            if self.last_not_full_line is not None:
+                continued_at = len(self.last_not_full_line)
+                line = self.last_not_full_line + line
+                self.last_not_full_line = None
+            is_full_line = line.endswith(self.new_line_chars)
+            if is_full_line:
+                for char in self.new_line_chars:
+                    line = line.rstrip(char)
+            else:
+                self.last_not_full_line = line
+            records.append(LineRecord(line, is_full_line, continued_at))
+        return tuple(records)  # immutable since shared by all lines-observers
+
+
+_not_decoded = "not-decoded"  # marks observers of raw data (instead of new_line_chars of lines-observers)
+
+prompt_like_line = r'[\$%#>~:]\s*$'  # not full line looking like prompt (or password prompt)
+
+
+class _CoalescingWindow(object):
+    """Time window of coalescing received data."""
+
+    def __init__(self, window):
+        self.deadline = time.time() + window
+
+
+class _CoalescingTimer(object):
+    """
+    Thread ending coalescing windows of single connection.
+
+    Each connection has its own timer, so slow observers of one connection delay only its own windows
+    (neither other connections nor timeouts of connection-observers).
+    Timer keeps only weak reference to connection and its thread exits when idle.
+    """
+
+    idle_time = 1.0  # thread exits if no window is opened for that long
+
+    def __init__(self, moler_connection):
+        self._connection = weakref.ref(moler_connection)
+        self._name = "moler-coalescing-{}".format(moler_connection.name)
+        self._condition = Condition()
+        self._window = None
+        self._thread = None
+
+    def start_window(self, window):
+        """Call connection._coalescing_window_end(window) at window.deadline"""
+        with self._condition:
+            self._window = window
+            if self._thread is None:
+                self._thread = Thread(target=self._run, name=self._name)
+                self._thread.daemon = True
+                self._thread.start()
+            self._condition.notify()
+
+    def cancel_window(self):
+        with self._condition:
+            self._window = None
+
+    def _pop_window_end(self):
+        idle_since = time.time()
+        while True:
+            now = time.time()
+            window = self._window
+            if window is None:
+                if now - idle_since >= self.idle_time:
+                    self._thread = None
+                    return None
+                self._condition.wait(self.idle_time - (now - idle_since))
+            elif window.deadline > now:
+                self._condition.wait(window.deadline - now)
+            else:
+                self._window = None
+                return window
+
+    def _run(self):
+        while True:
+            with self._condition:
+                window = self._pop_window_end()
+            moler_connection = self._connection()
+            if (window is None) or (moler_connection is None):
+                break
+            moler_connection._coalescing_window_end(window)
+            del moler_connection  # don't keep connection alive while waiting
+
+
 class ObservableConnection(Connection):
     """
     Allows objects to subscribe for notification about connection's data-received.
@@ -163,49 +295,241 @@ class ObservableConnection(Connection):
 
     def observer(data):
         # handle that data
+
+    Line-oriented observers may subscribe via subscribe_lines() - then data is split into lines
+    only once (per given new line chars) and same LineRecords are delivered to all of them:
+
+    def lines_observer(lines):
+        for line, is_full_line, continued_at in lines:
+            # handle that line
+
+    Observers parsing binary protocols may subscribe via subscribe_bytes() - then they get data
+    exactly as received from external-IO. If there are only such observers connection doesn't decode data at all.
     """
 
     def __init__(self, how2send=None, encoder=identity_transformation, decoder=identity_transformation,
-                 name=None, newline='\n', logger_name=""):
+                 name=None, newline='\n', logger_name="", runner=None):
         """
         Create Connection via registering external-IO
 
         :param how2send: any callable performing outgoing IO
         :param encoder: callable converting data to bytes
-        :param decoder: callable restoring data from bytes
+        :param decoder: callable restoring data from bytes or codecs.IncrementalDecoder (one instance per connection)
         :param name: name assigned to connection
         :param logger_name: take that logger from logging
+        :param runner: runner used by connection-observers of this connection (if None then shared one)
 
         Logger is retrieved by logging.getLogger(logger_name)
         If logger_name == "" - take logger "moler.connection.<name>"
         If logger_name is None - don't use logging
         """
         super(ObservableConnection, self).__init__(how2send, encoder, decoder, name=name, newline=newline,
-                                                   logger_name=logger_name)
+                                                   logger_name=logger_name, runner=runner)
         self._observers = dict()
         self._observers_lock = Lock()
+        self._lines_splitters = dict()  # new_line_chars --> _LinesSplitter
+        self._bytes_observers_count = 0
+        self._decoding_skipped = False
+        self._coalescing_window = None  # coalescing of received data is off
+        self._coalescing_max_size = 0
+        self._coalescing_flush_patterns = ()  # (str regexp, bytes regexp) pairs
+        self._coalescing_flush_on_new_line = False
+        self._coalescing_lock = Lock()
+        self._coalesced_chunks = []
+        self._coalesced_size = 0
+        self._coalesced_tail = None  # not full line at end of coalesced data (up to 256 chars)
+        self._open_window = None
+        self._coalescing_timer = _CoalescingTimer(self)
+        self._coalesced_batches = deque()  # flushed, waiting for dispatch
+        self._dispatching = False
+        self._dispatcher = None  # observers are called directly by external-IO thread
+
+    def start_dispatcher(self, queue_size=1000, overflow_policy="block"):
+        """
+        Decouple external-IO thread from observers: IO thread only puts data into bounded per-observer queues,
+        dispatcher thread delivers it to observers. Slow observer doesn't stall reading data.
+        Data is still split into lines by external-IO thread (once for all lines-observers).
+
+        :param queue_size: max number of data chunks awaiting delivery to single observer
+        :param overflow_policy: what to do when queue of observer is full:
+                                "block" - external-IO thread waits (backpressure, no data lost),
+                                "drop_oldest"/"drop_newest" - observer loses data
+        """
+        if self._dispatcher is None:
+            self._dispatcher = ObserversDispatcher(deliver=self._notify_observer, queue_size=queue_size,
+                                                   overflow_policy=overflow_policy,
+                                                   name="moler-dispatcher-{}".format(self.name))
+
+    def stop_dispatcher(self):
+        """Deliver already queued data and return to calling observers directly by external-IO thread"""
+        dispatcher = self._dispatcher
+        if dispatcher is not None:
+            self._dispatcher = None
+            dispatcher.stop()
+
+    def wait_for_dispatch(self, timeout=None):
+        """
+        Wait till dispatcher delivers all queued data to observers
+        :param timeout: max time [sec] to wait (None - no limit)
+        :return: True if all data is delivered, False if timeout occurred
+        """
+        dispatcher = self._dispatcher
+        if dispatcher is None:
+            return True
+        return dispatcher.wait_for_delivery(timeout=timeout)
+
+    def dispatcher_stats(self):
+        """
+        Get backpressure metrics of dispatcher
+        :return: dict with 'blocked_count', 'blocked_time' and 'observers' - stats of per-observer queues
+        """
+        dispatcher = self._dispatcher
+        if dispatcher is None:
+            return None
+        observers = dispatcher.stats()
+        for queue_stats in observers:
+            self_or_none, observer_function, _ = queue_stats['observer']
+            try:
+                description = observer_function.__name__
+                if self_or_none is not None:
+                    description = "{}.{}".format(self_or_none, description)
+            except ReferenceError:
+                description = "<garbage collected>"
+            queue_stats['observer'] = description
+        return {'blocked_count': dispatcher.blocked_count, 'blocked_time': dispatcher.blocked_time,
+                'observers': observers}
+
+    def set_coalescing(self, window=0.01, max_size=4096, flush_patterns=(prompt_like_line,), flush_on_new_line=False):
+        """
+        Accumulate received data chunks and dispatch them to observers at once.
+        Reduces number of observers invocations when external-IO delivers data in many tiny chunks.
+
+        :param window: max time [sec] first chunk waits for next ones (None - turn coalescing off)
+        :param max_size: dispatch immediately when that much data is accumulated
+        :param flush_patterns: dispatch immediately when not full line at end of data matches any of these regexps
+                               (default one looks like prompt - so observers of prompt get it without delay)
+        :param flush_on_new_line: dispatch immediately when data ends with new line
+        """
+        self._coalescing_max_size = max_size
+        self._coalescing_flush_patterns = tuple((re.compile(pattern), re.compile(pattern.encode('utf-8')))
+                                                for pattern in flush_patterns)
+        self._coalescing_flush_on_new_line = flush_on_new_line
+        self._coalescing_window = window
+        if window is None:
+            self.flush_coalesced_data()
 
     def data_received(self, data):
         """
         Incoming-IO API:
         external-IO should call this method when data is received
         """
-        # log input as ascii printable (for non-ascii dump as \0x prefixed bytes)
-        printable_data = decodestring(data)
-        self._log(msg=printable_data, level=RAW_DATA, extra={'transfer_direction': '<'})
+        if self._coalescing_window is None:
+            self._dispatch_data(data)
+            return
+        with self._coalescing_lock:
+            self._coalesced_chunks.append(data)
+            self._coalesced_size += len(data)
+            window_expired = (self._open_window is not None) and (self._open_window.deadline <= time.time())
+            if self._must_flush(data) or window_expired:  # expired window is flushed by external-IO thread being here
+                self._take_coalesced_data()
+            elif self._open_window is None:
+                self._open_window = _CoalescingWindow(self._coalescing_window)
+                self._coalescing_timer.start_window(self._open_window)
+        self._dispatch_coalesced_batches()
+
+    def flush_coalesced_data(self):
+        """Dispatch coalesced data to observers now"""
+        with self._coalescing_lock:
+            self._take_coalesced_data()
+        self._dispatch_coalesced_batches()
+
+    def _coalescing_window_end(self, window):  # called from thread of _CoalescingTimer
+        with self._coalescing_lock:
+            if window is self._open_window:
+                self._take_coalesced_data()
+        self._dispatch_coalesced_batches()
+
+    def _must_flush(self, data):
+        if self._coalesced_size >= self._coalescing_max_size:
+            return True
+        new_line = b'\n' if isinstance(data, (bytes, bytearray)) else u'\n'
+        if self._coalescing_flush_on_new_line and data.endswith(new_line):
+            return True
+        line_end = data.rfind(new_line)
+        if (line_end >= 0) or (self._coalesced_tail is None):
+            self._coalesced_tail = data[line_end + 1:]
+        else:
+            self._coalesced_tail = (self._coalesced_tail + data)[-256:]
+        if not self._coalesced_tail:
+            return False
+        is_text = isinstance(self._coalesced_tail, six.text_type) or (six.PY2 and isinstance(self._coalesced_tail, str))
+        for text_pattern, bytes_pattern in self._coalescing_flush_patterns:
+            pattern = text_pattern if is_text else bytes_pattern
+            if pattern.search(self._coalesced_tail):
+                return True
+        return False
+
+    def _take_coalesced_data(self):
+        if self._open_window is not None:
+            self._coalescing_timer.cancel_window()
+            self._open_window = None
+        chunks = self._coalesced_chunks
+        if chunks:
+            self._coalesced_batches.append(chunks[0][:0].join(chunks))
+            self._coalesced_chunks = []
+            self._coalesced_size = 0
+            self._coalesced_tail = None
+
+    def _dispatch_coalesced_batches(self):
+        # only one thread dispatches (keeping order of batches), others just leave their batches for it
+        with self._coalescing_lock:
+            if self._dispatching:
+                return
+            self._dispatching = True
+        try:
+            while True:
+                with self._coalescing_lock:
+                    if not self._coalesced_batches:
+                        self._dispatching = False
+                        return
+                    data = self._coalesced_batches.popleft()
+                self._dispatch_data(data)
+        except Exception:
+            with self._coalescing_lock:
+                self._dispatching = False
+            raise
+
+    def _dispatch_data(self, data):
+        if self._is_log_enabled(RAW_DATA):
+            # log input as ascii printable (for non-ascii dump as \0x prefixed bytes)
+            printable_data = decodestring(data)
+            self._log(msg=printable_data, level=RAW_DATA, extra={'transfer_direction': '<'})
+
+        if self._bytes_observers_count and (self._bytes_observers_count == len(self._observers)):
+            # bytes-only mode - nobody needs decoded data (binary data might be not decodable at all)
+            self._decoding_skipped = True
+            self._log(msg=data, level=logging.INFO, extra={'transfer_direction': '<'})
+            self.notify_observers(None, raw_data=data)
+            return
+        if self._decoding_skipped:  # decoder state is not valid for data received meanwhile
+            self._decoding_skipped = False
+            self.reset_decoder()
 
         decoded_data = self.decode(data)
-        # decoded data might be unicode or bytes/ascii string, logger accepts only ascii.
-        if isinstance(decoded_data, six.text_type):
-            # We create ascii logs interpretable as utf-8 bytes.
-            # Editor with utf-8 support can correctly display such logs.
-            encoded_for_log = decoded_data.encode('utf-8')
-        else:
-            # bytes or ascii log
-            encoded_for_log = decoded_data
-        self._log(msg=encoded_for_log, level=logging.INFO, extra={'transfer_direction': '<'})
+        if self._is_log_enabled(logging.INFO):
+            # decoded data might be unicode or bytes/ascii string, logger accepts only ascii.
+            if isinstance(decoded_data, six.text_type):
+                # We create ascii logs interpretable as utf-8 bytes.
+                # Editor with utf-8 support can correctly display such logs.
+                encoded_for_log = decoded_data.encode('utf-8')
+            else:
+                # bytes or ascii log
+                encoded_for_log = decoded_data
+            self._log(msg=encoded_for_log, level=logging.INFO, extra={'transfer_direction': '<'})
 
-        self.notify_observers(decoded_data)
+        if data and not decoded_data:  # incremental decoder awaits rest of multi-byte sequence
+            decoded_data = None
+        self.notify_observers(decoded_data, raw_data=data)
 
     def subscribe(self, observer):
         """
@@ -216,36 +540,108 @@ class ObservableConnection(Connection):
             self._log(msg="subscribe({})".format(observer), level=TRACE)
             observer_key, value = self._get_observer_key_value(observer)
             if observer_key not in self._observers:
-                self._observers[observer_key] = value
+                self._observers[observer_key] = value + (None,)
+
+    def subscribe_lines(self, observer, new_line_chars=("\n", "\r")):
+        """
+        Subscribe for 'data-received notification' in form of list of LineRecords
+        :param observer: function to be called
+        :param new_line_chars: characters ending line
+        """
+        new_line_chars = tuple(new_line_chars)
+        with self._observers_lock:
+            self._log(msg="subscribe_lines({})".format(observer), level=TRACE)
+            observer_key, value = self._get_observer_key_value(observer)
+            if observer_key not in self._observers:
+                self._observers[observer_key] = value + (new_line_chars,)
+                if new_line_chars not in self._lines_splitters:
+                    self._lines_splitters[new_line_chars] = _LinesSplitter(new_line_chars)
+                self._lines_splitters[new_line_chars].subscribers_count += 1
 
     def unsubscribe(self, observer):
         """
         Unsubscribe from 'data-received notification'
-        :param observer: function that was previously subscribed
+        :param observer: function that was previously subscribed (via subscribe() or subscribe_lines())
         """
         with self._observers_lock:
             self._log(msg="unsubscribe({})".format(observer), level=TRACE)
             observer_key, _ = self._get_observer_key_value(observer)
             if observer_key in self._observers:
-                del self._observers[observer_key]
+                _, _, new_line_chars = self._observers.pop(observer_key)
+                dispatcher = self._dispatcher
+                if dispatcher is not None:
+                    dispatcher.remove(observer_key)
+                if new_line_chars is _not_decoded:
+                    self._bytes_observers_count -= 1
+                elif new_line_chars is not None:
+                    splitter = self._lines_splitters[new_line_chars]
+                    splitter.subscribers_count -= 1
+                    if splitter.subscribers_count == 0:
+                        del self._lines_splitters[new_line_chars]
             else:
                 self._log(msg="{} was not subscribed".format(observer),
                           level=logging.WARNING)
 
-    def notify_observers(self, data):
-        """Notify all subscribed observers about data received on connection"""
+    def subscribe_bytes(self, observer):
+        """
+        Subscribe for 'data-received notification' with data not decoded (as received from external-IO)
+        :param observer: function to be called
+        """
+        with self._observers_lock:
+            self._log(msg="subscribe_bytes({})".format(observer), level=TRACE)
+            observer_key, value = self._get_observer_key_value(observer)
+            if observer_key not in self._observers:
+                self._observers[observer_key] = value + (_not_decoded,)
+                self._bytes_observers_count += 1
+
+    unsubscribe_lines = unsubscribe
+    unsubscribe_bytes = unsubscribe
+
+    def notify_observers(self, data, raw_data=None):
+        """
+        Notify all subscribed observers about data received on connection
+        :param data: decoded data (None if there is nothing for observers of decoded data)
+        :param raw_data: data as received from external-IO (for observers subscribed via subscribe_bytes())
+        """
         # need copy since calling subscribers may change self._observers
-        current_subscribers = list(self._observers.values())
-        for self_or_none, observer_function in current_subscribers:
-            try:
-                self._log(msg=r'notifying {}({!r})'.format(observer_function, repr(data)), level=TRACE)
-                if self_or_none is None:
-                    observer_function(data)
-                else:
-                    observer_self = self_or_none
-                    observer_function(observer_self, data)
-            except ReferenceError:
-                pass  # ignore: weakly-referenced object no longer exists
+        current_subscribers = list(self._observers.items())
+        dispatcher = self._dispatcher
+        lines_of_data = dict()  # new_line_chars --> LineRecords; data is split once for all lines-observers
+        for observer_key, observer in current_subscribers:
+            _, _, new_line_chars = observer
+            if new_line_chars is _not_decoded:
+                if raw_data is None:
+                    continue
+                observer_data = raw_data
+            elif data is None:
+                continue
+            elif new_line_chars is None:
+                observer_data = data
+            elif new_line_chars in lines_of_data:
+                observer_data = lines_of_data[new_line_chars]
+            else:
+                splitter = self._lines_splitters.get(new_line_chars)
+                if splitter is None:  # meanwhile unsubscribed
+                    continue
+                observer_data = splitter.split(data)
+                lines_of_data[new_line_chars] = observer_data
+            if dispatcher is None:
+                self._notify_observer(observer, observer_data)
+            else:
+                dispatcher.put(observer_key, observer, observer_data)
+
+    def _notify_observer(self, observer, observer_data):
+        self_or_none, observer_function, _ = observer
+        try:
+            if self._is_log_enabled(TRACE):
+                self._log(msg=r'notifying {}({!r})'.format(observer_function, repr(observer_data)), level=TRACE)
+            if self_or_none is None:
+                observer_function(observer_data)
+            else:
+                observer_self = self_or_none
+                observer_function(observer_self, observer_data)
+        except ReferenceError:
+            pass  # ignore: weakly-referenced object no longer exists
 
     @staticmethod
     def _get_observer_key_value(observer):
@@ -434,11 +830,12 @@ def _try_get_connection_with_name(io_type, variant, **constructor_kwargs):
 
 def _register_builtin_connections():
     from moler.io.raw.memory import ThreadedFifoBuffer
-    from moler.io.raw.tcp import ThreadedTcp
+    from moler.io.raw.tcp import ThreadedTcp, ReactorTcp
 
     def mlr_conn_utf8(name):
+        # incremental decoder - TCP/FIFO reads may split multi-byte characters
         return ObservableConnection(encoder=lambda data: data.encode("utf-8"),
-                                    decoder=lambda data: data.decode("utf-8"),
+                                    decoder=codecs.getincrementaldecoder("utf-8")(),
                                     name=name)
 
     def mem_thd_conn(name=None, echo=True):
@@ -447,10 +844,16 @@ def _register_builtin_connections():
                                      echo=echo, name=name)
         return io_conn
 
-    def tcp_thd_conn(port, host='localhost', name=None):
+    def tcp_thd_conn(port, host='localhost', name=None, **tcp_options):
         mlr_conn = mlr_conn_utf8(name=name)
         io_conn = ThreadedTcp(moler_connection=mlr_conn,
-                              port=port, host=host)  # TODO: add name
+                              port=port, host=host, **tcp_options)  # TODO: add name
+        return io_conn
+
+    def tcp_reactor_conn(port, host='localhost', name=None, **tcp_options):
+        mlr_conn = mlr_conn_utf8(name=name)
+        io_conn = ReactorTcp(moler_connection=mlr_conn,
+                             port=port, host=host, **tcp_options)
         return io_conn
 
     # TODO: unify passing logger to io_conn (logger/logger_name)
@@ -460,10 +863,24 @@ def _register_builtin_connections():
     ConnectionFactory.register_construction(io_type="tcp",
                                             variant="threaded",
                                             constructor=tcp_thd_conn)
+    ConnectionFactory.register_construction(io_type="tcp",
+                                            variant="reactor",
+                                            constructor=tcp_reactor_conn)
+    if six.PY3:
+        def tcp_asyncio_conn(port, host='localhost', name=None, **tcp_options):
+            from moler.io.asyncio.tcp import AsyncioTcp  # Python 3 only
+            mlr_conn = mlr_conn_utf8(name=name)
+            io_conn = AsyncioTcp(moler_connection=mlr_conn,
+                                 port=port, host=host, **tcp_options)
+            return io_conn
+
+        ConnectionFactory.register_construction(io_type="tcp",
+                                                variant="asyncio",
+                                                constructor=tcp_asyncio_conn)
 
 
 def _register_builtin_unix_connections():
-    from moler.io.raw.terminal import ThreadedTerminal
+    from moler.io.raw.terminal import ThreadedTerminal, ReactorTerminal
 
     def mlr_conn_no_encoding(name):
         return ObservableConnection(name=name)
@@ -474,10 +891,28 @@ def _register_builtin_unix_connections():
         io_conn = ThreadedTerminal(moler_connection=mlr_conn)  # TODO: add name, logger
         return io_conn
 
+    def terminal_reactor_conn(name=None):
+        mlr_conn = mlr_conn_no_encoding(name=name)
+        io_conn = ReactorTerminal(moler_connection=mlr_conn)
+        return io_conn
+
     # TODO: unify passing logger to io_conn (logger/logger_name)
     ConnectionFactory.register_construction(io_type="terminal",
                                             variant="threaded",
                                             constructor=terminal_thd_conn)
+    ConnectionFactory.register_construction(io_type="terminal",
+                                            variant="reactor",
+                                            constructor=terminal_reactor_conn)
+    if six.PY3:
+        def terminal_asyncio_conn(name=None):
+            from moler.io.asyncio.terminal import AsyncioTerminal  # Python 3 only
+            mlr_conn = mlr_conn_no_encoding(name=name)
+            io_conn = AsyncioTerminal(moler_connection=mlr_conn)
+            return io_conn
+
+        ConnectionFactory.register_construction(io_type="terminal",
+                                                variant="asyncio",
+                                                constructor=terminal_asyncio_conn)
 
 
 # actions during import
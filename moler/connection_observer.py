@@ -6,6 +6,7 @@ __email__ = 'grzegorz.latuszek@nokia.com, marcin.usielski@nokia.com'
 
 import logging
 from abc import abstractmethod, ABCMeta
+from threading import Lock
 
 from six import add_metaclass
 
@@ -18,16 +19,19 @@ from moler.exceptions import ResultNotAvailableYet
 from moler.helpers import ClassProperty
 from moler.helpers import camel_case_to_lower_case_underscore
 from moler.helpers import instance_id
-from moler.runner import ThreadPoolExecutorRunner
+from moler.runner import get_runner
+from moler.runner import get_timeout_scheduler
 
 
 @add_metaclass(ABCMeta)
 class ConnectionObserver(object):
 
-    def __init__(self, connection=None):
+    def __init__(self, connection=None, runner=None):
         """
         Create instance of ConnectionObserver class
         :param connection: connection used to receive data awaited for
+        :param runner: runner to run this observer; if not given then runner of connection
+                       or shared runner selected by configuration is used
         """
         self.connection = connection
         self._is_running = False
@@ -35,8 +39,10 @@ class ConnectionObserver(object):
         self._is_cancelled = False
         self._result = None
         self._exception = None
-        self.runner = ThreadPoolExecutorRunner()
+        self._runner = runner
         self._future = None
+        self._done_callbacks = []
+        self._done_callbacks_lock = Lock()
         self.timeout = 7
         self.logger = logging.getLogger('moler.connection_observer')
 
@@ -50,6 +56,17 @@ class ConnectionObserver(object):
             connection_str = repr(self.connection)
         return '{}, using {})'.format(cmd_str[:-1], connection_str)
 
+    @property
+    def runner(self):
+        """Runner of connection-observer (selected at first use if not given explicitly)"""
+        if self._runner is None:
+            self._runner = getattr(self.connection, 'runner', None) or get_runner()
+        return self._runner
+
+    @runner.setter
+    def runner(self, value):
+        self._runner = value
+
     def __call__(self, timeout=None, *args, **kwargs):
         """
         Run connection-observer in foreground
@@ -99,12 +116,25 @@ class ConnectionObserver(object):
                                       timeout=timeout)
         return result
 
+    def __await__(self):
+        """
+        Await completion of connection-observer inside coroutine (Python3 only):
+
+            result = await connection_observer
+
+        Not started connection-observer is started here.
+        """
+        if (self._future is None) and not self.done():
+            self.start()
+        return self.runner.wait_for_iterator(connection_observer=self, connection_observer_future=self._future)
+
     def cancel(self):
         """Cancel execution of connection-observer."""
         if self.cancelled() or self.done():
             return False
-        self._is_done = True
         self._is_cancelled = True
+        self._is_done = True
+        self._notify_done()
         return True
 
     def cancelled(self):
@@ -125,8 +155,9 @@ class ConnectionObserver(object):
         """Should be used to set final result"""
         if self.done():
             raise ResultAlreadySet(self)
-        self._is_done = True
         self._result = result
+        self._is_done = True
+        self._notify_done()
 
     @abstractmethod
     def data_received(self, data):
@@ -136,10 +167,25 @@ class ConnectionObserver(object):
         """
         pass
 
+    def subscribe_for_data(self):
+        """
+        Subscribe for data of own connection.
+        Called by runner when it starts feeding connection-observer.
+        """
+        self.connection.subscribe(self.data_received)
+
+    def unsubscribe_from_data(self):
+        """
+        Unsubscribe from data of own connection (reverts subscribe_for_data()).
+        Called by runner when it stops feeding connection-observer.
+        """
+        self.connection.unsubscribe(self.data_received)
+
     def set_exception(self, exception):
         """Should be used to indicate some failure during observation"""
-        self._is_done = True
         self._exception = exception
+        self._is_done = True
+        self._notify_done()
 
     def result(self):
         """Retrieve final result of connection-observer"""
@@ -151,6 +197,35 @@ class ConnectionObserver(object):
             raise ResultNotAvailableYet(self)
         return self._result
 
+    def add_done_callback(self, callback):
+        """
+        Register callback to be called when connection-observer becomes done
+        (via set_result(), set_exception() or cancel()).
+        Callback is called with connection-observer as its only parameter.
+        If connection-observer is already done callback is called immediately.
+        """
+        with self._done_callbacks_lock:
+            if not self.done():
+                self._done_callbacks.append(callback)
+                return
+        callback(self)
+
+    def remove_done_callback(self, callback):
+        """Unregister callback previously registered by add_done_callback()"""
+        with self._done_callbacks_lock:
+            if callback in self._done_callbacks:
+                self._done_callbacks.remove(callback)
+
+    def _notify_done(self):
+        with self._done_callbacks_lock:
+            callbacks = self._done_callbacks
+            self._done_callbacks = []
+        for callback in callbacks:
+            try:
+                callback(self)
+            except Exception as err:
+                self.logger.warning("done callback {} of {} raised: {!r}".format(callback, self, err))
+
     def on_timeout(self):
         """ It's callback called by framework just before raise exception for Timeout """
         pass
@@ -160,6 +235,8 @@ class ConnectionObserver(object):
         self.timeout = self.timeout + timedelta
         msg = "Extended timeout from %.2f with delta %.2f to %.2f" % (prev_timeout, timedelta, self.timeout)
         self.runner.timeout_change(timedelta)
+        if timedelta < 0:  # extended timeouts are honoured at old deadline, shortened need new one
+            get_timeout_scheduler().reschedule(self)
         self.logger.info(msg)
 
     @ClassProperty
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+Registry of observers (commands/events) available in packages used by devices.
+
+Package is walked (its modules imported and inspected) once per process
+and result is shared by all devices and all their states.
+Optionally, registry is persisted into index file (see moler.config.devices.set_observers_index_file())
+so, next processes don't need to walk packages as long as their modules are not modified.
+"""
+
+__author__ = 'Grzegorz Latuszek'
+__copyright__ = 'Copyright (C) 2018, Nokia'
+__email__ = 'grzegorz.latuszek@nokia.com'
+
+import importlib
+import inspect
+import json
+import logging
+import os
+import pkgutil
+import threading
+
+from moler.config import devices as dev_cfg
+from moler.helpers import freeze
+
+_packages_observers = {}  # package name --> {observer_name: class fullname} (read-only)
+_registry_lock = threading.Lock()
+_dependent_caches = []  # clear() functions of caches built from registry content
+
+
+def get_observers_of_package(package_name):
+    """
+    Return observers defined in modules of package.
+
+    :param package_name: dotted name of package like 'moler.cmd.unix'
+    :return: read-only dict observer_name --> class fullname (shared by all callers)
+    """
+    with _registry_lock:
+        if package_name not in _packages_observers:
+            _packages_observers[package_name] = freeze(_load_observers_of_package(package_name))
+        return _packages_observers[package_name]
+
+
+def register_dependent_cache(clear_cache):
+    """
+    Register cache built from content of registry to be cleared together with registry.
+
+    :param clear_cache: function clearing that cache
+    """
+    _dependent_caches.append(clear_cache)
+
+
+def clear():
+    """Forget observers collected so far (next request walks packages or reads index file again)."""
+    with _registry_lock:
+        _packages_observers.clear()
+        for clear_cache in _dependent_caches:
+            clear_cache()
+
+
+def walk_package_observers(package_name):
+    """
+    Import all modules of package and collect classes defined there.
+
+    :param package_name: dotted name of package like 'moler.cmd.unix'
+    :return: dict observer_name --> class fullname, like: ip_addr --> moler.cmd.unix.ip_addr.IpAddr
+    """
+    observers = dict()
+    basic_module = importlib.import_module(package_name)
+    for importer, modname, is_pkg in pkgutil.iter_modules(basic_module.__path__):
+        module_name = "{}.{}".format(package_name, modname)
+        module = importlib.import_module(module_name)
+        for (class_name, class_obj) in inspect.getmembers(module, inspect.isclass):
+            if class_obj.__module__ == module_name:
+                observers[class_obj.observer_name] = "{}.{}".format(module_name, class_name)
+    return observers
+
+
+def package_fingerprint(package_name):
+    """
+    Describe package content cheaply (without importing its modules).
+
+    :param package_name: dotted name of package like 'moler.cmd.unix'
+    :return: string changing whenever any module of package is added, removed or modified
+    """
+    package_dir = importlib.import_module(package_name).__path__[0]  # package itself, not its modules
+    modules = []
+    for filename in sorted(os.listdir(package_dir)):
+        if filename.endswith('.py'):
+            stat = os.stat(os.path.join(package_dir, filename))
+            modules.append("{}:{}:{}".format(filename, stat.st_size, int(stat.st_mtime)))
+    return "{}|{}".format(package_dir, ",".join(modules))
+
+
+def _load_observers_of_package(package_name):
+    index_file = dev_cfg.observers_index_file
+    if not index_file:
+        return walk_package_observers(package_name)
+    fingerprint = package_fingerprint(package_name)
+    index = _read_index(index_file)
+    if (package_name in index) and (index[package_name]['fingerprint'] == fingerprint):
+        return index[package_name]['observers']
+    observers = walk_package_observers(package_name)
+    index[package_name] = {'fingerprint': fingerprint, 'observers': observers}
+    _write_index(index_file, index)
+    return observers
+
+
+def _read_index(index_file):
+    if not os.path.exists(index_file):
+        return {}
+    try:
+        with open(index_file) as index:
+            return json.load(index)
+    except (IOError, ValueError) as err:
+        logging.getLogger('moler.textualdevice').warning("ignoring index of observers {}: {}".format(index_file, err))
+        return {}
+
+
+def _write_index(index_file, index):
+    temp_file = "{}.{}".format(index_file, os.getpid())  # other process may read index meanwhile
+    try:
+        with open(temp_file, 'w') as index_content:
+            json.dump(index, index_content, indent=2, sort_keys=True)
+        replace = getattr(os, 'replace', os.rename)  # Python 2 has no os.replace()
+        replace(temp_file, index_file)
+    except (IOError, OSError) as err:
+        logging.getLogger('moler.textualdevice').warning("can't store index of observers {}: {}".format(index_file, err))
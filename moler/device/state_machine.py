@@ -4,10 +4,14 @@ __author__ = 'Michal Ernst'
 __copyright__ = 'Copyright (C) 2018, Nokia'
 __email__ = 'michal.ernst@nokia.com'
 
+import functools
 import logging
+from collections import deque
 
 import transitions
 
+from moler.helpers import ReadOnlyDict
+
 
 class StateMachine(transitions.Machine):
     def __init__(self, model='self', states=None, initial='initial', transitions=None,
@@ -21,7 +25,112 @@ class StateMachine(transitions.Machine):
                                            queued, prepare_event, finalize_event, **kwargs)
         self.logger = logging.getLogger('transitions')
         self.logger.propagate = False
-        self.logger.addHandler(ForwardingHandler(target_logger_name="moler.state_machine"))
+        if not any(isinstance(handler, ForwardingHandler) for handler in self.logger.handlers):  # once for all machines
+            self.logger.addHandler(ForwardingHandler(target_logger_name="moler.state_machine"))
+
+    def trigger(self, trigger_name, *args, **kwargs):
+        """
+        Run trigger of model.
+
+        :param trigger_name: name of trigger like GOTO_UNIX_LOCAL
+        :return: True if state was changed
+        """
+        return getattr(self.model, trigger_name)(*args, **kwargs)
+
+
+class TransitionsTable(object):
+    """States and transitions of CompactStateMachine (may be shared by many machines)."""
+    __slots__ = ('states', 'transitions')
+
+    def __init__(self):
+        self.states = []
+        self.transitions = {}  # (trigger, source state) --> (destination state, names of model's prepare methods)
+
+    def frozen(self):
+        """Return read-only copy of table (to be shared by many machines)."""
+        table = TransitionsTable()
+        table.states = tuple(self.states)
+        table.transitions = ReadOnlyDict(self.transitions)
+        return table
+
+
+class CompactStateMachine(object):
+    """
+    Lightweight replacement of StateMachine providing only what devices use:
+    named states, triggers changing state of model and prepare callbacks (methods of model).
+
+    Triggers are not attached to model (run them via trigger()), table of transitions may be shared by many machines.
+    Triggers are always queued: trigger called from inside prepare callback is run after current one.
+    """
+    __slots__ = ('model', 'table', '_queue')
+
+    def __init__(self, model, states=None, initial='initial', table=None, **kwargs):
+        """
+        :param model: object which state is kept in its 'state' attribute
+        :param states: names of states
+        :param initial: initial state of model
+        :param table: TransitionsTable shared with other machines (if None then machine has own table)
+        :param kwargs: parameters of StateMachine not used by this one (like auto_transitions, queued)
+        """
+        super(CompactStateMachine, self).__init__()
+        self.model = model
+        self.table = table if table is not None else TransitionsTable()
+        self._queue = None  # triggers awaiting run while other trigger runs
+        for state in [initial] + list(states or []):
+            self.add_state(state)
+        model.state = initial
+
+    def add_state(self, state):
+        if state not in self.table.states:
+            self.table.states.append(state)
+
+    def add_transitions(self, transitions):
+        """
+        :param transitions: list of dicts with 'trigger', 'source', 'dest' and 'prepare' keys
+        """
+        for transition in transitions:
+            prepare = transition.get('prepare', [])
+            if not isinstance(prepare, (list, tuple)):
+                prepare = [prepare]
+            self.table.transitions[(transition['trigger'], transition['source'])] = (transition['dest'], tuple(prepare))
+
+    def get_triggers(self, *states):
+        return [trigger for (trigger, source) in self.table.transitions if source in states]
+
+    def set_state(self, state):
+        if state not in self.table.states:
+            raise ValueError("State '{}' is not a registered state.".format(state))
+        self.model.state = state
+
+    def trigger(self, trigger_name, *args, **kwargs):
+        """
+        Run trigger of model: call prepare methods of model (with given args) and change state of model.
+
+        :param trigger_name: name of trigger like GOTO_UNIX_LOCAL
+        :return: True if state was changed (or trigger was queued)
+        """
+        run_trigger = functools.partial(self._run_trigger, trigger_name, args, kwargs)
+        if self._queue is not None:  # called from inside of running trigger
+            self._queue.append(run_trigger)
+            return True
+        self._queue = deque([run_trigger])
+        try:
+            while self._queue:
+                self._queue[0]()
+                self._queue.popleft()
+        finally:
+            self._queue = None
+        return True
+
+    def _run_trigger(self, trigger_name, args, kwargs):
+        source = self.model.state
+        try:
+            dest, prepare = self.table.transitions[(trigger_name, source)]
+        except KeyError:
+            raise transitions.MachineError("Can't trigger event {} from state {}!".format(trigger_name, source))
+        for method_name in prepare:
+            getattr(self.model, method_name)(*args, **kwargs)
+        self.model.state = dest
 
 
 class ForwardingHandler(logging.Handler):
@@ -13,17 +13,22 @@ __copyright__ = 'Copyright (C) 2018, Nokia'
 __email__ = 'grzegorz.latuszek@nokia.com, marcin.usielski@nokia.com, michal.ernst@nokia.com'
 
 import functools
-import importlib
-import inspect
 import logging
-import pkgutil
 import time
 import re
 import abc
+from collections import namedtuple
 
 from moler.connection import get_connection
+from moler.device import observers_registry
 from moler.device.state_machine import StateMachine
 from moler.exceptions import CommandWrongState, DeviceFailure, EventWrongState, DeviceChangeStateFailure
+from moler.helpers import freeze
+from moler.instance_loader import load_class_from_class_fullname
+
+_StateTables = namedtuple('_StateTables', ['states', 'goto_states_triggers', 'transitions', 'state_hops', 'state_prompts',
+                                           'configurations', 'cmdnames', 'eventnames', 'observer_classes',
+                                           'state_machine_table'])
 
 
 # TODO: name, logger/logger_name as param
@@ -34,7 +39,17 @@ class TextualDevice(object):
     not_connected = "NOT_CONNECTED"
     connection_hops = "CONNECTION_HOPS"
 
-    def __init__(self, io_connection=None, io_type=None, variant=None, sm_params=dict()):
+    # (device class, configuration) --> _StateTables shared by all devices of that class and configuration
+    # (frozen: dicts are read-only, lists are tuples; cleared together with observers_registry)
+    _shared_state_tables = dict()
+    # set True in device class to share its state tables (only first device of class and sm_params runs
+    # _prepare_transitions(), _prepare_state_hops() and _configure_state_machine(); tables can't grow later)
+    share_state_tables = False
+    # engine of state machine: StateMachine (based on transitions.Machine)
+    # or CompactStateMachine (smaller and faster to create, its transitions table is shared by devices of class)
+    state_machine_class = StateMachine
+
+    def __init__(self, io_connection=None, io_type=None, variant=None, sm_params=dict(), runner=None):
         """
         Create Device communicating over io_connection
         CAUTION: Device owns (takes over ownership) of connection. It will be open when device "is born" and close when
@@ -44,38 +59,50 @@ class TextualDevice(object):
         :param io_type: type of connection - tcp, udp, ssh, telnet, ...
         :param variant: connection implementation variant, ex. 'threaded', 'twisted', 'asyncio', ...
                         (if not given then default one is taken)
+        :param runner: runner used by all commands/events of device (if not given then shared one is taken)
         """
         self.logger = logging.getLogger('moler.textualdevice')
         self.states = []
         self.goto_states_triggers = []
         # Below line will modify self extending it with methods and atributes od StateMachine
         # For eg. it will add attribute self.state
-        self.SM = StateMachine(model=self, states=self.states, initial=TextualDevice.not_connected,
-                               auto_transitions=False,
-                               queued=True)
+        self.SM = self.state_machine_class(model=self, states=self.states, initial=TextualDevice.not_connected,
+                                           auto_transitions=False,
+                                           queued=True)
 
         self._state_hops = {}
         self._state_prompts = {}
         self._prompts_events = {}
         self._configurations = dict()
+        self._transitions = []  # transitions added to state machine (flat list)
+        self._cmdnames_available_in_state = dict()  # state --> {observer_name: class fullname}
+        self._eventnames_available_in_state = dict()
+        self._observer_classes = dict()  # (observer_type, state, observer_name) --> class
 
-        self._prepare_transitions()
-        self._prepare_state_hops()
-        self._configure_state_machine(sm_params)
+        tables_key = self._state_tables_key(sm_params) if self.share_state_tables else None  # before sm_params are used
+        shared_tables = TextualDevice._shared_state_tables.get(tables_key)
+        if shared_tables:
+            self._use_shared_state_tables(shared_tables)
+        else:
+            self._prepare_transitions()
+            self._prepare_state_hops()
+            self._configure_state_machine(sm_params)
 
         if io_connection:
             self.io_connection = io_connection
         else:
             self.io_connection = get_connection(io_type=io_type, variant=variant)
+        if runner:
+            self.io_connection.moler_connection.runner = runner
         self.io_connection.notify(callback=self.on_connection_made, when="connection_made")
         # TODO: Need test to ensure above sentence for all connection
         self.io_connection.open()
         self.io_connection.notify(callback=self.on_connection_lost, when="connection_lost")
-        self._cmdnames_available_in_state = dict()
-        self._eventnames_available_in_state = dict()
 
-        self._collect_cmds_for_state_machine()
-        self._collect_events_for_state_machine()
+        if not shared_tables:
+            self._collect_cmds_for_state_machine()
+            self._collect_events_for_state_machine()
+            self._share_state_tables(tables_key)
         self._run_prompts_observers()
         self._default_prompt = re.compile(r'^[^<]*[\$|%|#|>|~]\s*$')
 
@@ -116,19 +143,61 @@ class TextualDevice(object):
 
     def _collect_cmds_for_state_machine(self):
         for state in self._get_available_states():
-            self._cmdnames_available_in_state[state] = dict()
-
-            cmds = self._collect_cmds_for_state(state)
-
-            self._cmdnames_available_in_state[state].update(cmds)
+            self._cmdnames_available_in_state[state] = self._collect_cmds_for_state(state)
 
     def _collect_events_for_state_machine(self):
         for state in self._get_available_states():
-            self._eventnames_available_in_state[state] = dict()
+            self._eventnames_available_in_state[state] = self._collect_events_for_state(state)
 
-            events = self._collect_events_for_state(state)
+    def _state_tables_key(self, sm_params):
+        """
+        Tables of states (transitions, hops, prompts, configurations, observers) are built by _prepare_xxx() methods
+        from device class and sm_params only, so they may be shared by devices of same class and sm_params.
 
-            self._eventnames_available_in_state[state].update(events)
+        :return: key of shared tables or None if sm_params can't form key
+        """
+        try:
+            key = (self.__class__, _hashable(sm_params))
+            hash(key)
+        except TypeError:  # unhashable or unsortable parameters
+            return None
+        return key
+
+    def _share_state_tables(self, tables_key):
+        if tables_key is None:
+            return
+        state_machine_table = getattr(self.SM, 'table', None)  # only CompactStateMachine has shareable one
+        if state_machine_table is not None:
+            state_machine_table = state_machine_table.frozen()
+            self.SM.table = state_machine_table
+        tables = _StateTables(
+            states=freeze(self.states), goto_states_triggers=freeze(self.goto_states_triggers),
+            transitions=freeze(self._transitions), state_hops=freeze(self._state_hops),
+            state_prompts=freeze(self._state_prompts), configurations=freeze(self._configurations),
+            cmdnames=freeze(self._cmdnames_available_in_state), eventnames=freeze(self._eventnames_available_in_state),
+            observer_classes=self._observer_classes, state_machine_table=state_machine_table)
+        TextualDevice._shared_state_tables[tables_key] = tables
+        self._assign_state_tables(tables)  # device creating tables uses them as any other device
+
+    def _use_shared_state_tables(self, tables):
+        if tables.state_machine_table is not None:
+            self.SM.table = tables.state_machine_table
+        else:
+            for transition in tables.transitions:
+                self.SM.add_state(transition['dest'])
+                self.SM.add_transitions([transition])
+        self._assign_state_tables(tables)
+
+    def _assign_state_tables(self, tables):
+        self.states = tables.states
+        self.goto_states_triggers = tables.goto_states_triggers
+        self._transitions = tables.transitions
+        self._state_hops = tables.state_hops
+        self._state_prompts = tables.state_prompts
+        self._configurations = tables.configurations
+        self._cmdnames_available_in_state = tables.cmdnames
+        self._eventnames_available_in_state = tables.eventnames
+        self._observer_classes = tables.observer_classes  # cache filled by any device of that class
 
     @property
     def current_state(self):
@@ -189,7 +258,7 @@ class TextualDevice(object):
         # for e.g. GOTO_REMOTE, GOTO_CONNECTED
         for goto_method in self.goto_states_triggers:
             if "GOTO_{}".format(next_state) == goto_method:
-                change_state_method = getattr(self, goto_method)
+                change_state_method = functools.partial(self.SM.trigger, goto_method)
 
         if change_state_method:
             while (retrying <= rerun) and (not entered_state):
@@ -245,43 +314,16 @@ class TextualDevice(object):
         return self.states
 
     def _load_cmds_from_package(self, package_name):
-        available_cmds = dict()
-        basic_module = importlib.import_module(package_name)
-        for importer, modname, is_pkg in pkgutil.iter_modules(basic_module.__path__):
-            module_name = "{}.{}".format(package_name, modname)
-            module = importlib.import_module(module_name)
-            for (cmd_class_name, cmd_module_name) in inspect.getmembers(module, inspect.isclass):
-                if cmd_module_name.__module__ == module_name:
-                    cmd_class_obj = getattr(module, cmd_class_name)
-                    # like:  IpAddr --> ip_addr
-                    cmd_name = cmd_class_obj.observer_name
-                    # like:  IpAddr --> moler.cmd.unix.ip_addr.IpAddr
-                    cmd_class_fullname = "{}.{}".format(module_name, cmd_class_name)
-
-                    available_cmds.update({cmd_name: cmd_class_fullname})
-        return available_cmds
+        # package is walked once per process, result is shared by all devices and their states
+        return observers_registry.get_observers_of_package(package_name)
 
     def _get_observer_in_state(self, observer_name, observer_type, **kwargs):
         """Return Observable object assigned to obserber_name of given device"""
         # TODO: return observer object wrapped in decorator mocking it's start()
         # TODO:  to check it it is starting in correct state (do it on flag)
-        available_observer_names = []
-
-        if observer_type == TextualDevice.cmds:
-            available_observer_names = self._cmdnames_available_in_state[self.current_state]
-        elif observer_type == TextualDevice.events:
-            available_observer_names = self._eventnames_available_in_state[self.current_state]
-
-        if observer_name in available_observer_names:
-            # TODO: GL refactor to instance_loader
-            observer_splited = available_observer_names[observer_name].split('.')
-            observer_module_name = ".".join(observer_splited[:-1])
-            observer_class_name = observer_splited[-1]
-
-            observer_module = importlib.import_module(observer_module_name)
-            observer_class = getattr(observer_module, observer_class_name)
+        observer_class = self._get_observer_class_in_state(observer_name, observer_type, self.current_state)
+        if observer_class:
             observer = observer_class(connection=self.io_connection.moler_connection, **kwargs)
-
             return observer
 
         raise DeviceFailure(
@@ -290,6 +332,24 @@ class TextualDevice(object):
                 observer_type, observer_name, observer_type, observer_name, observer_type, self.current_state,
                 self.__class__.__name__))
 
+    def _get_observer_class_in_state(self, observer_name, observer_type, state):
+        """Return class of observer (its module is imported on first request) or None if unknown in state"""
+        key = (observer_type, state, observer_name)
+        try:
+            return self._observer_classes[key]
+        except KeyError:
+            pass
+        available_observer_names = {}
+        if observer_type == TextualDevice.cmds:
+            available_observer_names = self._cmdnames_available_in_state[state]
+        elif observer_type == TextualDevice.events:
+            available_observer_names = self._eventnames_available_in_state[state]
+        if observer_name not in available_observer_names:
+            return None
+        observer_class = load_class_from_class_fullname(available_observer_names[observer_name])
+        self._observer_classes[key] = observer_class
+        return observer_class
+
     def _create_cmd_instance(self, cmd_name, **kwargs):
         """
         CAUTION: it checks if cmd may be created in current_state of device
@@ -366,9 +426,11 @@ class TextualDevice(object):
         return cmd.start()
 
     def _collect_observer_for_state(self, observer_type, state):
+        packages = self._get_packages_for_state(state=state, observer=observer_type)
+        if len(packages) == 1:
+            return self._load_cmds_from_package(packages[0])  # read-only dict shared by all states using that package
         observer = dict()
-
-        for package_name in self._get_packages_for_state(state=state, observer=observer_type):
+        for package_name in packages:
             observer.update(self._load_cmds_from_package(package_name))
 
         return observer
@@ -397,6 +459,7 @@ class TextualDevice(object):
 
                 self.SM.add_state(dest_state)
                 self.SM.add_transitions(single_transition)
+                self._transitions.extend(single_transition)
 
     def _update_SM_states(self, state):
         if state not in self.states:
@@ -489,3 +552,15 @@ class TextualDevice(object):
         except Exception as ex:
             self.logger.debug("Cannot execute command 'enter' properly: {}".format(ex))
             pass
+
+
+def _hashable(value):
+    """Convert (nested) configuration into hashable form"""
+    if isinstance(value, dict):
+        return tuple(sorted((key, _hashable(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_hashable(item) for item in value)
+    return value
+
+
+observers_registry.register_dependent_cache(TextualDevice._shared_state_tables.clear)  # tables keep registry content
@@ -18,16 +18,17 @@ from moler.device.unixlocal import UnixLocal
 class UnixRemote(UnixLocal):
     unix_remote = "UNIX_REMOTE"
 
-    def __init__(self, io_connection=None, io_type=None, variant=None, sm_params=dict()):
+    def __init__(self, io_connection=None, io_type=None, variant=None, sm_params=dict(), runner=None):
         """
         Create Unix device communicating over io_connection
 
         :param io_connection: External-IO connection having embedded moler-connection
         :param io_type: External-IO connection connection type
         :param variant: External-IO connection variant
+        :param runner: runner used by all commands/events of device
         """
         super(UnixRemote, self).__init__(io_connection=io_connection, io_type=io_type, variant=variant,
-                                         sm_params=sm_params)
+                                         sm_params=sm_params, runner=runner)
         self.logger = logging.getLogger('moler.unixlocal')
 
     def _get_default_sm_configuration(self):
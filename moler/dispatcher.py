@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+"""
+Dispatcher decoupling external-IO thread from observers of connection.
+
+IO thread only puts data into bounded per-observer queues,
+dispatcher thread delivers it to observers (keeping order of data per observer).
+So, slow observer (heavy parser, slow event callback) doesn't stall reading from socket/pty.
+"""
+
+__author__ = 'Grzegorz Latuszek'
+__copyright__ = 'Copyright (C) 2018, Nokia'
+__email__ = 'grzegorz.latuszek@nokia.com'
+
+import logging
+import threading
+import time
+from collections import deque
+
+BLOCK = "block"  # producer waits for free place in queue - no data lost
+DROP_OLDEST = "drop_oldest"  # oldest not delivered data is dropped
+DROP_NEWEST = "drop_newest"  # incoming data is dropped
+
+overflow_policies = (BLOCK, DROP_OLDEST, DROP_NEWEST)
+
+
+class _ObserverQueue(object):
+    """Data awaiting delivery to single observer."""
+
+    def __init__(self, observer):
+        self.observer = observer
+        self.items = deque()
+        self.delivered = 0
+        self.dropped = 0
+        self.max_queued = 0
+
+
+class ObserversDispatcher(object):
+    def __init__(self, deliver, queue_size=1000, overflow_policy=BLOCK, name="moler-dispatcher"):
+        """
+        Create dispatcher and start its thread.
+
+        :param deliver: callable(observer, data) delivering data to observer (called inside dispatcher thread)
+        :param queue_size: max number of data items awaiting delivery to single observer
+        :param overflow_policy: what to do when queue of observer is full: "block", "drop_oldest" or "drop_newest"
+        :param name: name of dispatcher thread
+        """
+        super(ObserversDispatcher, self).__init__()
+        if overflow_policy not in overflow_policies:
+            raise ValueError("overflow_policy must be one of {} not '{}'".format(overflow_policies, overflow_policy))
+        if queue_size < 1:
+            raise ValueError("queue_size must be positive not {}".format(queue_size))
+        self.logger = logging.getLogger('moler.dispatcher')
+        self.queue_size = queue_size
+        self.overflow_policy = overflow_policy
+        self._deliver = deliver
+        self._condition = threading.Condition()
+        self._queues = {}  # observer_key --> _ObserverQueue
+        self._ready = deque()  # observer_keys having data to deliver (round-robin)
+        self._in_delivery = 0
+        self.blocked_count = 0  # how many times producer waited for free place in queue (backpressure)
+        self.blocked_time = 0.0
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name=name)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def put(self, observer_key, observer, data):
+        """
+        Put data into queue of observer.
+
+        :param observer_key: identifies observer
+        :param observer: passed to deliver()
+        :param data: data for that observer
+        """
+        with self._condition:
+            queue = self._queues.get(observer_key)
+            if queue is None:
+                queue = _ObserverQueue(observer)
+                self._queues[observer_key] = queue
+            if len(queue.items) >= self.queue_size:
+                if self.overflow_policy == DROP_NEWEST:
+                    queue.dropped += 1
+                    return
+                elif self.overflow_policy == DROP_OLDEST:
+                    queue.items.popleft()
+                    queue.dropped += 1
+                elif not self.in_dispatcher_thread():  # observer feeding connection can't wait for itself
+                    self._wait_for_free_place(observer_key, queue)
+                    if self._queues.get(observer_key) is not queue:  # removed meanwhile
+                        return
+            if not queue.items:
+                self._ready.append(observer_key)
+            queue.items.append(data)
+            queue.max_queued = max(queue.max_queued, len(queue.items))
+            self._condition.notify_all()
+
+    def remove(self, observer_key):
+        """
+        Remove queue of observer (not delivered data is dropped).
+
+        :param observer_key: identifies observer given to put()
+        """
+        with self._condition:
+            self._queues.pop(observer_key, None)
+            self._condition.notify_all()
+
+    def wait_for_delivery(self, timeout=None):
+        """
+        Wait till all queued data is delivered.
+
+        :param timeout: max time [sec] to wait (None - no limit)
+        :return: True if all data is delivered, False if timeout occurred
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        with self._condition:
+            while self._ready or self._in_delivery:
+                if deadline is None:
+                    self._condition.wait()
+                    continue
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+        return True
+
+    def stats(self):
+        """
+        Get backpressure metrics.
+
+        :return: list of dicts (one per observer queue) with observer, queued, max_queued, delivered, dropped
+        """
+        with self._condition:
+            return [{'observer': queue.observer, 'queued': len(queue.items), 'max_queued': queue.max_queued,
+                     'delivered': queue.delivered, 'dropped': queue.dropped}
+                    for queue in self._queues.values()]
+
+    def stop(self):
+        """Stop dispatcher thread (after delivering already queued data)."""
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        if not self.in_dispatcher_thread():
+            self._thread.join()
+
+    def in_dispatcher_thread(self):
+        return threading.current_thread() is self._thread
+
+    def _wait_for_free_place(self, observer_key, queue):
+        start_time = time.time()
+        self.blocked_count += 1
+        while (len(queue.items) >= self.queue_size) and self._running and (self._queues.get(observer_key) is queue):
+            self._condition.wait()
+        self.blocked_time += time.time() - start_time
+
+    def _next_delivery(self):
+        with self._condition:
+            while True:
+                while self._running and not self._ready:
+                    self._condition.wait()
+                if not self._ready:  # stopped and nothing more to deliver
+                    return None
+                observer_key = self._ready.popleft()
+                queue = self._queues.get(observer_key)
+                if (queue is None) or (not queue.items):  # removed meanwhile
+                    continue
+                data = queue.items.popleft()
+                if queue.items:
+                    self._ready.append(observer_key)
+                self._in_delivery += 1
+                self._condition.notify_all()  # there is free place in queue
+                return queue, data
+
+    def _run(self):
+        while True:
+            delivery = self._next_delivery()
+            if delivery is None:
+                break
+            queue, data = delivery
+            try:
+                self._deliver(queue.observer, data)
+            except Exception as err:
+                self.logger.exception("delivery to {} raised {!r}".format(queue.observer, err))
+            finally:
+                with self._condition:
+                    queue.delivered += 1
+                    self._in_delivery -= 1
+                    self._condition.notify_all()
+        self.logger.debug("stopped")
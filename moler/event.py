@@ -4,6 +4,10 @@ __author__ = 'Michal Ernst, Marcin Usielski'
 __copyright__ = 'Copyright (C) 2018, Nokia'
 __email__ = 'michal.ernst@nokia.com, marcin.usielski@nokia.com'
 
+from collections import deque
+from threading import Lock
+
+import moler.config.events as event_cfg
 from moler.connection_observer import ConnectionObserver
 from moler.exceptions import NoDetectPatternProvided, MolerException
 from moler.helpers import instance_id
@@ -19,9 +23,17 @@ class Event(ConnectionObserver):
         self.detect_patterns = []
         self.callback = None
         self.callback_params = dict()
-        self._occurred = []
+        self._occurred = deque()  # most recent occurrences (all of them if till_occurs_times limit is given)
+        self._occurred_count = 0
         self.till_occurs_times = till_occurs_times
+        self.history_size = event_cfg.history_size  # None - keep all occurrences
+        self.compact_occurrences = event_cfg.compact_occurrences
         self.event_name = Event.observer_name
+        self._callback_executor = None  # callback is called inline (inside thread feeding event with data)
+        self._batch_occurrences = False
+        self._pending_occurrences = deque()  # occurrences awaiting callback run by executor
+        self._pending_occurrences_lock = Lock()
+        self._callback_scheduled = False
 
     def __str__(self):
         detect_pattern = self.detect_pattern if not (self.detect_pattern is None) else ', '.join(self.detect_patterns)
@@ -55,21 +67,104 @@ class Event(ConnectionObserver):
     def remove_event_occurred_callback(self):
         self.callback = None
 
-    def notify(self):
-        if self.callback:
+    def set_callback_executor(self, executor, batch_occurrences=False):
+        """
+        Run callback by executor instead of thread feeding event with data (like connection's IO thread).
+        Callbacks of single event are run one by one in order of occurrences.
+
+        :param executor: concurrent.futures.Executor (None - run callback inline)
+        :param batch_occurrences: if True callback is called with list of occurrences gathered
+                                  since its previous call instead of being called once per occurrence
+        """
+        self._callback_executor = executor
+        self._batch_occurrences = batch_occurrences
+
+    def notify(self, occurrences=None):
+        """
+        Call callback of event.
+
+        :param occurrences: occurrences gathered since previous call (only if callback gets them in batches)
+        """
+        if self.callback and (occurrences is not None):
+            self.callback(occurrences)
+        elif self.callback:
             self.callback()
 
+    def _notify_safely(self, occurrences=None):
+        # same for callback called inline and by executor - its exception doesn't break thread calling it
+        try:
+            if occurrences is None:
+                self.notify()
+            else:
+                self.notify(occurrences)
+        except Exception as err:
+            self.logger.exception("callback of {} raised {!r}".format(self, err))
+
     def event_occurred(self, event_data):
         """Should be used to set final result"""
         if self.done():
             raise ResultAlreadySet(self)
         if self._occurred is None:
-            self._occurred = []
+            self._occurred = deque()
         self._occurred.append(event_data)
+        self._occurred_count += 1
         if self.till_occurs_times > 0:
             if len(self._occurred) >= self.till_occurs_times:
-                self.set_result(self._occurred)
-        self.notify()
+                self.set_result(list(self._occurred))
+        elif self.history_size is not None:
+            while len(self._occurred) > self.history_size:  # ring buffer - memory stays flat for permanent events
+                self._occurred.popleft()
+        if self._callback_executor is None:
+            self._notify_safely()
+        else:
+            self._schedule_callback(event_data)
+
+    def _schedule_callback(self, event_data):
+        with self._pending_occurrences_lock:
+            self._pending_occurrences.append(event_data)
+            if self._callback_scheduled:  # will be taken by already scheduled _run_callback()
+                return
+            self._callback_scheduled = True
+        self._submit_callback()
+
+    def _submit_callback(self):
+        try:
+            self._callback_executor.submit(self._run_callback)
+        except RuntimeError as err:  # executor is shut down
+            self.logger.warning("can't run callback of {}: {!r}".format(self, err))
+            with self._pending_occurrences_lock:
+                self._pending_occurrences.clear()
+                self._callback_scheduled = False
+
+    def _run_callback(self):
+        while True:
+            with self._pending_occurrences_lock:
+                if not self._pending_occurrences:
+                    self._callback_scheduled = False
+                    return
+                if self._batch_occurrences:
+                    occurrences = list(self._pending_occurrences)
+                    self._pending_occurrences.clear()
+                else:
+                    self._pending_occurrences.popleft()
+                    occurrences = None
+            self._notify_safely(occurrences)
+
+    def get_occurrences(self):
+        """
+        Get most recent occurrences of event.
+
+        :return: list of occurrences (at most history_size of them if till_occurs_times limit is not given)
+        """
+        return list(self._occurred)
+
+    def occurrences_count(self):
+        """
+        Get number of occurrences of event.
+
+        :return: number of all occurrences (including ones already dropped from history)
+        """
+        return self._occurred_count
 
     def compile_patterns(self, patterns):
         compiled_patterns = []
@@ -8,6 +8,7 @@ __author__ = 'Marcin Usielski'
 __copyright__ = 'Copyright (C) 2018, Nokia'
 __email__ = 'marcin.usielski@nokia.com'
 
+import threading
 import time
 
 
@@ -19,41 +20,69 @@ class EventAwaiter(object):
         Wait for all events are done or timeout occurs
         :param timeout: time in seconds
         :param events: list of events to check
-        :param interval: interval in seconds between checking events
+        :param interval: not used - awaiter is woken up by events becoming done (kept for backward compatibility)
         :return: True if all events are done, False otherwise
         """
-        grand_timeout = timeout
-        start_time = time.time()
-        all_done = True
-        while timeout >= 0:
-            time.sleep(interval)
-            all_done = True
-            for event in events:
-                if not event.done():
-                    all_done = False
-                    break
-            timeout = grand_timeout - (time.time() - start_time)
-        return all_done
+        _, not_done_events = EventAwaiter.wait(timeout=timeout, events=events)
+        return not not_done_events
 
     @staticmethod
     def wait_for_any(timeout, events, interval=0.001):
         """
         :param timeout: time in seconds
         :param events: list of events to check
-        :param interval: interval in seconds between checking events
+        :param interval: not used - awaiter is woken up by events becoming done (kept for backward compatibility)
         :return: True if any event is done, False otherwise
         """
-        grand_timeout = timeout
-        start_time = time.time()
-        any_done = False
-        while timeout >= 0 and not any_done:
-            time.sleep(interval)
+        done_events, _ = EventAwaiter.wait(timeout=timeout, events=events, return_when_any=True)
+        return len(done_events) > 0
+
+    @staticmethod
+    def wait(timeout, events, return_when_any=False):
+        """
+        Wait for all (or any) events are done or timeout occurs.
+        Returns immediately when condition is met - awaiter is notified by events becoming done
+        (via set_result(), set_exception() or cancel()).
+        :param timeout: time in seconds
+        :param events: list of events (any connection-observers) to wait for
+        :param return_when_any: if True then wait for first done event, otherwise wait for all of them
+        :return: tuple. 0th element is list of done events (already done ones first, then in order of becoming done),
+                 1st element is list of non done events
+        """
+        condition = threading.Condition()
+        done_events = list()
+        done_ids = set()
+
+        def on_event_done(event):
+            with condition:
+                if id(event) not in done_ids:
+                    done_ids.add(id(event))
+                    done_events.append(event)
+                condition.notify()
+
+        awaited_ids = set(id(event) for event in events)
+
+        def condition_met():
+            if return_when_any:
+                return len(done_ids) > 0
+            return len(done_ids) == len(awaited_ids)
+
+        for event in events:
+            event.add_done_callback(on_event_done)
+        try:
+            deadline = time.time() + timeout
+            with condition:
+                while not condition_met():
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        break
+                    condition.wait(remaining)
+                done = list(done_events)
+                not_done = [event for event in events if id(event) not in done_ids]
+        finally:
             for event in events:
-                if event.done():
-                    any_done = True
-                    break
-            timeout = grand_timeout - (time.time() - start_time)
-        return any_done
+                event.remove_done_callback(on_event_done)
+        return done, not_done
 
     @staticmethod
     def separate_done_events(events):
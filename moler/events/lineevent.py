@@ -6,21 +6,53 @@ __email__ = 'marcin.usielski@nokia.com'
 
 
 from moler.events.textualevent import TextualEvent
+from moler.events.linematcher import get_line_matcher
+from moler.helpers import overrides_any_method
 import re
 import time
+from collections import namedtuple
+
+LineOccurrence = namedtuple('LineOccurrence', ['line', 'time'])  # compact record of occurrence
 
 
 class LineEvent(TextualEvent):
     def __init__(self, connection=None, till_occurs_times=-1):
         super(LineEvent, self).__init__(connection=connection, till_occurs_times=till_occurs_times)
         self.process_full_lines_only = False
+        self._line_matcher = None  # LineMatcher of connection if it matches lines for this event
 
     def on_new_line(self, line, is_full_line):
         if is_full_line or not self.process_full_lines_only:
             for pattern in self.detect_patterns:
                 if re.search(pattern, line):
-                    current_ret = dict()
-                    current_ret["line"] = line
-                    current_ret["time"] = time.time()
-                    self.event_occurred(event_data=current_ret)
+                    self._line_matched(line)
                     return
+
+    def _line_matched(self, line):
+        if self.compact_occurrences:
+            self.event_occurred(event_data=LineOccurrence(line, time.time()))
+            return
+        current_ret = dict()
+        current_ret["line"] = line
+        current_ret["time"] = time.time()
+        self.event_occurred(event_data=current_ret)
+
+    def subscribe_for_data(self):
+        """
+        Subscribe for data of own connection.
+        If possible, patterns are matched by LineMatcher combining patterns of all LineEvents of connection.
+        """
+        if hasattr(self.connection, 'subscribe_lines') and not overrides_any_method(
+                self, LineEvent, ['data_received', 'lines_received', 'is_new_line', 'on_new_line']):
+            self._line_matcher = get_line_matcher(self.connection, self._new_line_chars)
+            self._line_matcher.register(self)
+        else:
+            super(LineEvent, self).subscribe_for_data()
+
+    def unsubscribe_from_data(self):
+        """Unsubscribe from data of own connection (reverts subscribe_for_data())."""
+        if self._line_matcher is not None:
+            self._line_matcher.unregister(self)
+            self._line_matcher = None
+        else:
+            super(LineEvent, self).unsubscribe_from_data()
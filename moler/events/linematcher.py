@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+"""
+Combined matcher of line patterns of many LineEvents observing same connection.
+
+Instead of each LineEvent being separate lines-observer searching its every pattern in every line
+LineMatcher is single lines-observer of connection that:
+- checks literal prefixes of all patterns (cheap string operations, no regexp run),
+- searches line once with all remaining patterns combined into single regexp,
+- runs patterns of owning events only when above checks allow the line to match,
+- dispatches match back to owning event.
+
+So, device with many states (each having its Wait4prompt) scans each line once
+instead of once per pattern per event.
+"""
+
+__author__ = 'Grzegorz Latuszek'
+__copyright__ = 'Copyright (C) 2018, Nokia'
+__email__ = 'grzegorz.latuszek@nokia.com'
+
+import re
+import threading
+import weakref
+from collections import namedtuple
+
+import six
+
+_matchers = weakref.WeakKeyDictionary()  # connection --> {new_line_chars: LineMatcher}
+_matchers_lock = threading.Lock()
+
+_regexp_special_chars = '.^$*+?{}[]()|\\'
+_quantifier_chars = '*+?{'
+
+_LinePattern = namedtuple('_LinePattern', ['regexp', 'prefix', 'anchored', 'combinable'])
+
+
+def literal_prefix(regexp):
+    """
+    Find literal text that must start any match of regexp.
+
+    :param regexp: compiled regular expression
+    :return: tuple (prefix, anchored); anchored means prefix must start the line; prefix is '' if not found
+    """
+    pattern = regexp.pattern
+    if not isinstance(pattern, six.string_types):
+        return '', False
+    if (regexp.flags & (re.IGNORECASE | re.VERBOSE)) or ('|' in pattern):
+        return '', False  # literal text is not taken literally or is just one of alternatives
+    anchored = pattern.startswith('^') and not (regexp.flags & re.MULTILINE)
+    idx = 1 if pattern.startswith('^') else 0
+    prefix = []
+    while idx < len(pattern):
+        char = pattern[idx]
+        if char == '\\':
+            escaped = pattern[idx + 1:idx + 2]
+            if not escaped or escaped.isalnum():  # \d, \s, \A, \1, ... are not literals
+                break
+            char_len = 2
+            char = escaped
+        elif char in _regexp_special_chars:
+            break
+        else:
+            char_len = 1
+        next_char = pattern[idx + char_len:idx + char_len + 1]
+        if next_char and next_char in _quantifier_chars:
+            if next_char == '+':  # at least one occurrence
+                prefix.append(char)
+            break
+        prefix.append(char)
+        idx += char_len
+    return ''.join(prefix), anchored
+
+
+def is_combinable(regexp):
+    """
+    Check if regexp may be combined with other ones into single regexp.
+    Back-references use group numbers/names that change after combining.
+
+    :param regexp: compiled regular expression
+    :return: True if regexp may be combined
+    """
+    return not re.search(r'\\[1-9]|\(\?P=|\(\?\(', regexp.pattern)
+
+
+def get_line_matcher(connection, new_line_chars):
+    """
+    Return LineMatcher shared by all LineEvents of given connection (create it if needed).
+
+    :param connection: connection observed by LineEvents
+    :param new_line_chars: characters ending line
+    :return: LineMatcher
+    """
+    new_line_chars = tuple(new_line_chars)
+    with _matchers_lock:
+        if connection not in _matchers:
+            _matchers[connection] = dict()
+        connection_matchers = _matchers[connection]
+        if new_line_chars not in connection_matchers:
+            connection_matchers[new_line_chars] = LineMatcher(connection, new_line_chars)
+        return connection_matchers[new_line_chars]
+
+
+class LineMatcher(object):
+    def __init__(self, connection, new_line_chars):
+        """
+        Create matcher of lines of connection.
+
+        :param connection: connection providing subscribe_lines()
+        :param new_line_chars: characters ending line
+        """
+        super(LineMatcher, self).__init__()
+        self._connection = weakref.ref(connection)  # connection is key of _matchers so can't be kept alive here
+        self.new_line_chars = tuple(new_line_chars)
+        self._lock = threading.Lock()
+        # (events with their _LinePatterns, combined regexps - one per flags, ids of events)
+        # replaced (never modified) since used while dispatching
+        self._matching = (tuple(), tuple(), frozenset())
+        self._subscribed = False
+
+    def register(self, event):
+        """
+        Start matching patterns of event (event.detect_patterns have to be compiled already).
+
+        :param event: LineEvent
+        """
+        patterns = tuple(self._line_pattern(regexp) for regexp in event.detect_patterns)
+        with self._lock:
+            events, _, registered = self._matching
+            if id(event) in registered:
+                return
+            self._update(events + ((event, patterns),))
+            connection = self._connection()
+            if connection is not None and not self._subscribed:
+                connection.subscribe_lines(self.lines_received, new_line_chars=self.new_line_chars)
+                self._subscribed = True
+
+    def unregister(self, event):
+        """
+        Stop matching patterns of event.
+
+        :param event: LineEvent given to register()
+        """
+        with self._lock:
+            events, _, _ = self._matching
+            events = tuple(entry for entry in events if entry[0] is not event)
+            self._update(events)
+            if self._subscribed and not events:
+                connection = self._connection()
+                if connection is not None:
+                    connection.unsubscribe_lines(self.lines_received)
+                self._subscribed = False
+
+    def lines_received(self, lines):
+        """
+        Match lines with patterns of all registered events.
+
+        :param lines: LineRecords (line, is_full_line, continued_at)
+        :return: Nothing
+        """
+        events, combined_regexps, _ = self._matching
+        for line, is_full_line, continued_at in lines:
+            _, _, registered = self._matching  # callbacks of events matching previous line might unregister some
+            lines_to_match = dict()  # line not parsed yet --> events; most often all events share same line
+            for event, patterns in events:
+                if (id(event) not in registered) or event.done():
+                    continue
+                event_line = event._line_not_parsed_yet(line, is_full_line, continued_at)
+                if is_full_line or not event.process_full_lines_only:
+                    lines_to_match.setdefault(event_line, []).append((event, patterns))
+            for event_line, events_patterns in lines_to_match.items():
+                self._match(event_line, events_patterns, combined_regexps)
+
+    @staticmethod
+    def _match(line, events_patterns, combined_regexps):
+        rejected_by_combined = None  # single search with combined regexps is made only when needed
+        for event, patterns in events_patterns:
+            for pattern in patterns:
+                if pattern.prefix:
+                    if pattern.anchored:
+                        if not line.startswith(pattern.prefix):
+                            continue
+                    elif pattern.prefix not in line:
+                        continue
+                if pattern.combinable:
+                    if rejected_by_combined is None:
+                        rejected_by_combined = not any(combined.search(line) for combined in combined_regexps)
+                    if rejected_by_combined:
+                        continue
+                if pattern.regexp.search(line):
+                    event._line_matched(line)
+                    break
+
+    def _update(self, events):
+        combined_regexps = []
+        for flags, regexps in self._combinable_regexps(events).items():
+            try:
+                combined = re.compile('|'.join('(?:{})'.format(regexp) for regexp in regexps), flags)
+            except (re.error, AssertionError, OverflowError):  # ex. same group names (or too many groups in Python 2)
+                events = tuple((event, tuple(pattern._replace(combinable=False) if pattern.regexp.flags == flags
+                                             else pattern for pattern in patterns))
+                               for event, patterns in events)
+                continue
+            combined_regexps.append(combined)
+        self._matching = (events, tuple(combined_regexps), frozenset(id(event) for event, _ in events))
+
+    @staticmethod
+    def _combinable_regexps(events):
+        regexps_per_flags = dict()
+        for _, patterns in events:
+            for pattern in patterns:
+                if pattern.combinable:
+                    regexps_per_flags.setdefault(pattern.regexp.flags, []).append(pattern.regexp.pattern)
+        return regexps_per_flags
+
+    @staticmethod
+    def _line_pattern(regexp):
+        prefix, anchored = literal_prefix(regexp)
+        return _LinePattern(regexp, prefix, anchored, is_combinable(regexp))
@@ -5,6 +5,7 @@ __copyright__ = 'Copyright (C) 2018, Nokia'
 __email__ = 'marcin.usielski@nokia.com'
 
 from moler.event import Event
+from moler.helpers import overrides_any_method
 
 
 class TextualEvent(Event):
@@ -14,6 +15,7 @@ class TextualEvent(Event):
         super(TextualEvent, self).__init__(connection=connection, till_occurs_times=till_occurs_times)
         self._last_not_full_line = None
         self._new_line_chars = TextualEvent._default_new_line_chars
+        self._lines_subscribed = False  # True if connection delivers data already split into lines
 
     def event_occurred(self, event_data):
         self._consume_already_parsed_fragment()
@@ -47,6 +49,53 @@ class TextualEvent(Event):
                 self._last_not_full_line = line
             self.on_new_line(line, is_full_line)
 
+    def lines_received(self, lines):
+        """
+        Called by connection with received data already split into lines (shared by all lines-observers)
+        :param lines: LineRecords (line, is_full_line, continued_at)
+        :return: Nothing
+        """
+        for line, is_full_line, continued_at in lines:
+            line = self._line_not_parsed_yet(line, is_full_line, continued_at)
+            self.on_new_line(line, is_full_line)
+
+    def _line_not_parsed_yet(self, line, is_full_line, continued_at):
+        """
+        Take from LineRecord that part of line which was not parsed yet by this event
+        :param line: line of LineRecord
+        :param is_full_line: True if line is ended by new line chars
+        :param continued_at: where line continues previously delivered not full line
+        :return: line to be parsed by on_new_line()
+        """
+        if self._last_not_full_line is not None:  # we have seen part of that line
+            continued_at = max(continued_at - len(self._last_not_full_line), 0)
+        line = line[continued_at:]
+        if is_full_line:
+            self._last_not_full_line = None
+            line = self._strip_new_lines_chars(line)
+        else:
+            self._last_not_full_line = line
+        return line
+
+    def subscribe_for_data(self):
+        """
+        Subscribe for data of own connection.
+        If possible, data is taken split into lines by connection (splitting shared with other observers).
+        """
+        self._lines_subscribed = hasattr(self.connection, 'subscribe_lines') and not overrides_any_method(
+            self, TextualEvent, ['data_received', 'is_new_line'])
+        if self._lines_subscribed:
+            self.connection.subscribe_lines(self.lines_received, new_line_chars=self._new_line_chars)
+        else:
+            super(TextualEvent, self).subscribe_for_data()
+
+    def unsubscribe_from_data(self):
+        """Unsubscribe from data of own connection (reverts subscribe_for_data())."""
+        if self._lines_subscribed:
+            self.connection.unsubscribe_lines(self.lines_received)
+        else:
+            super(TextualEvent, self).unsubscribe_from_data()
+
     def is_new_line(self, line):
         """
         Method to check if line has chars of new line at the right side
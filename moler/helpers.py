@@ -50,3 +50,50 @@ def remove_escape_codes(line):
     """
     line = re.sub(_re_escape_codes, "", line)
     return line
+
+
+def overrides_any_method(instance, base_class, method_names):
+    """
+    Check if class of instance provides own implementation of any given method of base_class.
+
+    :param instance: object to check
+    :param base_class: class defining (or inheriting) original methods
+    :param method_names: names of methods to check
+    :return: True if any method is overridden
+    """
+    for method_name in method_names:
+        for klass in type(instance).__mro__:
+            if method_name in klass.__dict__:  # most derived implementation
+                if klass not in base_class.__mro__:
+                    return True
+                break
+    return False
+
+
+class ReadOnlyDict(dict):
+    """Dict refusing modifications (to share it safely between objects)."""
+
+    def _refuse_modification(self, *args, **kwargs):
+        raise TypeError("'{}' object is read-only".format(self.__class__.__name__))
+
+    __setitem__ = __delitem__ = __ior__ = _refuse_modification
+    clear = pop = popitem = setdefault = update = _refuse_modification
+
+    def __reduce__(self):
+        return self.__class__, (dict(self),)  # copy() and deepcopy() give read-only dict too
+
+
+def freeze(value):
+    """
+    Return read-only copy of (nested) data: dicts become ReadOnlyDict, lists become tuples, sets become frozensets.
+    Other values are returned as they are.
+    """
+    if isinstance(value, ReadOnlyDict):
+        return value
+    if isinstance(value, dict):
+        return ReadOnlyDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(value)
+    return value
@@ -6,6 +6,8 @@ __email__ = 'maciej.pikula@nokia.com, grzegorz.latuszek@nokia.com'
 
 import importlib
 
+_loaded_classes = {}  # class fullname --> class object (module is imported on first request)
+
 # ------------------------------------ public API
 
 
@@ -29,9 +31,13 @@ def load_class_from_class_fullname(class_fullname):
     :param class_fullname: full name of class in dotted notation like 'package1.module1.ClassName1'
     :return: requested class object
     """
-    class_module_name, class_name = _split_to_module_and_class_name(class_fullname)
-    class_object = _load_class(module_name=class_module_name, class_name=class_name)
-    return class_object
+    try:
+        return _loaded_classes[class_fullname]
+    except KeyError:
+        class_module_name, class_name = _split_to_module_and_class_name(class_fullname)
+        class_object = _load_class(module_name=class_module_name, class_name=class_name)
+        _loaded_classes[class_fullname] = class_object
+        return class_object
 
 
 def create_class_instance(class_object, constructor_params):
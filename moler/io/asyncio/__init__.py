@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""
+External-IO connections based on asyncio (Python 3 only).
+
+All these connections share single event loop running inside single
+background thread. Transports/protocols of that loop forward received data
+directly into Moler's connection:
+
+    protocol.data_received(data) --> self.moler_connection.data_received(data)
+
+so many connections don't require many pulling threads.
+"""
+
+__author__ = 'Grzegorz Latuszek'
+__copyright__ = 'Copyright (C) 2018, Nokia'
+__email__ = 'grzegorz.latuszek@nokia.com'
+
+import asyncio
+import logging
+import threading
+
+_io_loop_thread = None
+_io_loop_thread_lock = threading.Lock()
+
+
+class AsyncioLoopThread(threading.Thread):
+    """Daemon thread running asyncio event loop for external-IO connections."""
+
+    def __init__(self, name="moler-asyncio-io"):
+        super(AsyncioLoopThread, self).__init__(name=name)
+        self.daemon = True
+        self.loop = asyncio.new_event_loop()
+        self.logger = logging.getLogger('moler.asyncio-io')
+
+    def run(self):
+        asyncio.set_event_loop(self.loop)
+        self.logger.debug("starting {!r}".format(self.loop))
+        self.loop.run_forever()
+
+    def run_async_coroutine(self, coroutine_to_run, timeout):
+        """
+        Run coroutine inside loop of this thread and wait for its result.
+
+        :param coroutine_to_run: coroutine object to run
+        :param timeout: max time (in float seconds) to wait for result
+        :return: result of coroutine
+        """
+        if self.in_loop_thread():
+            raise RuntimeError("Can't block event loop of {} awaiting {}".format(self, coroutine_to_run))
+        future = asyncio.run_coroutine_threadsafe(coroutine_to_run, loop=self.loop)
+        return future.result(timeout=timeout)
+
+    def in_loop_thread(self):
+        return threading.current_thread() is self
+
+
+def get_asyncio_loop_thread():
+    """Return thread running event loop shared by all asyncio connections (start it if needed)."""
+    global _io_loop_thread
+    with _io_loop_thread_lock:
+        if _io_loop_thread is None:
+            _io_loop_thread = AsyncioLoopThread()
+            _io_loop_thread.start()
+        return _io_loop_thread
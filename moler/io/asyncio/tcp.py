@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""
+External-IO TCP connection based on asyncio transport/protocol.
+
+Received data is forwarded into Moler's connection directly from event loop,
+there is no pulling thread per connection.
+"""
+
+__author__ = 'Grzegorz Latuszek'
+__copyright__ = 'Copyright (C) 2018, Nokia'
+__email__ = 'grzegorz.latuszek@nokia.com'
+
+import asyncio
+import socket
+import threading
+
+from moler.io.asyncio import get_asyncio_loop_thread
+from moler.io.io_connection import IOConnection
+from moler.io.io_exceptions import RemoteEndpointNotConnected
+
+
+class _MolerTcpProtocol(asyncio.Protocol):
+    """Protocol forwarding asyncio callbacks into AsyncioTcp (runs inside event loop)."""
+
+    def __init__(self, io_connection):
+        self.io_connection = io_connection
+
+    def data_received(self, data):
+        self.io_connection.data_received(data)
+
+    def connection_lost(self, exc):
+        self.io_connection._connection_lost(exc)
+
+
+class AsyncioTcp(IOConnection):
+    """
+    TCP connection feeding Moler's connection from inside asyncio event loop.
+
+    Event loop (and its thread) is shared by all asyncio connections.
+    """
+
+    def __init__(self, moler_connection, port, host="localhost", open_timeout=10.0, logger=None,
+                 tcp_nodelay=False, keepalive=False):
+        """
+        Initialization of asyncio TCP connection.
+
+        :param tcp_nodelay: set TCP_NODELAY (disable Nagle's algorithm) on socket
+        :param keepalive: set SO_KEEPALIVE on socket
+        """
+        super(AsyncioTcp, self).__init__(moler_connection=moler_connection)
+        self.host = host
+        self.port = port
+        self.open_timeout = open_timeout
+        self.tcp_nodelay = tcp_nodelay
+        self.keepalive = keepalive
+        self.logger = logger
+        self._loop_thread = get_asyncio_loop_thread()
+        self._transport = None
+        self._disconnected = threading.Event()
+
+    def open(self):
+        """Open TCP connection (connection is served by event loop)."""
+        if self._transport is not None:
+            return
+        self._debug('connecting to {}'.format(self))
+        self._disconnected.clear()
+        loop = self._loop_thread.loop
+        connecting = loop.create_connection(lambda: _MolerTcpProtocol(self), host=self.host, port=self.port)
+        self._transport, _ = self._loop_thread.run_async_coroutine(connecting, timeout=self.open_timeout)
+        connected_socket = self._transport.get_extra_info('socket')
+        if self.tcp_nodelay:
+            connected_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        if self.keepalive:
+            connected_socket.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        self._debug('connection {} is open'.format(self))
+        self._notify_on_connect()
+
+    def close(self):
+        """Close TCP connection."""
+        transport = self._transport
+        if transport is not None:
+            self._debug('closing {}'.format(self))
+            self._loop_thread.loop.call_soon_threadsafe(transport.close)
+            if not self._loop_thread.in_loop_thread():
+                self._disconnected.wait(timeout=self.open_timeout)
+        self._debug('connection {} is closed'.format(self))
+
+    def send(self, data):
+        """
+        Send data via TCP connection.
+
+        Write is scheduled into event loop; order of sent data is preserved.
+
+        :param data: data
+        :type data: bytes
+        """
+        transport = self._transport
+        if transport is None:
+            raise RemoteEndpointNotConnected()
+        self._loop_thread.loop.call_soon_threadsafe(transport.write, data)
+        self._debug('> {}'.format(data))
+
+    def data_received(self, data):
+        """Incoming data (called from inside event loop)."""
+        self._debug('< {}'.format(data))
+        self.moler_connection.data_received(data)
+
+    def _connection_lost(self, exc):
+        self._transport = None
+        self._disconnected.set()
+        self._debug('connection {} lost ({})'.format(self, exc if exc else "closed"))
+        self._notify_on_disconnect()
+
+    def __str__(self):
+        address = 'tcp://{}:{}'.format(self.host, self.port)
+        return address
+
+    def _debug(self, msg):
+        if self.logger:
+            self.logger.debug(msg)
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+External-IO terminal connection (shell under Pty) based on asyncio read-pipe.
+
+Works on Unix (like Linux) systems only!
+"""
+
+__author__ = 'Grzegorz Latuszek'
+__copyright__ = 'Copyright (C) 2018, Nokia'
+__email__ = 'grzegorz.latuszek@nokia.com'
+
+import asyncio
+import codecs
+import os
+import re
+from threading import Event
+
+from ptyprocess import PtyProcessUnicode
+
+from moler.io.asyncio import get_asyncio_loop_thread
+from moler.io.io_connection import IOConnection
+from moler.io.raw.terminal import ThreadedTerminal
+
+
+class _MolerTerminalProtocol(asyncio.Protocol):
+    """Protocol forwarding asyncio callbacks into AsyncioTerminal (runs inside event loop)."""
+
+    def __init__(self, io_connection):
+        self.io_connection = io_connection
+
+    def data_received(self, data):
+        self.io_connection.pty_data_received(data)
+
+    def connection_lost(self, exc):
+        self.io_connection._pty_closed()
+
+
+class AsyncioTerminal(IOConnection):
+    """
+    Works on Unix (like Linux) systems only!
+
+    AsyncioTerminal is shell working under Pty; output of Pty is read by event loop
+    shared by all asyncio connections.
+    """
+
+    def __init__(self, moler_connection, cmd=None, first_prompt=None, dimensions=(100, 300), open_timeout=2.0):
+        super(AsyncioTerminal, self).__init__(moler_connection=moler_connection)
+        self.dimensions = dimensions
+        self.open_timeout = open_timeout
+        self._loop_thread = get_asyncio_loop_thread()
+        self._terminal = None
+        self._transport = None
+        self._decoder = None
+        self._read_buffer = ""
+        self._shell_operable = Event()
+        if cmd is None:
+            cmd = ['/bin/bash', '--init-file']
+        self._cmd = ThreadedTerminal._build_bash_command(cmd)
+
+        if first_prompt:
+            self.prompt = first_prompt
+        else:
+            self.prompt = r'^moler_bash#'
+
+    def open(self):
+        """Open AsyncioTerminal connection & start reading it inside event loop."""
+        if not self._terminal:
+            self._terminal = PtyProcessUnicode.spawn(self._cmd, dimensions=self.dimensions)
+            self._decoder = codecs.getincrementaldecoder('utf-8')(errors='strict')
+            self._read_buffer = ""
+            self._shell_operable.clear()
+            pty_output = os.fdopen(os.dup(self._terminal.fd), 'rb', 0)
+            loop = self._loop_thread.loop
+            connecting = loop.connect_read_pipe(lambda: _MolerTerminalProtocol(self), pty_output)
+            self._transport, _ = self._loop_thread.run_async_coroutine(connecting, timeout=self.open_timeout)
+            self._shell_operable.wait(timeout=self.open_timeout)
+
+    def close(self):
+        """Close AsyncioTerminal connection & stop reading it."""
+        transport = self._transport
+        if transport is not None:
+            self._transport = None
+            self._loop_thread.loop.call_soon_threadsafe(transport.close)
+        super(AsyncioTerminal, self).close()
+
+        if self._terminal and self._terminal.isalive():
+            self._terminal.close()
+            self._terminal = None
+            self._notify_on_disconnect()
+
+    def send(self, data):
+        """Write data into AsyncioTerminal connection."""
+        self._terminal.write(data)
+
+    def pty_data_received(self, data):
+        """Bytes read from Pty (called from inside event loop)."""
+        data = self._decoder.decode(data)
+        if not data:
+            return
+        if self._shell_operable.is_set():
+            self.data_received(data)
+        else:
+            self._read_buffer = self._read_buffer + data
+            if re.search(self.prompt, self._read_buffer, re.MULTILINE):
+                self._notify_on_connect()
+                self._shell_operable.set()
+                data = re.sub(self.prompt, '', self._read_buffer, flags=re.MULTILINE)
+                self._read_buffer = ""
+                self.data_received(data)
+
+    def _pty_closed(self):
+        if self._transport is not None:  # not closed by us - shell has exited
+            self._transport = None
+            self._notify_on_disconnect()
@@ -21,7 +21,7 @@ __email__ = 'grzegorz.latuszek@nokia.com'
 import threading
 import time
 import logging
-from six.moves.queue import Queue, Empty
+from collections import deque
 
 from moler.io.io_connection import IOConnection
 from moler.io.raw import TillDoneThread
@@ -38,6 +38,9 @@ class FifoBuffer(IOConnection):
                            |/
 
     Usable for unit tests (manually inject what is expected).
+
+    Injected data is kept as queue of chunks (not single bytearray)
+    so read() costs proportionally to size of data read - not size of data kept in buffer.
     """
     def __init__(self, moler_connection, echo=True, name=None, logger_name=""):
         """
@@ -60,9 +63,17 @@ class FifoBuffer(IOConnection):
             self._name = moler_connection.name
         self.echo = echo
         self.logger = self._select_logger(logger_name, self._name, moler_connection)
-        self.buffer = bytearray()
+        self._chunks = deque()  # memoryviews of injected, not yet read data
+        self._buffered_size = 0
+        self._buffer_lock = threading.Lock()
         self.deferred_injections = []
 
+    @property
+    def buffer(self):
+        """Copy of data injected but not read yet"""
+        with self._buffer_lock:
+            return self._join_chunks(self._chunks)
+
     @property
     def name(self):
         """Get name of connection"""
@@ -139,9 +150,13 @@ class FifoBuffer(IOConnection):
     def _inject(self, data):
         """Add bytes to end of buffer"""
         if hasattr(data, '__iter__') or hasattr(data, '__getitem__'):
-            self.buffer.extend(data)
+            chunk = memoryview(bytes(bytearray(data)))
         else:
-            self.buffer.append(data)
+            chunk = memoryview(bytes(bytearray([data])))
+        if len(chunk) > 0:
+            with self._buffer_lock:
+                self._chunks.append(chunk)
+                self._buffered_size += len(chunk)
 
     def _inject_deferred(self):
         if self.deferred_injections:
@@ -164,20 +179,37 @@ class FifoBuffer(IOConnection):
 
     def read(self, bufsize=None):
         """Remove bytes from front of buffer"""
-        if bufsize is None:
-            size2read = len(self.buffer)
-        elif len(self.buffer) >= bufsize:
-            size2read = bufsize
-        else:
-            size2read = len(self.buffer)
+        with self._buffer_lock:
+            if (bufsize is None) or (bufsize > self._buffered_size):
+                size2read = self._buffered_size
+            else:
+                size2read = bufsize
+            chunks_read = []
+            remaining = size2read
+            while remaining > 0:
+                chunk = self._chunks[0]
+                if len(chunk) <= remaining:
+                    chunks_read.append(self._chunks.popleft())
+                    remaining -= len(chunk)
+                else:  # slicing memoryview doesn't copy data
+                    chunks_read.append(chunk[:remaining])
+                    self._chunks[0] = chunk[remaining:]
+                    remaining = 0
+            self._buffered_size -= size2read
         if size2read > 0:
-            data = self.buffer[:size2read]
-            self.buffer = self.buffer[size2read:]
+            data = self._join_chunks(chunks_read)
             self.data_received(data)
             return data
         else:
             return b''
 
+    @staticmethod
+    def _join_chunks(chunks):
+        data = bytearray()
+        for chunk in chunks:
+            data += chunk
+        return data
+
     receive = read  # just alias to make base class happy :-)
 
     def __str__(self):
@@ -195,6 +227,10 @@ class ThreadedFifoBuffer(FifoBuffer):
     This is external-IO usable for Moler since it has it's own runner
     (thread) that can work in background and pull data from FIFO-mem connection.
     Usable for integration tests.
+
+    Injecting and pulling threads are synchronized by condition variable:
+    pulling thread sleeps until something is injected and inject() returns
+    as soon as injected data is delivered into Moler's connection.
     """
 
     def __init__(self, moler_connection, echo=True, name=None, logger_name=""):
@@ -204,7 +240,10 @@ class ThreadedFifoBuffer(FifoBuffer):
                                                  name=name,
                                                  logger_name=logger_name)
         self.pulling_thread = None
-        self.injections = Queue()
+        self.injections = deque()
+        self._injections_condition = threading.Condition()
+        self._injected_count = 0
+        self._delivered_count = 0
 
     def open(self):
         """Start thread pulling data from FIFO buffer."""
@@ -220,6 +259,9 @@ class ThreadedFifoBuffer(FifoBuffer):
     def close(self):
         """Stop pulling thread."""
         if self.pulling_thread:
+            with self._injections_condition:
+                self.pulling_thread.done_event.set()
+                self._injections_condition.notify_all()  # pulling thread may wait for injections
             self.pulling_thread.join()
             self.pulling_thread = None
         super(ThreadedFifoBuffer, self).close()
@@ -234,27 +276,48 @@ class ThreadedFifoBuffer(FifoBuffer):
         :param delay: delay before each inject
         :return: None
         """
-        for data in input_bytes:
-            self.injections.put((data, delay))
-        if not delay:
-            time.sleep(0.05)  # give subsequent read() a chance to get data
+        self._put_injections([(data, delay) for data in input_bytes], await_delivery=not delay)
 
     def _inject_deferred(self):
         if self.deferred_injections:
-            for data, delay in self.deferred_injections:
-                self.injections.put((data, delay))
+            injections = self.deferred_injections
             self.deferred_injections = []
-            time.sleep(0.05)  # give subsequent read() a chance to get data
+            self._put_injections(injections, await_delivery=True)
+
+    def _put_injections(self, injections, await_delivery):
+        with self._injections_condition:
+            self.injections.extend(injections)
+            self._injected_count += len(injections)
+            awaited_count = self._injected_count
+            self._injections_condition.notify_all()
+            # give subsequent read() a chance to get data
+            # (can't wait for myself - inject() may be called from inside data_received() of pulling thread)
+            if await_delivery and self._is_pulling() and (threading.current_thread() is not self.pulling_thread):
+                while (self._delivered_count < awaited_count) and self._is_pulling():
+                    self._injections_condition.wait()
+
+    def _is_pulling(self):
+        pulling_thread = self.pulling_thread
+        return (pulling_thread is not None) and pulling_thread.is_alive() and not pulling_thread.done_event.is_set()
 
     def pull_data(self, pulling_done):
         """Pull data from FIFO buffer."""
-        while not pulling_done.is_set():
-            self.read()  # internally forwards to embedded Moler connection
-            try:
-                data, delay = self.injections.get_nowait()
+        try:
+            while not pulling_done.is_set():
+                with self._injections_condition:
+                    while (not self.injections) and (not pulling_done.is_set()):
+                        self._injections_condition.wait()
+                    if pulling_done.is_set():
+                        break
+                    data, delay = self.injections.popleft()
                 if delay:
                     time.sleep(delay)
                 self._inject(data)
-                self.injections.task_done()
-            except Empty:
-                time.sleep(0.01)  # give FIFO chance to get data
+                self.read()  # internally forwards to embedded Moler connection
+                with self._injections_condition:
+                    self._delivered_count += 1
+                    self._injections_condition.notify_all()
+        finally:
+            with self._injections_condition:
+                pulling_done.set()
+                self._injections_condition.notify_all()  # don't leave injecting threads waiting
@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+"""
+Reactor - single thread multiplexing many external-IO connections.
+
+Instead of one pulling thread per connection (each looping on select() with timeout)
+single reactor thread blocks on selector (epoll/kqueue/... - best one for given OS)
+watching file descriptors of all registered connections.
+When descriptor gets readable reactor calls its callback (inside reactor thread).
+Reactor is woken-up via wake-up pipe to apply (un)registrations and to stop.
+"""
+
+__author__ = 'Grzegorz Latuszek'
+__copyright__ = 'Copyright (C) 2018, Nokia'
+__email__ = 'grzegorz.latuszek@nokia.com'
+
+import logging
+import socket
+import threading
+from collections import deque
+from concurrent.futures import Future
+
+from moler.exceptions import WrongUsage
+
+try:
+    import selectors
+except ImportError:  # Python 2
+    import selectors2 as selectors
+
+_reactor = None
+_reactor_lock = threading.Lock()
+
+
+class Reactor(object):
+    def __init__(self, name="moler-reactor"):
+        """
+        Create reactor and start its thread.
+
+        :param name: name of reactor thread
+        """
+        super(Reactor, self).__init__()
+        self.logger = logging.getLogger('moler.reactor')
+        self._selector = selectors.DefaultSelector()
+        self._wakeup_reader, self._wakeup_writer = socket.socketpair()
+        self._wakeup_reader.setblocking(False)
+        self._wakeup_writer.setblocking(False)
+        self._selector.register(self._wakeup_reader, selectors.EVENT_READ, None)
+        self._requests = deque()  # (un)registrations to be applied inside reactor thread
+        self._requests_lock = threading.Lock()
+        self._accepting_requests = True  # False once stop() is requested
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name=name)
+        self._thread.daemon = True
+        self._thread.start()
+        self.logger.debug("started {}".format(name))
+
+    def register(self, fileobj, on_readable):
+        """
+        Start watching fileobj; on_readable() is called inside reactor thread when fileobj gets readable.
+
+        :param fileobj: socket, file or file descriptor
+        :param on_readable: callable without parameters
+        :raise WrongUsage: if reactor is stopped
+        """
+        self._request(self._register, fileobj, on_readable)
+
+    def unregister(self, fileobj):
+        """
+        Stop watching fileobj.
+        When returns (outside reactor thread) reactor won't touch fileobj anymore, so it may be closed.
+
+        :param fileobj: socket, file or file descriptor given to register()
+        """
+        self._request(self._unregister, fileobj)
+
+    def stop(self):
+        """Stop reactor thread (registered connections are not closed)."""
+        with self._requests_lock:
+            if not self._accepting_requests:
+                return
+            self._accepting_requests = False
+            self._requests.append((self._stop, (), Future()))  # the last one applied by reactor thread
+        self._wakeup()
+        if not self.in_reactor_thread():
+            self._thread.join()
+
+    def is_stopped(self):
+        """Check if reactor is stopped (or is stopping)."""
+        return not self._accepting_requests
+
+    def in_reactor_thread(self):
+        return threading.current_thread() is self._thread
+
+    def _request(self, action, *args):
+        if self.in_reactor_thread():
+            action(*args)
+            return
+        applied = Future()
+        with self._requests_lock:
+            accepted = self._accepting_requests
+            if accepted:
+                self._requests.append((action, args, applied))
+        if accepted:
+            self._wakeup()
+        else:
+            self._thread.join()
+            self._refuse_request(action, args, applied)
+        applied.result()  # raises if request was refused
+
+    def _refuse_request(self, action, args, applied):
+        if action == self._register:
+            applied.set_exception(WrongUsage("Can't register {} inside stopped {}".format(args[0], self._thread.name)))
+        else:
+            applied.set_result(None)  # stopped reactor doesn't watch anything - nothing more to unregister
+
+    def _wakeup(self):
+        try:
+            self._wakeup_writer.send(b'\x00')
+        except socket.error:  # pipe full - reactor is going to wake-up anyway (or pipe closed by stopped reactor)
+            pass
+
+    def _register(self, fileobj, on_readable):
+        self._selector.register(fileobj, selectors.EVENT_READ, on_readable)
+
+    def _unregister(self, fileobj):
+        try:
+            self._selector.unregister(fileobj)
+        except (KeyError, ValueError):  # not registered or already closed
+            pass
+
+    def _stop(self):
+        self._running = False
+
+    def _apply_requests(self):
+        while self._requests:
+            action, args, applied = self._requests.popleft()
+            try:
+                action(*args)
+            except Exception as err:
+                self.logger.warning("{} failed: {!r}".format(action.__name__, err))
+            applied.set_result(None)
+
+    def _drain_wakeup_pipe(self):
+        try:
+            while self._wakeup_reader.recv(4096):
+                pass
+        except socket.error:  # nothing more to read
+            pass
+
+    def _run(self):
+        try:
+            while self._running:
+                for key, _ in self._selector.select():
+                    if key.data is None:
+                        self._drain_wakeup_pipe()
+                        continue
+                    try:
+                        key.data()
+                    except Exception as err:
+                        self.logger.exception("callback of {} raised {!r}".format(key.fileobj, err))
+                self._apply_requests()
+        except Exception as err:
+            self.logger.exception("{} failed: {!r}".format(self._thread.name, err))
+        finally:
+            with self._requests_lock:  # reactor may die by error - stop it, so nobody waits for it anymore
+                self._accepting_requests = False
+                pending_requests = list(self._requests)
+                self._requests.clear()
+            for action, args, applied in pending_requests:
+                self._refuse_request(action, args, applied)
+            self._selector.close()
+            self._wakeup_reader.close()
+            self._wakeup_writer.close()
+            self.logger.debug("stopped")
+
+
+def get_reactor():
+    """Return reactor shared by all reactor-based connections (start it if needed or if previous one is stopped)."""
+    global _reactor
+    with _reactor_lock:
+        if (_reactor is None) or _reactor.is_stopped():
+            _reactor = Reactor()
+        return _reactor
@@ -24,6 +24,7 @@ from moler.io.io_exceptions import ConnectionTimeout
 from moler.io.io_exceptions import RemoteEndpointDisconnected
 from moler.io.io_exceptions import RemoteEndpointNotConnected
 from moler.io.raw import TillDoneThread
+from moler.io.raw.reactor import get_reactor
 
 # TODO: logging - want to know what happens on GIVEN connection
 # TODO: logging - rethink details
@@ -42,15 +43,29 @@ class Tcp(object):
 
     """
     def __init__(self, port, host="localhost", receive_buffer_size=64 * 4096,
-                 logger=None):
-        """Initialization of TCP connection."""
+                 logger=None, tcp_nodelay=False, keepalive=False):
+        """
+        Initialization of TCP connection.
+
+        :param port: port of TCP server
+        :param host: host of TCP server
+        :param receive_buffer_size: size of buffer (allocated once) used by each receive
+        :param logger: logger to log connection details
+        :param tcp_nodelay: set TCP_NODELAY (disable Nagle's algorithm) on socket
+        :param keepalive: set SO_KEEPALIVE on socket
+        """
         super(Tcp, self).__init__()
         # TODO: do we want connection.name?
         self.host = host
         self.port = port
         self.receive_buffer_size = receive_buffer_size
+        self.tcp_nodelay = tcp_nodelay
+        self.keepalive = keepalive
         self.logger = logger  # TODO: build default logger if given is None?
         self.socket = None
+        self._receive_buffer = bytearray(receive_buffer_size)
+        self._receive_view = memoryview(self._receive_buffer)
+        self._send_lock = threading.Lock()  # sendall() may need many send() calls
 
     def open(self):
         """Open TCP connection."""
@@ -59,6 +74,10 @@ class Tcp(object):
         if sys.platform.startswith('java'):  # Program runs under Jython
             blocking = 0  # Jython  limitation
         self.socket.setblocking(blocking)
+        if self.tcp_nodelay:
+            self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        if self.keepalive:
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
         self._debug('connecting to {}'.format(self))
         self.socket.connect((self.host, self.port))
         self._debug('connection {} is open'.format(self))
@@ -83,21 +102,25 @@ class Tcp(object):
         """
         Send data via TCP service.
 
+        Whole data is sent (no partial writes). Data sent concurrently by many threads
+        is not interleaved - each thread sends its data by own sendall() and gets its own error.
+
         :param data: data
         :type data: str
         """
-        try:
-            self.socket.send(data)
-            # TODO: rework logging to have LogRecord with extra=direction
-            # TODO: separate data sent/received from other log records ?
-            self._debug('> {}'.format(data))
-        except socket.error as serr:
-            if (serr.errno == 10054) or (serr.errno == 10053):
-                self._close_ignoring_exceptions()
-                info = "{} during send msg '{}'".format(serr.errno, data)
-                raise RemoteEndpointDisconnected('Socket error: ' + info)
-            else:
-                raise
+        with self._send_lock:
+            try:
+                self.socket.sendall(data)
+                # TODO: rework logging to have LogRecord with extra=direction
+                # TODO: separate data sent/received from other log records ?
+                self._debug('> {}'.format(data))
+            except socket.error as serr:
+                if (serr.errno == 10054) or (serr.errno == 10053):
+                    self._close_ignoring_exceptions()
+                    info = "{} during send msg '{}'".format(serr.errno, data)
+                    raise RemoteEndpointDisconnected('Socket error: ' + info)
+                else:
+                    raise
 
     def receive(self, timeout=30):
         """
@@ -111,7 +134,9 @@ class Tcp(object):
         ready = select.select([self.socket], [], [], timeout)
         if ready[0]:
             try:
-                data = self.socket.recv(self.receive_buffer_size)
+                # reuse preallocated buffer instead of allocating receive_buffer_size bytes on each recv()
+                nbytes = self.socket.recv_into(self._receive_buffer)
+                data = self._receive_view[:nbytes].tobytes()
                 # TODO: rework logging to have LogRecord with extra=direction
                 # TODO: separate data sent/received from other log records ?
                 self._debug('< {}'.format(data))
@@ -159,11 +184,12 @@ class ThreadedTcp(Tcp):
 
     def __init__(self, moler_connection,
                  port, host="localhost", receive_buffer_size=64 * 4096,
-                 logger=None):
+                 logger=None, tcp_nodelay=False, keepalive=False):
         """Initialization of TCP-threaded connection."""
         super(ThreadedTcp, self).__init__(port=port, host=host,
                                           receive_buffer_size=receive_buffer_size,
-                                          logger=logger)
+                                          logger=logger, tcp_nodelay=tcp_nodelay,
+                                          keepalive=keepalive)
         self.pulling_thread = None
         # make Moler happy (3 requirements) :-)
         self.moler_connection = moler_connection  # (1)
@@ -201,3 +227,58 @@ class ThreadedTcp(Tcp):
                 break
         if self.socket is not None:
             self._close_ignoring_exceptions()
+
+
+class ReactorTcp(Tcp):
+    """
+    TCP connection feeding Moler's connection from inside reactor thread.
+
+    Reactor (single thread) is shared by all reactor-based connections
+    so there is no pulling thread per connection.
+    """
+
+    def __init__(self, moler_connection,
+                 port, host="localhost", receive_buffer_size=64 * 4096,
+                 logger=None, tcp_nodelay=False, keepalive=False, reactor=None):
+        """Initialization of TCP connection served by reactor."""
+        super(ReactorTcp, self).__init__(port=port, host=host,
+                                         receive_buffer_size=receive_buffer_size,
+                                         logger=logger, tcp_nodelay=tcp_nodelay,
+                                         keepalive=keepalive)
+        self._given_reactor = reactor
+        self.reactor = reactor  # shared one (if not given) is taken on open() - previous one might be stopped meanwhile
+        # make Moler happy (3 requirements) :-)
+        self.moler_connection = moler_connection  # (1)
+        self.moler_connection.how2send = self.send  # (2)
+
+    def open(self):
+        """Open TCP connection & register it inside reactor."""
+        super(ReactorTcp, self).open()
+        self.reactor = self._given_reactor or get_reactor()
+        try:
+            self.reactor.register(self.socket, self.pull_data)
+        except Exception:
+            super(ReactorTcp, self).close()
+            raise
+
+    def close(self):
+        """Unregister TCP connection from reactor & close it."""
+        if self.socket is not None:
+            self.reactor.unregister(self.socket)
+        super(ReactorTcp, self).close()
+
+    def pull_data(self):
+        """Pull data from TCP connection (called by reactor when socket is readable)."""
+        try:
+            data = self.receive(timeout=0)
+            # make Moler happy :-)
+            self.moler_connection.data_received(data)  # (3)
+        except ConnectionTimeout:  # spurious wake-up
+            pass
+        except (RemoteEndpointNotConnected, RemoteEndpointDisconnected):
+            self._debug('connection {} is closed by remote endpoint'.format(self))
+
+    def _close_ignoring_exceptions(self):
+        if self.socket is not None:
+            self.reactor.unregister(self.socket)
+        super(ReactorTcp, self)._close_ignoring_exceptions()
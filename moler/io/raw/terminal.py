@@ -11,6 +11,7 @@ from ptyprocess import PtyProcessUnicode
 
 from moler.io.io_connection import IOConnection
 from moler.io.raw import TillDoneThread
+from moler.io.raw.reactor import get_reactor
 
 
 class ThreadedTerminal(IOConnection):
@@ -20,15 +21,30 @@ class ThreadedTerminal(IOConnection):
     ThreadedTerminal is shell working under Pty
     """
 
-    def __init__(self, moler_connection, cmd=None, select_timeout=0.002,
-                 read_buffer_size=4096, first_prompt=None, dimensions=(100, 300)):
+    def __init__(self, moler_connection, cmd=None, select_timeout=None,
+                 read_buffer_size=4096, first_prompt=None, dimensions=(100, 300),
+                 max_read_buffer_size=64 * 4096):
+        """
+        :param moler_connection: Moler's connection to forward data into
+        :param cmd: command (as list) starting shell
+        :param select_timeout: max time of single wait for data; None means block until data or close()
+        :param read_buffer_size: initial (and minimal) size of single read from Pty
+        :param first_prompt: regexp of shell prompt indicating terminal is operable
+        :param dimensions: (rows, cols) of Pty
+        :param max_read_buffer_size: read size limit when adapting to bulk output
+        """
         super(ThreadedTerminal, self).__init__(moler_connection=moler_connection)
         self._select_timeout = select_timeout
+        self._min_read_buffer_size = read_buffer_size
+        self._max_read_buffer_size = max(read_buffer_size, max_read_buffer_size)
         self._read_buffer_size = read_buffer_size
+        self._wakeup_reader = None
+        self._wakeup_writer = None
         self.dimensions = dimensions
         self._terminal = None
         self.pulling_thread = None
         self._shell_operable = Event()
+        self._read_buffer = ""
         if cmd is None:
             cmd = ['/bin/bash', '--init-file']
         self._cmd = ThreadedTerminal._build_bash_command(cmd)
@@ -42,6 +58,8 @@ class ThreadedTerminal(IOConnection):
         """Open ThreadedTerminal connection & start thread pulling data from it."""
         if not self._terminal:
             self._terminal = PtyProcessUnicode.spawn(self._cmd, dimensions=self.dimensions)
+            self._read_buffer = ""
+            self._wakeup_reader, self._wakeup_writer = os.pipe()
             done = Event()
             self.pulling_thread = TillDoneThread(target=self.pull_data,
                                                  done_event=done,
@@ -52,8 +70,14 @@ class ThreadedTerminal(IOConnection):
     def close(self):
         """Close ThreadedTerminal connection & stop pulling thread."""
         if self.pulling_thread:
+            self.pulling_thread.done_event.set()
+            os.write(self._wakeup_writer, b'\x00')  # pulling thread may block on select()
             self.pulling_thread.join()
             self.pulling_thread = None
+        if self._wakeup_writer is not None:
+            os.close(self._wakeup_reader)
+            os.close(self._wakeup_writer)
+            self._wakeup_reader = self._wakeup_writer = None
         super(ThreadedTerminal, self).close()
 
         if self._terminal and self._terminal.isalive():
@@ -67,29 +91,90 @@ class ThreadedTerminal(IOConnection):
 
     def pull_data(self, pulling_done):
         """Pull data from ThreadedTerminal connection."""
-        read_buffer = ""
-
         while not pulling_done.is_set():
-            reads, _, _ = select.select([self._terminal.fd], [], [], self._select_timeout)
+            reads, _, _ = select.select([self._terminal.fd, self._wakeup_reader], [], [], self._select_timeout)
             if self._terminal.fd in reads:
                 try:
-                    data = self._terminal.read(self._read_buffer_size)
-                    if self._shell_operable.is_set():
-                        self.data_received(data)
-                    else:
-                        read_buffer = read_buffer + data
-                        if re.search(self.prompt, read_buffer, re.MULTILINE):
-                            self._notify_on_connect()
-                            self._shell_operable.set()
-                            data = re.sub(self.prompt, '', read_buffer, re.MULTILINE)
-                            self.data_received(data)
+                    data = self._read_terminal()
+                    self._data_pulled(data)
                 except EOFError:
                     self._notify_on_disconnect()
                     pulling_done.set()
 
+    def _read_terminal(self):
+        """
+        Read from Pty adapting size of single read to the flow of data:
+        bulk output (read fills whole buffer) doubles the size, sparse output shrinks it back.
+        """
+        data = self._terminal.read(self._read_buffer_size)
+        if len(data) >= self._read_buffer_size:
+            self._read_buffer_size = min(self._read_buffer_size * 2, self._max_read_buffer_size)
+        elif len(data) < self._read_buffer_size // 4:
+            self._read_buffer_size = max(self._read_buffer_size // 2, self._min_read_buffer_size)
+        return data
+
+    def _data_pulled(self, data):
+        if self._shell_operable.is_set():
+            self.data_received(data)
+        else:
+            self._read_buffer = self._read_buffer + data
+            if re.search(self.prompt, self._read_buffer, re.MULTILINE):
+                self._notify_on_connect()
+                self._shell_operable.set()
+                data = re.sub(self.prompt, '', self._read_buffer, flags=re.MULTILINE)
+                self._read_buffer = ""
+                self.data_received(data)
+
     @staticmethod
     def _build_bash_command(bash_cmd):
         abs_path = os.path.dirname(__file__)
         init_file_path = [os.path.join(abs_path, "..", "..", "config", "bash_config")]
 
         return bash_cmd + init_file_path
+
+
+class ReactorTerminal(ThreadedTerminal):
+    """
+    Works on Unix (like Linux) systems only!
+
+    ReactorTerminal is shell working under Pty; output of Pty is pulled by reactor thread
+    shared by all reactor-based connections (no pulling thread per terminal).
+    """
+
+    def __init__(self, moler_connection, cmd=None, read_buffer_size=4096,
+                 first_prompt=None, dimensions=(100, 300), reactor=None):
+        super(ReactorTerminal, self).__init__(moler_connection=moler_connection, cmd=cmd,
+                                              read_buffer_size=read_buffer_size, first_prompt=first_prompt,
+                                              dimensions=dimensions)
+        self._given_reactor = reactor
+        self.reactor = reactor  # shared one (if not given) is taken on open() - previous one might be stopped meanwhile
+        self._registered = False
+
+    def open(self):
+        """Open ReactorTerminal connection & register it inside reactor."""
+        if not self._terminal:
+            self._terminal = PtyProcessUnicode.spawn(self._cmd, dimensions=self.dimensions)
+            self._read_buffer = ""
+            self._registered = True
+            self.reactor = self._given_reactor or get_reactor()
+            self.reactor.register(self._terminal.fd, self.pull_data)
+            self._shell_operable.wait(timeout=2)
+
+    def close(self):
+        """Unregister ReactorTerminal connection from reactor & close it."""
+        self._unregister()
+        super(ReactorTerminal, self).close()
+
+    def pull_data(self):
+        """Pull data from ReactorTerminal connection (called by reactor when Pty is readable)."""
+        try:
+            data = self._read_terminal()
+            self._data_pulled(data)
+        except EOFError:
+            self._unregister()
+            self._notify_on_disconnect()
+
+    def _unregister(self):
+        if self._registered:
+            self._registered = False
+            self.reactor.unregister(self._terminal.fd)
@@ -10,10 +10,15 @@ __copyright__ = 'Copyright (C) 2018, Nokia'
 __email__ = 'grzegorz.latuszek@nokia.com, marcin.usielski@nokia.com'
 
 import atexit
+import heapq
+import itertools
 import logging
 import time
 from abc import abstractmethod, ABCMeta
-from concurrent.futures import ThreadPoolExecutor, wait
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from threading import Condition, Lock, Thread
+
+import moler.config.runners as runner_cfg
 from moler.exceptions import ConnectionObserverTimeout
 from moler.exceptions import CommandTimeout
 from six import add_metaclass
@@ -28,6 +33,160 @@ except ImportError:
         return None
 
 
+def _timeout_exception(connection_observer, timeout, passed):
+    if hasattr(connection_observer, "command_string"):
+        return CommandTimeout(connection_observer, timeout, kind="await_done", passed_time=passed)
+    return ConnectionObserverTimeout(connection_observer, timeout, kind="await_done", passed_time=passed)
+
+
+def _runs_till_cancelled(connection_observer):
+    """Permanent events (like prompts observers of device) have no deadline - only awaiting them may timeout."""
+    return getattr(connection_observer, "till_occurs_times", 1) <= 0
+
+
+class TimeoutScheduler(object):
+    """
+    Single thread enforcing timeouts of all running connection-observers.
+
+    Deadlines are kept inside min-heap so thread sleeps till nearest one (no per-observer polling).
+    At deadline timeout of connection-observer is read again - if it was extended meanwhile
+    (extend_timeout() or direct change of .timeout) deadline is moved, otherwise on_timeout callback is called.
+    """
+
+    def __init__(self, name="moler-timeouts"):
+        """
+        Create timeout scheduler (its thread is started on first schedule()).
+
+        :param name: name of scheduler thread
+        """
+        super(TimeoutScheduler, self).__init__()
+        self.logger = logging.getLogger('moler.runner.timeouts')
+        self._name = name
+        self._condition = Condition()
+        self._deadlines = []  # min-heap of (deadline, sequence_nb, connection_observer)
+        self._scheduled = {}  # connection_observer --> (start_time, on_timeout, deadline)
+        self._sequence = itertools.count()  # to never compare connection-observers inside heap
+        self._thread = None
+        self._running = False
+
+    def schedule(self, connection_observer, on_timeout, start_time=None):
+        """
+        Call on_timeout(connection_observer, passed_time) inside scheduler thread
+        if connection_observer is not done at start_time + connection_observer.timeout.
+
+        :param connection_observer: observer to supervise
+        :param on_timeout: callback of timeout
+        :param start_time: when observer started (now if not given)
+        """
+        if start_time is None:
+            start_time = time.time()
+        with self._condition:
+            self._scheduled[connection_observer] = (start_time, on_timeout, None)
+            self._push_deadline(connection_observer)
+            if not self._running:
+                self._start()
+
+    def unschedule(self, connection_observer):
+        """
+        Stop supervising timeout of connection_observer.
+
+        :param connection_observer: observer given to schedule()
+        """
+        with self._condition:
+            self._scheduled.pop(connection_observer, None)  # its heap entry is dropped when its deadline comes
+
+    def reschedule(self, connection_observer):
+        """
+        Recalculate deadline of connection_observer after its timeout has been changed.
+        Not needed for extended timeout (checked at deadline) but makes shortened timeout fire in time.
+
+        :param connection_observer: observer given to schedule()
+        """
+        with self._condition:
+            if connection_observer in self._scheduled:
+                self._push_deadline(connection_observer)
+
+    def shutdown(self):
+        """Stop scheduler thread (scheduled timeouts are dropped)."""
+        with self._condition:
+            self._running = False
+            self._scheduled.clear()
+            self._deadlines = []
+            self._condition.notify()
+            thread = self._thread
+            self._thread = None
+        if thread is not None:
+            thread.join()
+
+    def _start(self):
+        self._running = True
+        self._thread = Thread(target=self._run, name=self._name)
+        self._thread.daemon = True
+        self._thread.start()
+        self.logger.debug("started {}".format(self._name))
+
+    def _push_deadline(self, connection_observer):
+        start_time, on_timeout, prev_deadline = self._scheduled[connection_observer]
+        deadline = start_time + connection_observer.timeout
+        if deadline == prev_deadline:
+            return
+        self._scheduled[connection_observer] = (start_time, on_timeout, deadline)
+        heapq.heappush(self._deadlines, (deadline, next(self._sequence), connection_observer))
+        if self._deadlines[0][2] is connection_observer:  # earlier than the one scheduler sleeps for
+            self._condition.notify()
+
+    def _pop_timeouted(self):
+        while self._running:
+            if not self._deadlines:
+                self._condition.wait()
+                continue
+            deadline, _, connection_observer = self._deadlines[0]
+            now = time.time()
+            if deadline > now:
+                self._condition.wait(deadline - now)
+                continue
+            heapq.heappop(self._deadlines)
+            if connection_observer not in self._scheduled:
+                continue
+            start_time, on_timeout, current_deadline = self._scheduled[connection_observer]
+            if (current_deadline != deadline) or connection_observer.done():  # stale heap entry or already done
+                if connection_observer.done():
+                    del self._scheduled[connection_observer]
+                continue
+            if start_time + connection_observer.timeout > now:  # extended meanwhile
+                self._push_deadline(connection_observer)
+                continue
+            del self._scheduled[connection_observer]
+            return connection_observer, on_timeout, now - start_time
+        return None
+
+    def _run(self):
+        while True:
+            with self._condition:
+                timeouted = self._pop_timeouted()
+            if timeouted is None:
+                break
+            connection_observer, on_timeout, passed = timeouted
+            try:
+                on_timeout(connection_observer, passed)
+            except Exception as err:
+                self.logger.exception("timeout callback of {} raised {!r}".format(connection_observer, err))
+        self.logger.debug("stopped")
+
+
+_timeout_scheduler = None
+_timeout_scheduler_lock = Lock()
+
+
+def get_timeout_scheduler():
+    """Return TimeoutScheduler shared by all runners."""
+    global _timeout_scheduler
+    with _timeout_scheduler_lock:
+        if _timeout_scheduler is None:
+            _timeout_scheduler = TimeoutScheduler()
+        return _timeout_scheduler
+
+
 @add_metaclass(ABCMeta)
 class ConnectionObserverRunner(object):
     @abstractmethod
@@ -55,6 +214,20 @@ class ConnectionObserverRunner(object):
         """
         pass
 
+    def wait_for_iterator(self, connection_observer, connection_observer_future):
+        """
+        Version of wait_for() intended to be used by Python3 to implement awaitable object.
+
+        Default implementation awaits concurrent.futures.Future returned from submit()
+        inside event loop of awaiting coroutine.
+
+        :param connection_observer: The one we are awaiting for.
+        :param connection_observer_future: Future of connection-observer returned from submit().
+        :return: iterator
+        """
+        from moler.asyncio_runner import wait_for_observer_future  # Python3 only
+        return wait_for_observer_future(connection_observer, connection_observer_future).__await__()
+
     @abstractmethod
     def feed(self, connection_observer):
         """
@@ -82,11 +255,22 @@ class ConnectionObserverRunner(object):
 
 
 class ThreadPoolExecutorRunner(ConnectionObserverRunner):
+    """
+    Runner feeding each connection-observer inside worker thread of executor.
+
+    Own executor has cpu_count() * 5 workers shared by all connection-observers using this runner
+    (shared runner is used by all of them), so at most that many observers are fed at once - others wait for worker.
+    Permanent events (like prompts observers of each device) run till cancelled, so they don't get worker at all -
+    they are fed by their connection and their future is resolved by their completion.
+    """
     def __init__(self, executor=None):
         """Create instance of ThreadPoolExecutorRunner class"""
         self._in_shutdown = False
         self._i_own_executor = False
         self.executor = executor
+        self._timeout_scheduler = get_timeout_scheduler()
+        self._timeouts = {}  # connection_observer --> its timeout exception (set by TimeoutScheduler)
+        self._timeouts_lock = Lock()
         self.logger = logging.getLogger('moler.runner.thread-pool')
         self.logger.debug("created")
         atexit.register(self.shutdown)
@@ -103,6 +287,8 @@ class ThreadPoolExecutorRunner(ConnectionObserverRunner):
         self._in_shutdown = True  # will exit from feed() without stopping executor (since others may still use that executor)
         if self._i_own_executor:
             self.executor.shutdown()  # also stop executor since only I use it
+        if hasattr(atexit, 'unregister'):  # py3 only
+            atexit.unregister(self.shutdown)
 
     def submit(self, connection_observer):
         """
@@ -114,12 +300,33 @@ class ThreadPoolExecutorRunner(ConnectionObserverRunner):
         # to protect against threads races: connection thread may may get some data
         # even before feeding thread starts
         self.logger.debug("subscribing for data {!r}".format(connection_observer))
-        moler_conn = connection_observer.connection
-        moler_conn.subscribe(connection_observer.data_received)
+        connection_observer.subscribe_for_data()
+        if _runs_till_cancelled(connection_observer):
+            # permanent events (like prompts observers of each device) must not occupy workers of shared executor
+            return self._submit_without_feeding_thread(connection_observer)
+        self._timeout_scheduler.schedule(connection_observer, on_timeout=self._observer_timeout)
         # TODO: check dependency - connection_observer.connection
         connection_observer_future = self.executor.submit(self.feed, connection_observer)
         return connection_observer_future
 
+    def _submit_without_feeding_thread(self, connection_observer):
+        connection_observer_future = Future()
+        connection_observer_future.set_running_or_notify_cancel()
+
+        def observer_done(observer):
+            self.logger.debug("done & unsubscribing {!r}".format(observer))
+            observer.unsubscribe_from_data()
+            try:
+                connection_observer_future.set_result(observer.result())
+            except Exception as err:
+                connection_observer_future.set_exception(err)
+
+        connection_observer.add_done_callback(observer_done)
+        if self._in_shutdown:
+            self.logger.debug("shutdown so cancelling {!r}".format(connection_observer))
+            connection_observer.cancel()
+        return connection_observer_future
+
     def wait_for(self, connection_observer, connection_observer_future, timeout=None):
         """
         Await for connection_observer running in background or timeout.
@@ -131,53 +338,230 @@ class ThreadPoolExecutorRunner(ConnectionObserverRunner):
         """
         self.logger.debug("go foreground: {!r} - await max. {} [sec]".format(connection_observer, timeout))
         start_time = time.time()
-        remain_time = connection_observer.timeout
-        check_timeout_from_observer = True
-        wait_tick = 0.1
-        if timeout:
-            remain_time = timeout
-            check_timeout_from_observer = False
-            wait_tick = remain_time
+        check_timeout_from_observer = not timeout
+        if check_timeout_from_observer:
+            timeout = connection_observer.timeout
+        remain_time = timeout
         while remain_time > 0.0:
-            done, not_done = wait([connection_observer_future], timeout=wait_tick)
+            # no polling - we are woken up by feed() returning or at deadline
+            # (deadline may be moved forward by extend_timeout() of observer)
+            done, not_done = wait([connection_observer_future], timeout=remain_time)
             if connection_observer_future in done:
-                self.shutdown()
                 result = connection_observer_future.result()
                 self.logger.debug("{} returned {}".format(connection_observer, result))
                 return result
             if check_timeout_from_observer:
                 timeout = connection_observer.timeout
             remain_time = timeout - (time.time() - start_time)
-        moler_conn = connection_observer.connection
-        moler_conn.unsubscribe(connection_observer.data_received)
+        connection_observer.unsubscribe_from_data()
         passed = time.time() - start_time
         self.logger.debug("timeouted {}".format(connection_observer))
         connection_observer.cancel()
-        connection_observer_future.cancel()
-        self.shutdown()
+        if not connection_observer_future.cancel():  # already running feed() - let it see cancellation
+            wait([connection_observer_future], timeout=1.0)
         connection_observer.on_timeout()
-        if hasattr(connection_observer, "command_string"):
-            raise CommandTimeout(connection_observer, timeout, kind="await_done", passed_time=passed)
-        else:
-            raise ConnectionObserverTimeout(connection_observer, timeout, kind="await_done", passed_time=passed)
+        raise _timeout_exception(connection_observer, timeout, passed)
 
     def feed(self, connection_observer):  # active feeder - pulls for data
         """
         Feeds connection_observer by pulling data from connection and passing it to connection_observer.
         Should be called from background-processing of connection observer.
         """
-        moler_conn = connection_observer.connection
         while True:
             if connection_observer.done():
                 self.logger.debug("done & unsubscribing {!r}".format(connection_observer))
-                moler_conn.unsubscribe(connection_observer.data_received)
+                connection_observer.unsubscribe_from_data()
+                self._timeout_scheduler.unschedule(connection_observer)
                 break
             if self._in_shutdown:
                 self.logger.debug("shutdown so cancelling {!r}".format(connection_observer))
                 connection_observer.cancel()
             time.sleep(0.01)  # give moler_conn a chance to feed observer
+        with self._timeouts_lock:
+            timeout_error = self._timeouts.pop(connection_observer, None)
+        if timeout_error is not None:
+            raise timeout_error
         self.logger.debug("returning result {}".format(connection_observer))
         return connection_observer.result()
 
+    def _observer_timeout(self, connection_observer, passed):  # called from TimeoutScheduler thread
+        with self._timeouts_lock:  # feed() can't see cancelled observer without its timeout exception
+            if not connection_observer.cancel():  # became done meanwhile
+                return
+            self.logger.debug("timeouted {}".format(connection_observer))
+            self._timeouts[connection_observer] = _timeout_exception(connection_observer,
+                                                                     connection_observer.timeout, passed)
+            connection_observer.on_timeout()
+
+    def timeout_change(self, timedelta):
+        pass
+
+
+class EventDrivenRunner(ConnectionObserverRunner):
+    """
+    Runner that doesn't park any thread per connection-observer.
+
+    Connection-observer is fed directly by moler-connection (via subscription)
+    and signals its completion by set_result(), set_exception() or cancel().
+    That completion is forwarded into Future returned from submit(),
+    so wait_for() wakes up the moment connection-observer is done.
+    Timeouts (also of connection-observers never awaited) are enforced by shared TimeoutScheduler
+    (except permanent events running till cancelled).
+    """
+    def __init__(self):
+        """Create instance of EventDrivenRunner class"""
+        self._in_shutdown = False
+        self._futures = {}  # connection_observer --> its future
+        self._futures_lock = Lock()
+        self._timeout_scheduler = get_timeout_scheduler()
+        self.logger = logging.getLogger('moler.runner.event-driven')
+        self.logger.debug("created")
+
+    def shutdown(self):
+        self.logger.debug("shutting down")
+        self._in_shutdown = True
+        with self._futures_lock:
+            running_observers = list(self._futures.keys())
+        for connection_observer in running_observers:
+            self.logger.debug("shutdown so cancelling {!r}".format(connection_observer))
+            connection_observer.cancel()
+
+    def submit(self, connection_observer):
+        """
+        Submit connection observer to background execution.
+        Returns Future that could be used to await for connection_observer done.
+        """
+        self.logger.debug("go background: {!r}".format(connection_observer))
+        connection_observer_future = Future()
+        connection_observer_future.set_running_or_notify_cancel()
+        with self._futures_lock:
+            self._futures[connection_observer] = connection_observer_future
+        if not _runs_till_cancelled(connection_observer):
+            self._timeout_scheduler.schedule(connection_observer, on_timeout=self._observer_timeout)
+        self.feed(connection_observer)
+        return connection_observer_future
+
+    def wait_for(self, connection_observer, connection_observer_future, timeout=None):
+        """
+        Await for connection_observer running in background or timeout.
+
+        :param connection_observer: The one we are awaiting for.
+        :param connection_observer_future: Future of connection-observer returned from submit().
+        :param timeout: Max time (in float seconds) you want to await before you give up. If None then taken from connection_observer
+        :return:
+        """
+        self.logger.debug("go foreground: {!r} - await max. {} [sec]".format(connection_observer, timeout))
+        start_time = time.time()
+        check_timeout_from_observer = not timeout
+        if check_timeout_from_observer:
+            timeout = connection_observer.timeout
+        remain_time = timeout
+        while remain_time > 0.0:
+            # no polling - we are woken up by done-callback or at deadline
+            # (deadline may be moved forward by extend_timeout() of observer)
+            done, not_done = wait([connection_observer_future], timeout=remain_time)
+            if connection_observer_future in done:
+                result = connection_observer_future.result()
+                self.logger.debug("{} returned {}".format(connection_observer, result))
+                return result
+            if check_timeout_from_observer:
+                timeout = connection_observer.timeout
+            remain_time = timeout - (time.time() - start_time)
+        passed = time.time() - start_time
+        self.logger.debug("timeouted {}".format(connection_observer))
+        connection_observer.cancel()
+        connection_observer.on_timeout()
+        raise _timeout_exception(connection_observer, timeout, passed)
+
+    def feed(self, connection_observer):  # passive feeder - data is pushed by connection
+        """
+        Subscribes connection_observer for data of its connection and for its own completion.
+        No background thread is needed - connection calls connection_observer.data_received()
+        and completion unsubscribes it and resolves its future.
+        """
+        # subscription for data must be done before anything else
+        # since connection thread may get some data at any moment
+        self.logger.debug("subscribing for data {!r}".format(connection_observer))
+        connection_observer.subscribe_for_data()
+        connection_observer.add_done_callback(self._observer_done)
+        if self._in_shutdown:
+            self.logger.debug("shutdown so cancelling {!r}".format(connection_observer))
+            connection_observer.cancel()
+
+    def _observer_done(self, connection_observer):
+        self.logger.debug("done & unsubscribing {!r}".format(connection_observer))
+        connection_observer.unsubscribe_from_data()
+        self._timeout_scheduler.unschedule(connection_observer)
+        with self._futures_lock:
+            connection_observer_future = self._futures.pop(connection_observer, None)
+        self._forward_result(connection_observer, connection_observer_future)
+
+    def _forward_result(self, connection_observer, connection_observer_future):
+        if (connection_observer_future is None) or connection_observer_future.done():
+            return
+        try:
+            result = connection_observer.result()
+            connection_observer_future.set_result(result)
+        except Exception as err:
+            connection_observer_future.set_exception(err)
+        self.logger.debug("returning result {}".format(connection_observer))
+
+    def _observer_timeout(self, connection_observer, passed):  # called from TimeoutScheduler thread
+        with self._futures_lock:
+            connection_observer_future = self._futures.pop(connection_observer, None)  # not resolved by cancel()
+        if not connection_observer.cancel():  # became done meanwhile
+            self._forward_result(connection_observer, connection_observer_future)
+            return
+        self.logger.debug("timeouted {}".format(connection_observer))
+        connection_observer.on_timeout()
+        if (connection_observer_future is not None) and not connection_observer_future.done():
+            connection_observer_future.set_exception(_timeout_exception(connection_observer,
+                                                                        connection_observer.timeout, passed))
+
     def timeout_change(self, timedelta):
         pass
+
+
+def _asyncio_runner():
+    from moler.asyncio_runner import AsyncioRunner  # Python3 only
+    return AsyncioRunner()
+
+
+_runners_registry = {'thread-pool': ThreadPoolExecutorRunner,
+                     'event-driven': EventDrivenRunner,
+                     'asyncio': _asyncio_runner}
+_shared_runners = {}
+_shared_runners_lock = Lock()
+
+
+def register_runner(variant, constructor):
+    """
+    Register constructor of runner variant.
+
+    :param variant: name of runner variant, ex. 'thread-pool', 'event-driven', ...
+    :param constructor: callable building runner object
+    :return: None
+    """
+    if not callable(constructor):
+        raise ValueError("constructor must be callable not {}".format(constructor))
+    _runners_registry[variant] = constructor
+
+
+def get_runner(variant=None):
+    """
+    Return runner shared by whole process.
+
+    Only one instance of given variant is created (on first request),
+    so connection-observers don't create their own runners (and threads).
+
+    :param variant: runner variant, if not given then taken from configuration
+    :return: requested runner
+    """
+    if variant is None:
+        variant = runner_cfg.default_variant
+    with _shared_runners_lock:
+        if variant not in _shared_runners:
+            if variant not in _runners_registry:
+                raise KeyError("'{}' variant of runner is not registered".format(variant))
+            _shared_runners[variant] = _runners_registry[variant]()
+        return _shared_runners[variant]
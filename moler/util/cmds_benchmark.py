@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+"""
+Measure parsing throughput of selected command(s).
+
+Command documentation (COMMAND_OUTPUT/COMMAND_KWARGS) discovered the same way as by cmds_doc
+is fed directly into data_received() of Moler's connection (no external-IO, no runner).
+Output of command may be replicated to get big outputs (lines between command echo and prompt are repeated).
+Results (lines/s, bytes/s per command) may be stored as baseline and compared with next measurements.
+
+Example:
+    python -m moler.util.cmds_benchmark -c moler/cmd/unix -s 1000000 --save-baseline parsing_baseline.json
+    python -m moler.util.cmds_benchmark -c moler/cmd/unix -s 1000000 --baseline parsing_baseline.json
+"""
+
+__author__ = 'Grzegorz Latuszek'
+__copyright__ = 'Copyright (C) 2018, Nokia'
+__email__ = 'grzegorz.latuszek@nokia.com'
+
+import codecs
+import json
+import logging
+import re
+import sys
+from argparse import ArgumentParser
+from os.path import exists
+from timeit import default_timer
+
+from moler.util.cmds_doc import _walk_moler_nonabstract_commands, _retrieve_command_documentation
+from moler.util.cmds_doc import _get_doc_variant, _create_command
+
+
+def _parsing_connection():
+    """Connection fed directly by benchmark (incremental decoder since chunks may split multi-byte characters)"""
+    from moler.connection import ObservableConnection
+
+    moler_conn = ObservableConnection(how2send=lambda data: None,  # answers of interactive commands go nowhere
+                                      encoder=lambda data: data.encode("utf-8"),
+                                      decoder=codecs.getincrementaldecoder("utf-8")(),
+                                      logger_name=None)  # measure parsing, not logging
+    return moler_conn
+
+
+def replicate_command_output(cmd_output, command_string, output_size):
+    """
+    Make command output of at least given size by repeating lines between command echo and final prompt.
+
+    :param cmd_output: documented command output (COMMAND_OUTPUT)
+    :param command_string: command as sent to device (its echo starts output)
+    :param output_size: min size of output (in characters); 0 means: don't replicate
+    :return: replicated output
+    """
+    lines = cmd_output.splitlines(True)
+    echo_regex = re.compile(re.escape(command_string))
+    body_start = 0
+    for idx, line in enumerate(lines):
+        if echo_regex.search(line):
+            body_start = idx + 1
+            break
+    header, body, footer = lines[:body_start], lines[body_start:-1], lines[-1:]
+    body_size = sum(len(line) for line in body)
+    if (not body_size) or (len(cmd_output) >= output_size):
+        return cmd_output
+    copies = (output_size - len(cmd_output)) // body_size + 2
+    return "".join(header + body * copies + footer)
+
+
+def _measure_parsing(moler_class, cmd_kwargs, cmd_output, output_size, repeat, chunk_size):
+    """Return (best time of parsing, parsed output)"""
+    best_time = None
+    output = None
+    for _ in range(repeat):
+        moler_conn = _parsing_connection()
+        moler_cmd, _ = _create_command(moler_class, moler_conn, cmd_kwargs)
+        if output is None:
+            output = replicate_command_output(cmd_output, moler_cmd.command_string, output_size)
+            raw_output = output.encode("utf-8")
+        moler_cmd.subscribe_for_data()
+        start_time = default_timer()
+        for offset in range(0, len(raw_output), chunk_size):
+            moler_conn.data_received(raw_output[offset:offset + chunk_size])
+        parsing_time = default_timer() - start_time
+        moler_cmd.unsubscribe_from_data()
+        if not moler_cmd.done():
+            raise Exception("{} has not detected end of its output".format(moler_cmd))
+        moler_cmd.result()  # raises exception set by parser
+        if (best_time is None) or (parsing_time < best_time):
+            best_time = parsing_time
+    return best_time, output
+
+
+def benchmark_commands_parsing(path2cmds, output_size=0, repeat=3, chunk_size=4096):
+    """
+    Measure parsing throughput of documented outputs of commands.
+
+    :param path2cmds: relative path to commands directory (or single command module)
+    :param output_size: min size of parsed output (in characters); 0 means: parse documented output as is
+    :param repeat: how many times output is parsed (best time is taken)
+    :param chunk_size: size of single data given to data_received()
+    :return: dict: "module.Class[variant]" --> dict with lines, bytes, time, lines_per_s, bytes_per_s (or error)
+    """
+    logger = logging.getLogger('moler.cmds_benchmark')
+    results = {}
+    for moler_module, moler_class in _walk_moler_nonabstract_commands(path=path2cmds):
+        logger.info("processing: {}".format(moler_class))
+        test_data = _retrieve_command_documentation(moler_module)
+        for variant in sorted(test_data):
+            name = "{}.{}{}".format(moler_module.__name__, moler_class.__name__,
+                                    "[{}]".format(variant) if variant else "")
+            try:
+                cmd_output, cmd_kwargs, _ = _get_doc_variant(test_data, variant)
+                parsing_time, output = _measure_parsing(moler_class, cmd_kwargs, cmd_output,
+                                                        output_size, repeat, chunk_size)
+            except Exception as err:
+                results[name] = {'error': str(err)}
+                continue
+            parsed_bytes = len(output.encode("utf-8"))
+            parsed_lines = len(output.splitlines())
+            parsing_time = max(parsing_time, 1e-9)
+            results[name] = {'lines': parsed_lines, 'bytes': parsed_bytes, 'time': parsing_time,
+                             'lines_per_s': parsed_lines / parsing_time, 'bytes_per_s': parsed_bytes / parsing_time}
+    return results
+
+
+def save_baseline(results, filename):
+    """
+    Store results of benchmark_commands_parsing() as baseline.
+
+    :param results: results of benchmark_commands_parsing()
+    :param filename: path of baseline file (json)
+    """
+    measurements = {name: result for name, result in results.items() if 'error' not in result}
+    with open(filename, 'w') as baseline_file:
+        json.dump(measurements, baseline_file, indent=2, sort_keys=True)
+
+
+def load_baseline(filename):
+    """
+    Load baseline stored by save_baseline().
+
+    :param filename: path of baseline file (json)
+    :return: baseline results
+    """
+    with open(filename) as baseline_file:
+        return json.load(baseline_file)
+
+
+def compare_with_baseline(results, baseline, tolerance=0.2):
+    """
+    Find commands that parse slower than in baseline.
+
+    :param results: results of benchmark_commands_parsing()
+    :param baseline: results loaded by load_baseline()
+    :param tolerance: allowed drop of throughput (0.2 means 20% slower is still OK)
+    :return: list of regression descriptions
+    """
+    regressions = []
+    for name in sorted(results):
+        result = results[name]
+        if ('error' in result) or (name not in baseline):
+            continue
+        ratio = result['bytes_per_s'] / baseline[name]['bytes_per_s']
+        if ratio < 1.0 - tolerance:
+            regressions.append("{} parses {:.0f} B/s - {:.0%} of baseline {:.0f} B/s".format(
+                name, result['bytes_per_s'], ratio, baseline[name]['bytes_per_s']))
+    return regressions
+
+
+def print_report(results, baseline=None):
+    """
+    Print results (slowest parsers first).
+
+    :param results: results of benchmark_commands_parsing()
+    :param baseline: results loaded by load_baseline() (optional)
+    """
+    measured = [(name, result) for name, result in results.items() if 'error' not in result]
+    measured.sort(key=lambda item: item[1]['bytes_per_s'])
+    for name, result in measured:
+        line = "{:>14.0f} lines/s {:>14.0f} B/s {:>10} lines {:>12} B  {}".format(
+            result['lines_per_s'], result['bytes_per_s'], result['lines'], result['bytes'], name)
+        if baseline and (name in baseline):
+            line += "  ({:.0%} of baseline)".format(result['bytes_per_s'] / baseline[name]['bytes_per_s'])
+        print(line)
+    for name in sorted(results):
+        if 'error' in results[name]:
+            print("can't measure {}: {}".format(name, results[name]['error']))
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description="Moler's Command(s) parsing benchmark")
+    parser.add_argument('-c', '--cmd_filename', required=True, help='python module(s) implementing command(s)')
+    parser.add_argument('-s', '--size', type=int, default=0, help='min size of parsed output (replicated if needed)')
+    parser.add_argument('-r', '--repeat', type=int, default=3, help='how many times output is parsed (best is taken)')
+    parser.add_argument('--save-baseline', help='store results as baseline into given file')
+    parser.add_argument('--baseline', help='compare results with baseline from given file')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed throughput drop against baseline')
+    options = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")  # show progress of benchmark
+
+    if not exists(options.cmd_filename):
+        print('\n{} path doesn\'t exist!\n'.format(options.cmd_filename))
+        parser.print_help()
+        exit()
+    measurements = benchmark_commands_parsing(path2cmds=options.cmd_filename, output_size=options.size,
+                                              repeat=options.repeat)
+    baseline_results = load_baseline(options.baseline) if options.baseline else None
+    print_report(measurements, baseline_results)
+    if options.save_baseline:
+        save_baseline(measurements, options.save_baseline)
+    if baseline_results:
+        found_regressions = compare_with_baseline(measurements, baseline_results, options.tolerance)
+        if found_regressions:
+            print("Parsing slower than baseline:\n    {}".format("\n    ".join(found_regressions)))
+            sys.exit(1)
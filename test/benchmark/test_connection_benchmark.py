@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmarks of Moler's data-path
+
+- throughput of ObservableConnection.data_received() (1/10/100 observers, chunks 1B - 256KiB)
+- same data-path fed by memory, tcp and terminal external-IO
+- latency from sending command till its prompt is received
+
+Benchmarks require pytest-benchmark plugin (they are skipped without it):
+
+    pip install pytest-benchmark
+    python -m pytest test/benchmark --benchmark-only
+
+Add --benchmark-save=<name> to store results and --benchmark-compare to compare with stored ones.
+"""
+
+__author__ = 'Grzegorz Latuszek'
+__copyright__ = 'Copyright (C) 2018, Nokia'
+__email__ = 'grzegorz.latuszek@nokia.com'
+
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+pytestmark = pytest.mark.usefixtures("quiet_moler_loggers")
+
+observers_numbers = [1, 10, 100]
+chunk_sizes = [1, 64, 1024, 16 * 1024, 256 * 1024]
+max_chunks_per_round = 1000
+delivery_timeout = 10.0
+
+
+@pytest.mark.parametrize("chunk_size", chunk_sizes)
+@pytest.mark.parametrize("observers_nb", observers_numbers)
+def test_data_received_throughput(benchmark, observers_nb, chunk_size):
+    from moler.connection import ObservableConnection
+    moler_conn = ObservableConnection(decoder=lambda data: data.decode("utf-8"), name="benchmark")
+    observers = subscribed_observers(moler_conn, observers_nb)
+    chunk = data_chunk(chunk_size)
+    chunks_nb = chunks_per_round(chunk_size)
+
+    def feed_connection():
+        for _ in range(chunks_nb):
+            moler_conn.data_received(chunk)
+
+    benchmark.extra_info['bytes_per_round'] = chunk_size * chunks_nb
+    benchmark(feed_connection)
+    assert observers[-1].received_bytes >= chunk_size * chunks_nb
+
+
+@pytest.mark.parametrize("chunk_size", chunk_sizes)
+@pytest.mark.parametrize("observers_nb", observers_numbers)
+def test_memory_connection_throughput(benchmark, observers_nb, chunk_size):
+    from moler.connection import ObservableConnection
+    from moler.io.raw.memory import ThreadedFifoBuffer
+    moler_conn = ObservableConnection(decoder=lambda data: data.decode("utf-8"), name="benchmark")
+    observers = subscribed_observers(moler_conn, observers_nb)
+    chunks = [data_chunk(chunk_size)] * chunks_per_round(chunk_size)
+
+    with ThreadedFifoBuffer(moler_connection=moler_conn, echo=False) as memory_io:
+        benchmark.extra_info['bytes_per_round'] = chunk_size * len(chunks)
+        benchmark(memory_io.inject, chunks)  # returns when all chunks are delivered
+    assert observers[-1].received_bytes >= chunk_size * len(chunks)
+
+
+@pytest.mark.parametrize("chunk_size", chunk_sizes)
+@pytest.mark.parametrize("observers_nb", observers_numbers)
+def test_tcp_connection_throughput(benchmark, tcp_server_and_pipe, observers_nb, chunk_size):
+    from moler.connection import ObservableConnection
+    from moler.io.raw.tcp import ThreadedTcp
+    (tcp_server, tcp_server_pipe) = tcp_server_and_pipe
+    moler_conn = ObservableConnection(decoder=lambda data: data.decode("utf-8"), name="benchmark")
+    observers = subscribed_observers(moler_conn, observers_nb)
+    msg = data_chunk(chunk_size)  # tcp decides on chunks of received data
+
+    def send_from_server():
+        last_observer = observers[-1]
+        last_observer.expect_bytes(chunk_size)
+        tcp_server_pipe.send(("send async msg", {'msg': msg}))
+        assert last_observer.wait_for_expected_bytes(timeout=delivery_timeout)
+
+    with ThreadedTcp(moler_connection=moler_conn, port=tcp_server.port, host=tcp_server.host):
+        time.sleep(0.1)  # otherwise we have race between server's pipe and from-client-connection
+        benchmark.extra_info['bytes_per_round'] = chunk_size
+        benchmark.pedantic(send_from_server, rounds=20, warmup_rounds=1)
+
+
+@pytest.mark.parametrize("output_size", chunk_sizes)
+@pytest.mark.parametrize("observers_nb", observers_numbers)
+def test_terminal_connection_throughput(benchmark, observers_nb, output_size):
+    from moler.connection import ObservableConnection
+    from moler.io.raw.terminal import ThreadedTerminal
+    moler_conn = ObservableConnection(name="benchmark")  # ThreadedTerminal works on unicode - no encoding
+    observers = subscribed_observers(moler_conn, observers_nb)
+    # quotes split marker, so echo of command doesn't look like end of its output
+    command = "head -c {} /dev/zero | tr '\\0' x; echo END_OF''_OUTPUT\n".format(output_size)
+
+    def run_shell_command():
+        last_observer = observers[-1]
+        last_observer.expect_marker("END_OF_OUTPUT")
+        moler_conn.send(command)
+        assert last_observer.wait_for_marker(timeout=delivery_timeout)
+
+    with ThreadedTerminal(moler_connection=moler_conn):
+        benchmark.extra_info['bytes_per_round'] = output_size
+        benchmark.pedantic(run_shell_command, rounds=20, warmup_rounds=1)
+
+
+def test_memory_connection_command_latency(benchmark):
+    from moler.cmd.unix.whoami import Whoami
+    from moler.connection import ObservableConnection
+    from moler.io.raw.memory import ThreadedFifoBuffer
+
+    class RemoteShell(ThreadedFifoBuffer):
+        def write(self, input_bytes):
+            self.inject([input_bytes, b"ute\nhost:~ # "])  # echo of command, its output and prompt
+
+        send = write
+
+    moler_conn = ObservableConnection(encoder=lambda data: data.encode("utf-8"),
+                                      decoder=lambda data: data.decode("utf-8"), name="benchmark")
+
+    def run_command():
+        return Whoami(connection=moler_conn, prompt=r'host:~ #')(timeout=delivery_timeout)
+
+    with RemoteShell(moler_connection=moler_conn, echo=False):
+        result = benchmark(run_command)
+    assert {"USER": "ute"} == result
+
+
+def test_terminal_connection_command_latency(benchmark):
+    import getpass
+    from moler.cmd.unix.whoami import Whoami
+    from moler.connection import ObservableConnection
+    from moler.io.raw.terminal import ThreadedTerminal
+    moler_conn = ObservableConnection(name="benchmark")  # ThreadedTerminal works on unicode - no encoding
+
+    def run_command():
+        return Whoami(connection=moler_conn, prompt=r'^moler_bash#')(timeout=delivery_timeout)
+
+    with ThreadedTerminal(moler_connection=moler_conn):
+        result = benchmark.pedantic(run_command, rounds=50, warmup_rounds=1)
+    assert {"USER": getpass.getuser()} == result
+
+
+# --------------------------- resources ---------------------------
+
+
+class DataCountingObserver(object):
+    def __init__(self):
+        self.received_bytes = 0
+        self._received = threading.Condition()
+        self._expected_bytes = 0
+        self._marker = None
+        self._tail = ""
+
+    def data_received(self, data):
+        with self._received:
+            self.received_bytes += len(data)
+            if self._marker:
+                self._tail = (self._tail + data)[-(len(data) + len(self._marker)):]
+            self._received.notify_all()
+
+    def expect_bytes(self, bytes_nb):
+        with self._received:
+            self._expected_bytes = self.received_bytes + bytes_nb
+
+    def wait_for_expected_bytes(self, timeout):
+        with self._received:
+            return self._wait(lambda: self.received_bytes >= self._expected_bytes, timeout)
+
+    def expect_marker(self, marker):
+        with self._received:
+            self._marker = marker
+            self._tail = ""
+
+    def wait_for_marker(self, timeout):
+        with self._received:
+            return self._wait(lambda: self._marker in self._tail, timeout)
+
+    def _wait(self, condition, timeout):
+        deadline = time.time() + timeout
+        while not condition():
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return False
+            self._received.wait(remaining)
+        return True
+
+
+def subscribed_observers(moler_conn, observers_nb):
+    observers = [DataCountingObserver() for _ in range(observers_nb)]
+    for observer in observers:
+        moler_conn.subscribe(observer.data_received)
+    return observers  # keep them alive - connection holds weak references to them
+
+
+def data_chunk(chunk_size):
+    """Chunk looking like lines of command output."""
+    line = b"x" * 79 + b"\n"
+    return (line * (chunk_size // len(line) + 1))[:chunk_size]
+
+
+def chunks_per_round(chunk_size):
+    """Single round feeds up to 256KiB but no more than max_chunks_per_round chunks."""
+    return max(1, min(max_chunks_per_round, (256 * 1024) // chunk_size))
+
+
+@pytest.yield_fixture()
+def tcp_server_and_pipe():
+    from moler.io.raw.tcpserverpiped import tcp_server_piped
+    with tcp_server_piped() as server_and_pipe:
+        (server, svr_ctrl_pipe) = server_and_pipe
+        yield (server, svr_ctrl_pipe)
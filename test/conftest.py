@@ -9,11 +9,17 @@ __email__ = 'grzegorz.latuszek@nokia.com'
 
 from pytest import fixture, yield_fixture
 import os
+import sys
 import logging
 
 import moler.config.loggers
 from moler.helpers import instance_id
 
+collect_ignore = []
+if sys.version_info < (3, 5):  # no async/await syntax
+    collect_ignore.append(os.path.join("integration", "test_asyncio_runner.py"))
+    collect_ignore.append(os.path.join("integration", "test_io_asyncio.py"))
+
 # plugins to let us see (in moler logs) where we are in testing
 
 
@@ -76,6 +82,16 @@ os.environ['MOLER_DEBUG_LEVEL'] = 'TRACE'  # to have all debug details of tests
 moler.config.loggers.configure_debug_level()
 moler.config.loggers.configure_moler_main_logger()
 moler.config.loggers.configure_runner_logger(runner_name="thread-pool")
+moler.config.loggers.configure_runner_logger(runner_name="event-driven")
+
+
+# --------------------------- test/benchmark resources ---------------------------
+@yield_fixture
+def quiet_moler_loggers():
+    """Tests run Moler with TRACE logs into files; benchmarks measure Moler, not logging."""
+    logging.disable(logging.INFO)  # TRACE/DEBUG/INFO records of data-path
+    yield
+    logging.disable(logging.NOTSET)
 
 
 # --------------------------- test/test_cmds_doc.py resources ---------------------------
@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+"""
+Testing connection observer runner based on asyncio
+
+- submit
+- wait_for
+- await connection_observer
+"""
+
+__author__ = 'Grzegorz Latuszek'
+__copyright__ = 'Copyright (C) 2018, Nokia'
+__email__ = 'grzegorz.latuszek@nokia.com'
+
+import asyncio
+import threading
+import time
+
+import pytest
+from moler.connection_observer import ConnectionObserver
+
+
+def test_can_await_connection_observer_to_complete(observer_and_awaited_data,
+                                                   observer_runner):
+    conn_observer, awaited_data = observer_and_awaited_data
+    connection_observer_future = observer_runner.submit(conn_observer)
+
+    def inject_data():
+        time.sleep(0.3)
+        moler_conn = conn_observer.connection
+        moler_conn.data_received(awaited_data)
+
+    ext_io = threading.Thread(target=inject_data)
+    try:
+        ext_io.start()
+        result = observer_runner.wait_for(conn_observer,
+                                          connection_observer_future,
+                                          timeout=1.0)
+        assert connection_observer_future.done()
+        assert conn_observer.done()
+        assert result == connection_observer_future.result()
+    finally:  # test cleanup
+        ext_io.join()
+
+
+def test_can_await_connection_observer_to_timeout(connection_observer,
+                                                  observer_runner):
+    from moler.exceptions import ConnectionObserverTimeout
+
+    connection_observer_future = observer_runner.submit(connection_observer)
+    with pytest.raises(ConnectionObserverTimeout):
+        observer_runner.wait_for(connection_observer,
+                                 connection_observer_future,
+                                 timeout=0.3)
+    assert connection_observer.done()
+
+
+def test_not_awaited_connection_observer_timeouts_in_background(connection_observer,
+                                                                observer_runner):
+    from moler.exceptions import ConnectionObserverTimeout
+
+    connection_observer.timeout = 0.2
+    connection_observer_future = observer_runner.submit(connection_observer)
+    time.sleep(0.4)
+    assert connection_observer.done()
+    assert isinstance(connection_observer_future.exception(), ConnectionObserverTimeout)
+
+
+def test_not_awaited_permanent_event_runs_past_its_timeout(observer_runner):
+    from moler.connection import ObservableConnection
+    from moler.events.unix.wait4prompt import Wait4prompt
+
+    event = Wait4prompt(connection=ObservableConnection(), prompt="host:~ #", till_occurs_times=-1)
+    event.timeout = 0.2
+    connection_observer_future = observer_runner.submit(event)
+    try:
+        time.sleep(0.4)
+        assert not event.done()
+        assert not connection_observer_future.done()
+    finally:  # test cleanup
+        event.cancel()
+
+
+def test_connection_observer_is_awaitable_inside_coroutine(observer_and_awaited_data,
+                                                           observer_runner):
+    conn_observer, awaited_data = observer_and_awaited_data
+    conn_observer.runner = observer_runner
+
+    async def inject_data():
+        await asyncio.sleep(0.1)
+        conn_observer.connection.data_received(awaited_data)
+
+    async def await_observer():
+        conn_observer.start()
+        feeder = asyncio.ensure_future(inject_data())
+        result = await conn_observer
+        await feeder
+        return result
+
+    loop = asyncio.new_event_loop()
+    try:
+        result = loop.run_until_complete(await_observer())
+    finally:
+        loop.close()
+    assert conn_observer.done()
+    assert result == conn_observer.result()
+
+
+def test_done_connection_observer_never_submitted_is_awaitable(connection_observer, observer_runner):
+    connection_observer.runner = observer_runner
+    connection_observer.set_result(result="already done")
+
+    loop = asyncio.new_event_loop()
+    try:
+        result = loop.run_until_complete(asyncio.wait_for(connection_observer, timeout=1.0))
+    finally:
+        loop.close()
+    assert "already done" == result
+
+
+def test_connection_observer_run_by_non_asyncio_runner_is_awaitable(observer_and_awaited_data):
+    from moler.runner import EventDrivenRunner
+    conn_observer, awaited_data = observer_and_awaited_data
+    conn_observer.runner = EventDrivenRunner()
+
+    async def await_observer():
+        conn_observer.start()
+        asyncio.get_event_loop().call_later(0.1, conn_observer.connection.data_received, awaited_data)
+        return await conn_observer
+
+    loop = asyncio.new_event_loop()
+    try:
+        result = loop.run_until_complete(await_observer())
+    finally:
+        loop.close()
+    assert result == conn_observer.result()
+
+
+def test_many_connection_observers_are_run_by_single_thread(observer_runner):
+    from moler.connection import ObservableConnection
+    moler_conn = ObservableConnection()
+    threads_before = threading.active_count()
+    observers = [NetworkDownDetector(connection=moler_conn, runner=observer_runner) for _ in range(100)]
+    for observer in observers:
+        observer.start()
+    assert threading.active_count() == threads_before
+    moler_conn.data_received('ping: sendmsg: Network is unreachable')
+    for observer in observers:
+        observer.await_done(timeout=1.0)
+    assert all(observer.done() for observer in observers)
+
+
+# --------------------------- resources ---------------------------
+
+
+@pytest.yield_fixture()
+def observer_runner():
+    from moler.asyncio_runner import AsyncioRunner
+    runner = AsyncioRunner()
+    yield runner
+    runner.shutdown()
+
+
+class NetworkDownDetector(ConnectionObserver):
+    def __init__(self, connection=None, runner=None):
+        super(NetworkDownDetector, self).__init__(connection=connection, runner=runner)
+
+    def data_received(self, data):
+        if not self.done():
+            if "Network is unreachable" in data:
+                when_detected = time.time()
+                self.set_result(result=when_detected)
+
+
+@pytest.fixture()
+def connection_observer():
+    from moler.connection import ObservableConnection
+    moler_conn = ObservableConnection()
+    observer = NetworkDownDetector(connection=moler_conn)
+    return observer
+
+
+@pytest.fixture()
+def observer_and_awaited_data(connection_observer):
+    awaited_data = 'ping: sendmsg: Network is unreachable'
+    return connection_observer, awaited_data
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+Testing external-IO connections based on asyncio
+
+- open/close
+- send/receive via Moler's connection
+- many connections served by single thread
+"""
+
+__author__ = 'Grzegorz Latuszek'
+__copyright__ = 'Copyright (C) 2018, Nokia'
+__email__ = 'grzegorz.latuszek@nokia.com'
+
+import threading
+import time
+
+import pytest
+
+
+def test_can_open_and_close_tcp_connection(integration_tcp_server_and_pipe):
+    from moler.connection import ObservableConnection
+    from moler.io.asyncio.tcp import AsyncioTcp
+    (tcp_server, tcp_server_pipe) = integration_tcp_server_and_pipe
+
+    connection = AsyncioTcp(moler_connection=ObservableConnection(), port=tcp_server.port, host=tcp_server.host)
+    with connection:
+        pass
+    time.sleep(0.1)  # otherwise we have race between server's pipe and from-client-connection
+    tcp_server_pipe.send(("get history", {}))
+    dialog_with_server = tcp_server_pipe.recv()
+    assert 'Client connected' in dialog_with_server
+    assert 'Client disconnected' in dialog_with_server
+
+
+def test_socket_options_given_to_connection_factory_are_set(integration_tcp_server_and_pipe):
+    import socket
+    from moler.connection import get_connection
+    (tcp_server, tcp_server_pipe) = integration_tcp_server_and_pipe
+
+    connection = get_connection(io_type='tcp', variant='asyncio', port=tcp_server.port, host=tcp_server.host,
+                                tcp_nodelay=True, keepalive=True)
+    with connection:
+        connected_socket = connection._transport.get_extra_info('socket')
+        nodelay = connected_socket.getsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY)
+        keepalive = connected_socket.getsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE)
+    assert nodelay
+    assert keepalive
+
+
+def test_can_send_and_receive_data_over_tcp_connection(integration_tcp_server_and_pipe):
+    from moler.connection import ObservableConnection
+    from moler.io.asyncio.tcp import AsyncioTcp
+    (tcp_server, tcp_server_pipe) = integration_tcp_server_and_pipe
+    received_data = []
+
+    def on_data(data):
+        received_data.append(data)
+
+    moler_conn = ObservableConnection()
+    moler_conn.subscribe(on_data)
+
+    with AsyncioTcp(moler_connection=moler_conn, port=tcp_server.port, host=tcp_server.host):
+        moler_conn.send(data=b'data to be send')
+        time.sleep(0.1)  # otherwise we have race between server's pipe and from-client-connection
+        tcp_server_pipe.send(("send async msg", {'msg': b'data to read'}))
+        time.sleep(0.1)
+    tcp_server_pipe.send(("get history", {}))
+    dialog_with_server = tcp_server_pipe.recv()
+    assert ['Received data:', b'data to be send'] in dialog_with_server
+    assert [b'data to read'] == received_data
+
+
+def test_connection_lost_is_notified_when_tcp_connection_closes(integration_tcp_server_and_pipe):
+    from moler.connection import ObservableConnection
+    from moler.io.asyncio.tcp import AsyncioTcp
+    (tcp_server, tcp_server_pipe) = integration_tcp_server_and_pipe
+    notified = []
+
+    connection = AsyncioTcp(moler_connection=ObservableConnection(), port=tcp_server.port, host=tcp_server.host)
+    connection.notify(callback=lambda io_conn: notified.append("made"), when="connection_made")
+    connection.notify(callback=lambda io_conn: notified.append("lost"), when="connection_lost")
+    connection.open()
+    connection.close()
+    assert ["made", "lost"] == notified
+
+
+def test_tcp_connection_is_fed_by_event_loop_shared_by_all_asyncio_connections(integration_tcp_server_and_pipe):
+    from moler.connection import ObservableConnection
+    from moler.io.asyncio.tcp import AsyncioTcp
+    from moler.io.asyncio.terminal import AsyncioTerminal
+    (tcp_server, tcp_server_pipe) = integration_tcp_server_and_pipe
+    feeding_threads = []
+
+    def on_data(data):
+        feeding_threads.append(threading.current_thread())
+
+    moler_conn = ObservableConnection()
+    moler_conn.subscribe(on_data)
+    tcp_connection = AsyncioTcp(moler_connection=moler_conn, port=tcp_server.port, host=tcp_server.host)
+    terminal_connection = AsyncioTerminal(moler_connection=ObservableConnection())
+    assert tcp_connection._loop_thread is terminal_connection._loop_thread
+    with tcp_connection:
+        time.sleep(0.1)  # otherwise we have race between server's pipe and from-client-connection
+        tcp_server_pipe.send(("send async msg", {'msg': b'data to read'}))
+        time.sleep(0.1)
+    assert [tcp_connection._loop_thread] == feeding_threads
+
+
+# --------------------------- resources ---------------------------
+
+
+@pytest.yield_fixture()
+def integration_tcp_server_and_pipe():
+    from moler.io.raw.tcpserverpiped import tcp_server_piped
+    with tcp_server_piped(use_stderr_logger=True) as server_and_pipe:
+        (server, svr_ctrl_pipe) = server_and_pipe
+        yield (server, svr_ctrl_pipe)
@@ -246,6 +246,36 @@ def test_can_send_data_into_ext_io_from_moler_connection(memory_connection_witho
         assert b'command to be echoed' == received_data
 
 
+def test_can_read_data_in_portions_spanning_many_injections(memory_connection_without_decoder):
+    connection = memory_connection_without_decoder
+    connection._inject(b"abc")
+    connection._inject(b"defgh")
+    assert b"abcdefgh" == connection.buffer
+    assert b"ab" == connection.read(2)
+    assert b"cdef" == connection.read(4)
+    assert b"gh" == connection.read()
+    assert b"" == connection.read()
+
+
+def test_threaded_connection_delivers_injected_data_without_delay():
+    from moler.connection import ObservableConnection
+    from moler.io.raw.memory import ThreadedFifoBuffer
+    received_data = bytearray()
+
+    def receiver(data):
+        received_data.extend(data)
+
+    connection = ThreadedFifoBuffer(moler_connection=ObservableConnection())
+    connection.moler_connection.subscribe(receiver)
+    with connection:
+        start_time = time.time()
+        for _ in range(100):
+            connection.inject([b"msg\n"])
+        duration = time.time() - start_time
+    assert b"msg\n" * 100 == received_data
+    assert duration < 0.5
+
+
 # TODO: tests for error cases raising Exceptions - if any?
 # --------------------------- resources ---------------------------
 
@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+"""
+Testing reactor multiplexing external-IO connections
+
+- register/unregister
+- feeding connections from single thread
+- stop
+"""
+
+__author__ = 'Grzegorz Latuszek'
+__copyright__ = 'Copyright (C) 2018, Nokia'
+__email__ = 'grzegorz.latuszek@nokia.com'
+
+import socket
+import threading
+import time
+
+import pytest
+
+
+def test_reactor_calls_callback_when_registered_socket_is_readable(reactor):
+    readable = threading.Event()
+    reader, writer = socket.socketpair()
+    try:
+        reactor.register(reader, lambda: readable.set() or reader.recv(100))
+        writer.send(b'data')
+        assert readable.wait(timeout=1.0)
+    finally:
+        reactor.unregister(reader)
+        reader.close()
+        writer.close()
+
+
+def test_reactor_does_not_call_callback_of_unregistered_socket(reactor):
+    calls = []
+    reader, writer = socket.socketpair()
+    try:
+        reactor.register(reader, lambda: calls.append(reader.recv(100)))
+        reactor.unregister(reader)
+        writer.send(b'data')
+        time.sleep(0.1)
+        assert [] == calls
+    finally:
+        reader.close()
+        writer.close()
+
+
+def test_reactor_feeds_many_connections_from_single_thread(reactor):
+    feeding_threads = set()
+    fed = []
+    pairs = [socket.socketpair() for _ in range(10)]
+
+    def make_callback(reader):
+        def on_readable():
+            reader.recv(100)
+            feeding_threads.add(threading.current_thread())
+            fed.append(reader)
+        return on_readable
+
+    threads_before = threading.active_count()
+    try:
+        for reader, _ in pairs:
+            reactor.register(reader, make_callback(reader))
+        assert threading.active_count() == threads_before
+        for _, writer in pairs:
+            writer.send(b'data')
+        time.sleep(0.2)
+        assert len(pairs) == len(fed)
+        assert 1 == len(feeding_threads)
+    finally:
+        for reader, writer in pairs:
+            reactor.unregister(reader)
+            reader.close()
+            writer.close()
+
+
+def test_reactor_tcp_connection_forwards_data_into_moler_connection(reactor):
+    from moler.connection import ObservableConnection
+    from moler.io.raw.tcp import ReactorTcp
+    from moler.io.raw.tcpserverpiped import tcp_server_piped
+    received_data = []
+
+    def on_data(data):
+        received_data.append(data)
+
+    moler_conn = ObservableConnection()
+    moler_conn.subscribe(on_data)
+    with tcp_server_piped(use_stderr_logger=True) as (tcp_server, tcp_server_pipe):
+        with ReactorTcp(moler_connection=moler_conn, port=tcp_server.port, host=tcp_server.host, reactor=reactor):
+            moler_conn.send(data=b'data to be send')
+            time.sleep(0.1)  # otherwise we have race between server's pipe and from-client-connection
+            tcp_server_pipe.send(("send async msg", {'msg': b'data to read'}))
+            time.sleep(0.1)
+        tcp_server_pipe.send(("get history", {}))
+        dialog_with_server = tcp_server_pipe.recv()
+    assert ['Received data:', b'data to be send'] in dialog_with_server
+    assert [b'data to read'] == received_data
+
+
+def test_reactor_can_be_stopped():
+    from moler.io.raw.reactor import Reactor
+    reactor = Reactor()
+    reactor.stop()
+    assert not reactor._thread.is_alive()
+
+
+def test_stopped_reactor_refuses_registration_but_allows_unregistration():
+    import socket
+    from moler.exceptions import WrongUsage
+    from moler.io.raw.reactor import Reactor
+    reactor = Reactor()
+    reader, writer = socket.socketpair()
+    try:
+        reactor.register(reader, on_readable=lambda: None)
+        reactor.stop()
+        reactor.unregister(reader)
+        with pytest.raises(WrongUsage):
+            reactor.register(writer, on_readable=lambda: None)
+    finally:
+        reader.close()
+        writer.close()
+
+
+def test_reactor_failing_inside_its_thread_gets_stopped_and_refuses_pending_registration():
+    import socket
+    from moler.exceptions import WrongUsage
+    from moler.io.raw.reactor import Reactor
+    reactor = Reactor()
+
+    def broken_select(timeout=None):
+        time.sleep(0.2)  # registration gets queued meanwhile
+        raise OSError("selector broken")
+
+    reactor._selector.select = broken_select
+    reactor._wakeup()  # current select() returns, next one is broken
+    reader, writer = socket.socketpair()
+    try:
+        with pytest.raises(WrongUsage):
+            reactor.register(reader, on_readable=lambda: None)
+        assert reactor.is_stopped()
+        assert not reactor._thread.is_alive()
+        reactor.unregister(reader)
+    finally:
+        reader.close()
+        writer.close()
+
+
+def test_connection_opened_after_shared_reactor_was_stopped_uses_new_reactor():
+    from moler.connection import ObservableConnection
+    from moler.io.raw.reactor import get_reactor
+    from moler.io.raw.tcp import ReactorTcp
+    from moler.io.raw.tcpserverpiped import tcp_server_piped
+    received_data = []
+
+    def on_data(data):
+        received_data.append(data)
+
+    stopped_reactor = get_reactor()
+    stopped_reactor.stop()
+    moler_conn = ObservableConnection()
+    moler_conn.subscribe(on_data)
+    with tcp_server_piped(use_stderr_logger=True) as (tcp_server, tcp_server_pipe):
+        with ReactorTcp(moler_connection=moler_conn, port=tcp_server.port, host=tcp_server.host) as connection:
+            time.sleep(0.1)  # otherwise we have race between server's pipe and from-client-connection
+            tcp_server_pipe.send(("send async msg", {'msg': b'data to read'}))
+            time.sleep(0.1)
+    assert connection.reactor is not stopped_reactor
+    assert connection.reactor is get_reactor()
+    assert [b'data to read'] == received_data
+
+
+# --------------------------- resources ---------------------------
+
+
+@pytest.yield_fixture()
+def reactor():
+    from moler.io.raw.reactor import Reactor
+    reactor = Reactor()
+    yield reactor
+    reactor.stop()
@@ -79,6 +79,70 @@ def test_can_receive_data_from_connection(tcp_connection_class,
     assert b'data to read' == received_data
 
 
+def test_can_receive_data_bigger_than_receive_buffer_in_portions(tcp_connection_class,
+                                                                 integration_tcp_server_and_pipe):
+    (tcp_server, tcp_server_pipe) = integration_tcp_server_and_pipe
+
+    connection = tcp_connection_class(port=tcp_server.port, host=tcp_server.host, receive_buffer_size=4)
+    connection.open()
+    time.sleep(0.1)  # otherwise we have race between server's pipe and from-client-connection
+    tcp_server_pipe.send(("send async msg", {'msg': b'data to read'}))
+    time.sleep(0.1)
+    received_data = [connection.receive() for _ in range(3)]
+    connection.close()
+    assert [b'data', b' to ', b'read'] == received_data
+
+
+def test_can_set_socket_options_of_connection(tcp_connection_class,
+                                              integration_tcp_server_and_pipe):
+    import socket
+    (tcp_server, tcp_server_pipe) = integration_tcp_server_and_pipe
+
+    connection = tcp_connection_class(port=tcp_server.port, host=tcp_server.host,
+                                      tcp_nodelay=True, keepalive=True)
+    connection.open()
+    nodelay = connection.socket.getsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY)
+    keepalive = connection.socket.getsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE)
+    connection.close()
+    assert nodelay
+    assert keepalive
+
+
+def test_each_thread_sending_over_broken_connection_gets_error(tcp_connection_class,
+                                                               integration_tcp_server_and_pipe):
+    import socket
+    import threading
+    (tcp_server, tcp_server_pipe) = integration_tcp_server_and_pipe
+
+    class BrokenSocket(object):
+        def sendall(self, data):
+            time.sleep(0.05)  # let other threads wait for sending
+            raise socket.error("broken pipe")
+
+        def close(self):
+            pass
+
+    connection = tcp_connection_class(port=tcp_server.port, host=tcp_server.host)
+    connection.open()
+    connection.socket.close()
+    connection.socket = BrokenSocket()
+    errors = []
+
+    def send(data):
+        try:
+            connection.send(data=data)
+        except socket.error as err:
+            errors.append((data, err))
+
+    senders = [threading.Thread(target=send, args=(data,)) for data in (b'data1', b'data2', b'data3')]
+    for sender in senders:
+        sender.start()
+    for sender in senders:
+        sender.join()
+    connection.close()
+    assert [b'data1', b'data2', b'data3'] == sorted(data for data, err in errors)
+
+
 # TODO: tests for error cases raising Exceptions
 # --------------------------- resources ---------------------------
 
@@ -8,6 +8,7 @@ __copyright__ = 'Copyright (C) 2018, Nokia'
 __email__ = 'marcin.usielski@nokia.com, michal.ernst@nokia.com'
 
 import getpass
+import time
 
 import pytest
 
@@ -54,6 +55,31 @@ def test_terminal_whoami_ls(terminal_connection):
     assert getpass.getuser() == user2
 
 
+def test_terminal_close_wakes_up_blocked_pulling_thread():
+    from moler.connection import ObservableConnection
+    terminal = ThreadedTerminal(moler_connection=ObservableConnection())
+    terminal.open()
+    pulling_thread = terminal.pulling_thread
+    start_time = time.time()
+    terminal.close()
+    assert (time.time() - start_time) < 0.5
+    assert not pulling_thread.is_alive()
+
+
+def test_terminal_adapts_read_size_to_bulk_output():
+    from moler.connection import ObservableConnection
+    terminal = ThreadedTerminal(moler_connection=ObservableConnection(), read_buffer_size=4096,
+                                max_read_buffer_size=16384)
+
+    class BulkPty(object):
+        def read(self, size):
+            return "x" * size
+
+    terminal._terminal = BulkPty()
+    sizes = [len(terminal._read_terminal()) for _ in range(4)]
+    assert [4096, 8192, 16384, 16384] == sizes
+
+
 @pytest.yield_fixture()
 def terminal_connection():
     from moler.connection import ObservableConnection
@@ -72,16 +72,111 @@ def test_can_await_connection_observer_to_timeout(connection_observer,
         connection_observer_future.cancel()
 
 
+def test_event_driven_runner_returns_as_soon_as_connection_observer_is_done(observer_and_awaited_data):
+    from moler.runner import EventDrivenRunner
+    conn_observer, awaited_data = observer_and_awaited_data
+    with EventDrivenRunner() as runner:
+        connection_observer_future = runner.submit(conn_observer)
+        done_time = []
+
+        def inject_data():
+            time.sleep(0.1)
+            done_time.append(time.time())
+            conn_observer.connection.data_received(awaited_data)
+
+        ext_io = threading.Thread(target=inject_data)
+        ext_io.start()
+        try:
+            runner.wait_for(conn_observer, connection_observer_future, timeout=1.0)
+            awaken_time = time.time()
+            assert awaken_time - done_time[0] < 0.05  # no polling delay
+        finally:  # test cleanup
+            ext_io.join()
+
+
+def test_event_driven_runner_unsubscribes_done_connection_observer(observer_and_awaited_data):
+    from moler.runner import EventDrivenRunner
+    conn_observer, awaited_data = observer_and_awaited_data
+    moler_conn = conn_observer.connection
+    with EventDrivenRunner() as runner:
+        runner.submit(conn_observer)
+        assert len(moler_conn._observers) == 1
+        moler_conn.data_received(awaited_data)
+        assert conn_observer.done()
+        assert len(moler_conn._observers) == 0
+
+
+def test_not_awaited_connection_observer_timeouts_in_background(connection_observer,
+                                                                observer_runner):
+    from moler.exceptions import ConnectionObserverTimeout
+
+    connection_observer.timeout = 0.2
+    connection_observer_future = observer_runner.submit(connection_observer)
+    time.sleep(0.4)
+    assert connection_observer.done()
+    assert isinstance(connection_observer_future.exception(timeout=1.0), ConnectionObserverTimeout)
+
+
+def test_not_awaited_permanent_event_runs_past_its_timeout(observer_runner):
+    from moler.connection import ObservableConnection
+    from moler.events.unix.wait4prompt import Wait4prompt
+
+    event = Wait4prompt(connection=ObservableConnection(), prompt="host:~ #", till_occurs_times=-1)
+    event.timeout = 0.2
+    connection_observer_future = observer_runner.submit(event)
+    try:
+        time.sleep(0.4)
+        assert not event.done()
+        assert not connection_observer_future.done()
+    finally:  # test cleanup
+        event.cancel()
+
+
+def test_timeout_scheduler_honours_extended_timeout(connection_observer):
+    from moler.runner import TimeoutScheduler
+    timeouts = []
+    scheduler = TimeoutScheduler()
+    try:
+        connection_observer.timeout = 0.2
+        start_time = time.time()
+        scheduler.schedule(connection_observer, on_timeout=lambda observer, passed: timeouts.append(time.time()),
+                           start_time=start_time)
+        time.sleep(0.1)
+        connection_observer.timeout = 0.4  # like extend_timeout()
+        time.sleep(0.2)
+        assert [] == timeouts
+        time.sleep(0.2)
+        assert 1 == len(timeouts)
+        assert 0.4 <= timeouts[0] - start_time < 0.5
+    finally:
+        scheduler.shutdown()
+
+
+def test_timeout_scheduler_drops_done_connection_observer(connection_observer):
+    from moler.runner import TimeoutScheduler
+    timeouts = []
+    scheduler = TimeoutScheduler()
+    try:
+        connection_observer.timeout = 0.1
+        scheduler.schedule(connection_observer, on_timeout=lambda observer, passed: timeouts.append(observer))
+        connection_observer.set_result(True)
+        time.sleep(0.2)
+        assert [] == timeouts
+    finally:
+        scheduler.shutdown()
+
+
 # TODO: tests for error cases
 
 
 # --------------------------- resources ---------------------------
 
 
-@pytest.yield_fixture()
-def observer_runner():
-    from moler.runner import ThreadPoolExecutorRunner
-    runner = ThreadPoolExecutorRunner()
+@pytest.yield_fixture(params=['ThreadPoolExecutorRunner', 'EventDrivenRunner'])
+def observer_runner(request):
+    import moler.runner
+    runner_class = getattr(moler.runner, request.param)
+    runner = runner_class()
     yield runner
     runner.shutdown()
 
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""
+Testing of commands parsing benchmark.
+"""
+
+__author__ = 'Grzegorz Latuszek'
+__copyright__ = 'Copyright (C) 2018, Nokia'
+__email__ = 'grzegorz.latuszek@nokia.com'
+
+
+def test_command_output_is_replicated_between_command_echo_and_prompt():
+    from moler.util.cmds_benchmark import replicate_command_output
+    cmd_output = "host:~ # ls\nfile1 file2\nfile3\nhost:~ #"
+
+    replicated = replicate_command_output(cmd_output, command_string="ls", output_size=100)
+
+    assert len(replicated) >= 100
+    assert replicated.startswith("host:~ # ls\nfile1 file2\nfile3\nfile1 file2\n")
+    assert replicated.endswith("file3\nhost:~ #")
+
+
+def test_command_output_is_not_replicated_without_size():
+    from moler.util.cmds_benchmark import replicate_command_output
+    cmd_output = "host:~ # ls\nfile1 file2\nhost:~ #"
+
+    assert cmd_output == replicate_command_output(cmd_output, command_string="ls", output_size=0)
+
+
+def test_benchmark_measures_parsing_throughput_of_documented_commands():
+    from moler.util.cmds_benchmark import benchmark_commands_parsing
+
+    results = benchmark_commands_parsing("moler/cmd/at", output_size=10000, repeat=1)
+
+    measured = results['moler.cmd.at.get_imsi.AtCmdGetIMSI[_ver_execute]']
+    assert measured['bytes'] >= 10000
+    assert measured['lines'] > 1
+    assert measured['bytes_per_s'] > 0
+    assert measured['lines_per_s'] > 0
+
+
+def test_regression_is_found_by_comparing_with_stored_baseline(tmpdir):
+    from moler.util.cmds_benchmark import save_baseline, load_baseline, compare_with_baseline
+    baseline_file = str(tmpdir.join("baseline.json"))
+    save_baseline({'fast.Cmd': {'bytes_per_s': 1000.0}, 'slow.Cmd': {'bytes_per_s': 1000.0},
+                   'broken.Cmd': {'error': 'parsing failed'}}, baseline_file)
+    baseline = load_baseline(baseline_file)
+
+    regressions = compare_with_baseline({'fast.Cmd': {'bytes_per_s': 900.0}, 'slow.Cmd': {'bytes_per_s': 500.0}},
+                                        baseline, tolerance=0.2)
+
+    assert 'broken.Cmd' not in baseline
+    assert 1 == len(regressions)
+    assert regressions[0].startswith('slow.Cmd')
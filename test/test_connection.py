@@ -461,6 +461,246 @@ def test_garbage_collected_subscriber_is_not_notified():
     moler_conn.data_received("data")
     assert len(received_data) == 1
 
+
+def test_lines_observers_get_same_lines_split_once():
+    from moler.connection import ObservableConnection
+
+    moler_conn = ObservableConnection()
+    received_lines = []
+
+    def lines_observer1(lines):
+        received_lines.append(lines)
+
+    def lines_observer2(lines):
+        received_lines.append(lines)
+
+    moler_conn.subscribe_lines(lines_observer1)
+    moler_conn.subscribe_lines(lines_observer2)
+    moler_conn.data_received("line 1\nline")
+    moler_conn.data_received(" 2\n")
+
+    assert received_lines[0] is received_lines[1]
+    assert [("line 1", True, 0), ("line", False, 0)] == list(received_lines[0])
+    assert [("line 2", True, 4)] == list(received_lines[2])
+
+
+def test_lines_observers_are_grouped_by_new_line_chars():
+    from moler.connection import ObservableConnection
+
+    moler_conn = ObservableConnection()
+    received_lines = []
+
+    def lines_observer(lines):
+        received_lines.append(lines)
+
+    def only_lf_lines_observer(lines):
+        received_lines.append(lines)
+
+    moler_conn.subscribe_lines(lines_observer)
+    moler_conn.subscribe_lines(only_lf_lines_observer, new_line_chars=("\n",))
+    moler_conn.data_received("line 1\r")
+    assert [("line 1", True, 0)] == list(received_lines[0])
+    assert [("line 1\r", False, 0)] == list(received_lines[1])
+
+    moler_conn.unsubscribe_lines(lines_observer)
+    moler_conn.unsubscribe_lines(only_lf_lines_observer)
+    assert {} == moler_conn._lines_splitters
+
+
+def test_textual_event_takes_lines_split_by_connection_and_sees_only_not_consumed_part_of_line():
+    from moler.connection import ObservableConnection
+    from moler.events.textualevent import TextualEvent
+
+    class FragmentConsumingEvent(TextualEvent):
+        def __init__(self, connection):
+            super(FragmentConsumingEvent, self).__init__(connection=connection)
+            self.seen_lines = []
+
+        def on_new_line(self, line, is_full_line):
+            self.seen_lines.append((line, is_full_line))
+            if "abc" in line:
+                self._consume_already_parsed_fragment()
+
+    moler_conn = ObservableConnection()
+    moler_conn.data_received("pending ")  # not full line received before event started
+    event = FragmentConsumingEvent(connection=moler_conn)
+    event.subscribe_for_data()
+    moler_conn.data_received("12")
+    moler_conn.data_received("abc")
+    moler_conn.data_received("def\n")
+    event.unsubscribe_from_data()
+
+    assert event._lines_subscribed
+    assert [("12", False), ("12abc", False), ("def", True)] == event.seen_lines
+
+
+def test_incremental_decoder_joins_multibyte_character_split_between_chunks():
+    import codecs
+    from moler.connection import ObservableConnection
+    received_data = []
+
+    def on_data(data):
+        received_data.append(data)
+
+    moler_conn = ObservableConnection(decoder=codecs.getincrementaldecoder("utf-8")())
+    moler_conn.subscribe(on_data)
+    data = u"zażółć gęślą jaźń\n".encode("utf-8")
+    for idx in range(len(data)):
+        moler_conn.data_received(data[idx:idx + 1])
+    assert u"zażółć gęślą jaźń\n" == u"".join(received_data)
+    assert u"" not in received_data
+
+
+def test_bytes_observers_get_not_decoded_data_and_connection_does_not_decode_for_them_only():
+    from moler.connection import ObservableConnection
+    decoded_chunks = []
+    received_bytes = []
+    received_text = []
+
+    def decoder(data):
+        decoded_chunks.append(data)
+        return data.decode("utf-8")
+
+    def on_bytes(data):
+        received_bytes.append(data)
+
+    def on_text(data):
+        received_text.append(data)
+
+    moler_conn = ObservableConnection(decoder=decoder)
+    moler_conn.subscribe_bytes(on_bytes)
+    moler_conn.data_received(b"\xff\x00binary")
+    assert [b"\xff\x00binary"] == received_bytes
+    assert [] == decoded_chunks
+
+    moler_conn.subscribe(on_text)
+    moler_conn.data_received(b"text")
+    assert [b"\xff\x00binary", b"text"] == received_bytes
+    assert [u"text"] == received_text
+    moler_conn.unsubscribe_bytes(on_bytes)
+    moler_conn.unsubscribe(on_text)
+    assert 0 == moler_conn._bytes_observers_count
+
+
+def test_coalescing_connection_dispatches_tiny_chunks_at_once_after_window():
+    import time
+    from moler.connection import ObservableConnection
+    received_data = []
+
+    def on_data(data):
+        received_data.append(data)
+
+    moler_conn = ObservableConnection()
+    moler_conn.set_coalescing(window=0.1)
+    moler_conn.subscribe(on_data)
+    for char in "line 1\nline 2\nli":
+        moler_conn.data_received(char)
+    assert [] == received_data
+    time.sleep(0.3)
+    assert ["line 1\nline 2\nli"] == received_data
+
+
+def test_coalescing_connection_dispatches_immediately_prompt_like_line_or_size_threshold():
+    from moler.connection import ObservableConnection
+    received_data = []
+
+    def on_data(data):
+        received_data.append(data)
+
+    moler_conn = ObservableConnection()
+    moler_conn.set_coalescing(window=10, max_size=8)
+    moler_conn.subscribe(on_data)
+    for chunk in [b"ls\n", b"file\n", b"ro", b"ot# "]:
+        moler_conn.data_received(chunk)
+    assert [b"ls\nfile\n", b"root# "] == received_data
+    moler_conn.data_received(b"output")
+    moler_conn.set_coalescing(window=None)
+    assert [b"ls\nfile\n", b"root# ", b"output"] == received_data
+
+
+def test_coalescing_windows_of_connections_end_independently_of_slow_observers():
+    import threading
+    import time
+    from moler.connection import ObservableConnection
+    fast_received = []
+    slow_observer_called = threading.Event()
+
+    def slow_observer(data):
+        slow_observer_called.set()
+        time.sleep(0.5)
+
+    def fast_observer(data):
+        fast_received.append((data, threading.current_thread().name))
+
+    slow_conn = ObservableConnection(name="slow")
+    fast_conn = ObservableConnection(name="fast")
+    for moler_conn, observer in ((slow_conn, slow_observer), (fast_conn, fast_observer)):
+        moler_conn.set_coalescing(window=0.05)
+        moler_conn.subscribe(observer)
+    slow_conn.data_received("output")
+    fast_conn.data_received("output")
+    assert slow_observer_called.wait(timeout=0.2)
+    time.sleep(0.1)
+    assert [("output", "moler-coalescing-fast")] == fast_received
+
+
+def test_dispatcher_decouples_external_io_thread_from_slow_observer():
+    import threading
+    import time
+    from moler.connection import ObservableConnection
+    received_data = []
+    delivering_threads = set()
+    proceed = threading.Event()
+
+    def slow_observer(data):
+        proceed.wait()
+        delivering_threads.add(threading.current_thread())
+        received_data.append(data)
+
+    moler_conn = ObservableConnection()
+    moler_conn.start_dispatcher()
+    try:
+        moler_conn.subscribe(slow_observer)
+        start_time = time.time()
+        for nb in range(5):
+            moler_conn.data_received("data {}\n".format(nb))
+        assert time.time() - start_time < 0.5  # not stalled by observer
+        proceed.set()
+        assert moler_conn.wait_for_dispatch(timeout=1.0)
+        assert ["data {}\n".format(nb) for nb in range(5)] == received_data
+        assert threading.current_thread() not in delivering_threads
+        stats = moler_conn.dispatcher_stats()
+        assert 1 == len(stats['observers'])
+        assert 5 == stats['observers'][0]['delivered']
+    finally:
+        moler_conn.stop_dispatcher()
+
+
+def test_dispatcher_drops_oldest_data_of_overflowed_observer_queue():
+    import threading
+    from moler.connection import ObservableConnection
+    received_data = []
+    proceed = threading.Event()
+
+    def slow_observer(data):
+        proceed.wait()
+        received_data.append(data)
+
+    moler_conn = ObservableConnection()
+    moler_conn.start_dispatcher(queue_size=2, overflow_policy="drop_oldest")
+    try:
+        moler_conn.subscribe(slow_observer)
+        moler_conn.data_received("first")
+        assert not moler_conn.wait_for_dispatch(timeout=0.1)  # first one is being delivered
+        for data in ["lost", "second", "third"]:
+            moler_conn.data_received(data)
+        proceed.set()
+        assert moler_conn.wait_for_dispatch(timeout=1.0)
+        assert ["first", "second", "third"] == received_data
+        assert 1 == moler_conn.dispatcher_stats()['observers'][0]['dropped']
+    finally:
+        moler_conn.stop_dispatcher()
+
 # --------------------------- resources ---------------------------
 
 
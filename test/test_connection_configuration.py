@@ -8,6 +8,8 @@ __copyright__ = 'Copyright (C) 2018, Nokia'
 __email__ = 'grzegorz.latuszek@nokia.com'
 
 import os
+import sys
+
 import pytest
 
 
@@ -28,6 +30,16 @@ def test_can_select_connection_variant_from_buildin_connections(connections_conf
     assert conn.__class__.__name__ == 'ThreadedTcp'
 
 
+@pytest.mark.skipif(sys.version_info < (3,), reason="asyncio connections require Python 3")
+def test_can_select_asyncio_connection_variant_from_buildin_connections(connections_config):
+    from moler.connection import get_connection
+
+    connections_config.set_default_variant(io_type='tcp', variant='asyncio')
+    conn = get_connection(io_type='tcp', host='localhost', port=2345)
+    assert conn.__module__ == 'moler.io.asyncio.tcp'
+    assert conn.__class__.__name__ == 'AsyncioTcp'
+
+
 def test_cannot_select_nonexisting_connection_variant(connections_config):
     """Non-existing means not registered inside ConnectionFactory"""
     from moler.connection import get_connection
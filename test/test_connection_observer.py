@@ -206,6 +206,46 @@ def test_connection_observer_is_cancelled_after_cancelling(do_nothing_connection
     assert connection_observer.cancelled()
 
 
+def test_connection_observer_calls_done_callbacks_when_it_becomes_done(do_nothing_connection_observer__for_major_base_class):
+    connection_observer = do_nothing_connection_observer__for_major_base_class
+    notified = []
+    connection_observer.add_done_callback(notified.append)
+    assert notified == []
+    connection_observer.set_result(14361)
+    assert notified == [connection_observer]
+    connection_observer.cancel()  # already done - no second notification
+    assert notified == [connection_observer]
+
+
+@pytest.mark.parametrize("make_done", [lambda observer: observer.set_result(14361),
+                                       lambda observer: observer.set_exception(IndexError()),
+                                       lambda observer: observer.cancel()])
+def test_each_way_of_becoming_done_notifies_done_callbacks(do_nothing_connection_observer__for_major_base_class,
+                                                           make_done):
+    connection_observer = do_nothing_connection_observer__for_major_base_class
+    notified = []
+    connection_observer.add_done_callback(notified.append)
+    make_done(connection_observer)
+    assert notified == [connection_observer]
+
+
+def test_done_callback_added_to_already_done_connection_observer_is_called_immediately(do_nothing_connection_observer__for_major_base_class):
+    connection_observer = do_nothing_connection_observer__for_major_base_class
+    connection_observer.set_result(14361)
+    notified = []
+    connection_observer.add_done_callback(notified.append)
+    assert notified == [connection_observer]
+
+
+def test_removed_done_callback_is_not_called(do_nothing_connection_observer__for_major_base_class):
+    connection_observer = do_nothing_connection_observer__for_major_base_class
+    notified = []
+    connection_observer.add_done_callback(notified.append)
+    connection_observer.remove_done_callback(notified.append)
+    connection_observer.cancel()
+    assert notified == []
+
+
 def test_cancel_returns_false_if_connection_observer_is_cancelled(do_nothing_connection_observer__for_major_base_class):
     connection_observer = do_nothing_connection_observer__for_major_base_class
     # We start feeding connection-observer with data coming from connection
@@ -31,6 +31,201 @@ def test_device_unix_can_return_cd_command(configure_net_1_connection):
     assert isinstance(ux.get_cmd(cmd_name='cd', path="/home/user/"), Cd)
 
 
+def test_device_packages_are_walked_once_for_all_devices_and_states(configure_net_1_connection, observers_registry):
+    from moler.device.unixlocal import UnixLocal
+    from mock import mock
+
+    with mock.patch.object(observers_registry, 'walk_package_observers',
+                           wraps=observers_registry.walk_package_observers) as walk_package:
+        UnixLocal.from_named_connection(connection_name='net_1')
+        UnixLocal.from_named_connection(connection_name='net_1')
+    walked_packages = [call_args[0][0] for call_args in walk_package.call_args_list]
+    assert sorted(walked_packages) == ['moler.cmd.unix', 'moler.events.unix']
+
+
+def test_device_observers_registry_may_be_read_from_index_file(observers_registry, tmpdir):
+    from moler.config import devices as dev_cfg
+    from mock import mock
+
+    dev_cfg.set_observers_index_file(str(tmpdir.join("observers_index.json")))
+    try:
+        events = observers_registry.get_observers_of_package('moler.events.unix')
+        observers_registry.clear()  # as in next process
+        with mock.patch.object(observers_registry, 'walk_package_observers') as walk_package:
+            assert events == observers_registry.get_observers_of_package('moler.events.unix')
+        assert not walk_package.called
+    finally:
+        dev_cfg.set_observers_index_file(None)
+    assert events['wait4prompt'] == 'moler.events.unix.wait4prompt.Wait4prompt'
+
+
+def test_device_resolves_class_of_command_once_per_state_and_name(configure_net_1_connection, observers_registry):
+    from moler.device.unixlocal import UnixLocal
+    from moler.cmd.unix.cd import Cd
+    from mock import mock
+
+    ux = UnixLocal.from_named_connection(connection_name='net_1')
+    with mock.patch('moler.device.textualdevice.load_class_from_class_fullname', return_value=Cd) as load_class:
+        ux.get_cmd(cmd_name='cd', path="/home/user/")
+        ux.get_cmd(cmd_name='cd', path="/home/other/")
+    load_class.assert_called_once_with('moler.cmd.unix.cd.Cd')
+
+
+def test_device_tracks_prompts_past_timeout_of_its_prompts_observers():
+    import time
+    from moler.device.unixlocal import UnixLocal
+    from moler.io.raw.memory import ThreadedFifoBuffer
+    from moler.connection import ObservableConnection
+
+    dev = UnixLocal(io_connection=ThreadedFifoBuffer(moler_connection=ObservableConnection()))
+    try:
+        for prompt_event in dev._prompts_events.values():
+            prompt_event.extend_timeout(0.1 - prompt_event.timeout)  # shortened timeout would be rescheduled
+        time.sleep(0.3)
+        assert dev._prompts_events
+        for prompt_event in dev._prompts_events.values():
+            assert prompt_event.running()
+    finally:
+        dev.io_connection.close()
+
+
+def test_devices_dont_share_state_tables_by_default(observers_registry):
+    from moler.device.unixlocal import UnixLocal
+    from moler.io.raw.memory import ThreadedFifoBuffer
+    from moler.connection import ObservableConnection
+
+    dev1 = UnixLocal(io_connection=ThreadedFifoBuffer(moler_connection=ObservableConnection()))
+    dev2 = UnixLocal(io_connection=ThreadedFifoBuffer(moler_connection=ObservableConnection()))
+    try:
+        dev2._add_transitions(transitions={'UNIX_LOCAL': {'OTHER_STATE': {'action': ['_close_connection']}}})
+        dev2._state_prompts.update({'OTHER_STATE': 'other#'})
+
+        assert 'OTHER_STATE' in dev2.states
+        assert 'OTHER_STATE' not in dev1.states
+        assert 'OTHER_STATE' not in dev1._state_prompts
+    finally:
+        for dev in (dev1, dev2):
+            dev.io_connection.close()
+
+
+def test_devices_of_same_class_and_configuration_share_state_tables(buffer_connection):
+    from moler.device.unixremote import UnixRemote
+    from moler.io.raw.memory import ThreadedFifoBuffer
+    from moler.connection import ObservableConnection
+
+    class SharingUnixRemote(UnixRemote):
+        share_state_tables = True
+
+    def unix_remote(remote_prompt):
+        hops = {'UNIX_LOCAL': {'UNIX_REMOTE': {'execute_command': 'ssh',
+                                               'command_params': {'host': 'remote_host', 'login': 'user',
+                                                                  'password': 'secret', 'expected_prompt': remote_prompt}}}}
+        return SharingUnixRemote(io_connection=ThreadedFifoBuffer(moler_connection=ObservableConnection()),
+                                 sm_params={'CONNECTION_HOPS': hops})
+
+    dev1 = unix_remote(remote_prompt='remote#')
+    dev2 = unix_remote(remote_prompt='remote#')
+    dev3 = unix_remote(remote_prompt='other_remote#')
+    assert dev1._cmdnames_available_in_state is dev2._cmdnames_available_in_state
+    assert dev1._state_prompts is dev2._state_prompts
+    assert dev1._state_prompts is not dev3._state_prompts
+    assert 'other_remote#' == dev3._state_prompts['UNIX_REMOTE']
+    assert dev1._cmdnames_available_in_state['UNIX_LOCAL'] is dev1._cmdnames_available_in_state['UNIX_REMOTE']
+    assert sorted(dev1.SM.get_triggers('UNIX_LOCAL')) == sorted(dev2.SM.get_triggers('UNIX_LOCAL'))
+    for dev in (dev1, dev2, dev3):
+        dev.io_connection.close()
+
+
+def test_device_cant_modify_state_tables_shared_with_other_devices(observers_registry):
+    from moler.device.unixlocal import UnixLocal
+    from moler.io.raw.memory import ThreadedFifoBuffer
+    from moler.connection import ObservableConnection
+
+    class SharingUnixLocal(UnixLocal):
+        share_state_tables = True
+
+    dev1 = SharingUnixLocal(io_connection=ThreadedFifoBuffer(moler_connection=ObservableConnection()))
+    dev2 = SharingUnixLocal(io_connection=ThreadedFifoBuffer(moler_connection=ObservableConnection()))
+    try:
+        with pytest.raises(TypeError):
+            dev2._state_prompts.update({'UNIX_LOCAL': 'changed#'})
+        with pytest.raises(TypeError):
+            dev2._cmdnames_available_in_state['UNIX_LOCAL']['ls'] = 'changed.Ls'
+        with pytest.raises(TypeError):
+            observers_registry.get_observers_of_package('moler.cmd.unix')['ls'] = 'changed.Ls'
+        with pytest.raises(AttributeError):
+            dev2.states.append('changed')
+        assert 'changed#' != dev1._state_prompts['UNIX_LOCAL']
+        assert 'moler.cmd.unix.ls.Ls' == dev1._cmdnames_available_in_state['UNIX_LOCAL']['ls']
+    finally:
+        for dev in (dev1, dev2):
+            dev.io_connection.close()
+
+
+def test_shared_state_tables_are_cleared_together_with_registry_and_devices_configuration(observers_registry):
+    from moler.config import devices as dev_cfg
+    from moler.device.unixlocal import UnixLocal
+    from moler.device.textualdevice import TextualDevice
+    from moler.io.raw.memory import ThreadedFifoBuffer
+    from moler.connection import ObservableConnection
+
+    class SharingUnixLocal(UnixLocal):
+        share_state_tables = True
+
+    for clear in (observers_registry.clear, dev_cfg.clear, lambda: dev_cfg.set_observers_index_file(None)):
+        dev = SharingUnixLocal(io_connection=ThreadedFifoBuffer(moler_connection=ObservableConnection()))
+        dev.io_connection.close()
+        assert TextualDevice._shared_state_tables
+        clear()
+        assert not TextualDevice._shared_state_tables
+
+
+def test_device_may_use_compact_state_machine_shared_by_devices_of_class(observers_registry):
+    from moler.device.unixlocal import UnixLocal
+    from moler.device.state_machine import CompactStateMachine
+    from moler.io.raw.memory import ThreadedFifoBuffer
+    from moler.connection import ObservableConnection
+
+    class CompactUnixLocal(UnixLocal):
+        state_machine_class = CompactStateMachine
+        share_state_tables = True
+
+    dev1 = CompactUnixLocal(io_connection=ThreadedFifoBuffer(moler_connection=ObservableConnection()))
+    dev2 = CompactUnixLocal(io_connection=ThreadedFifoBuffer(moler_connection=ObservableConnection()))
+    assert dev1.SM.table is dev2.SM.table
+    assert not hasattr(dev2.SM, '__dict__')
+    assert 'UNIX_LOCAL' == dev2.current_state
+    assert ['GOTO_NOT_CONNECTED'] == dev2.SM.get_triggers('UNIX_LOCAL')
+
+    dev2.goto_state('NOT_CONNECTED')
+    assert 'NOT_CONNECTED' == dev2.current_state
+    assert 'UNIX_LOCAL' == dev1.current_state
+    for dev in (dev1, dev2):
+        dev.io_connection.close()
+
+
+def test_compact_state_machine_queues_trigger_called_from_prepare_callback():
+    from moler.device.state_machine import CompactStateMachine
+    calls = []
+
+    class Model(object):
+        def go_b(self, *args, **kwargs):
+            calls.append(("go_b", self.state))
+            self.sm.trigger("GOTO_C")  # queued - runs after machine enters 'b'
+            calls.append("go_b done")
+
+        def go_c(self, *args, **kwargs):
+            calls.append(("go_c", self.state))
+
+    model = Model()
+    model.sm = CompactStateMachine(model=model, states=['b', 'c'], initial='a')
+    model.sm.add_transitions([{'trigger': 'GOTO_B', 'source': 'a', 'dest': 'b', 'prepare': ['go_b']},
+                              {'trigger': 'GOTO_C', 'source': 'b', 'dest': 'c', 'prepare': 'go_c'}])
+    model.sm.trigger("GOTO_B")
+    assert [("go_b", 'a'), "go_b done", ("go_c", 'b')] == calls
+    assert 'c' == model.state
+
+
 # --------------------------- resources ---------------------------
 
 
@@ -42,3 +237,11 @@ def configure_net_1_connection():
     conn_cfg.define_connection(name='net_1', io_type='memory')
     yield
     conn_cfg.clear()
+
+
+@pytest.yield_fixture
+def observers_registry():
+    from moler.device import observers_registry
+    observers_registry.clear()  # together with state tables keeping what was taken from registry
+    yield observers_registry
+    observers_registry.clear()
@@ -62,6 +62,194 @@ def test_event_is_running(do_nothing_command__for_major_base_class):
     wait4.start()  # start the event-future
 
 
+def test_line_events_of_connection_are_matched_by_single_lines_observer():
+    from moler.events.unix.wait4prompt import Wait4prompt
+    moler_conn = ObservableConnection()
+    occurred = []
+    events = []
+    for prompt in (r'^bash#', r'^root@host:~\$', r'^\(ssh\)#', r'(\w+)-\1>'):
+        event = Wait4prompt(connection=moler_conn, prompt=prompt, till_occurs_times=-1)
+        event.add_event_occurred_callback(callback=lambda prompt=prompt: occurred.append(prompt))
+        event.start()
+        events.append(event)
+
+    assert 1 == len(moler_conn._observers)
+    moler_conn.data_received("ls\nfile\nroot@host:~$ ")
+    moler_conn.data_received("\n(ssh)# \nab-ab> \nxbash# \n")
+    assert [r'^root@host:~\$', r'^\(ssh\)#', r'(\w+)-\1>'] == occurred
+    for event in events:
+        event.cancel()
+    assert 0 == len(moler_conn._observers)
+
+
+def test_line_event_matched_on_not_full_line_gets_only_continuation_of_that_line():
+    from moler.events.lineevent import LineEvent
+    moler_conn = ObservableConnection()
+    event = LineEvent(connection=moler_conn, till_occurs_times=-1)
+    event.detect_patterns = [r'Password:', r'Password:.+done']
+    event.start()
+
+    moler_conn.data_received("Password:")
+    moler_conn.data_received(" done\n")
+    moler_conn.data_received("Password: done\n")
+    assert ["Password:", "Password: done"] == [occurrence["line"] for occurrence in event._occurred]
+    event.cancel()
+
+
+def test_literal_prefix_of_line_pattern():
+    import re
+    from moler.events.linematcher import literal_prefix
+
+    assert ('moler_bash#', True) == literal_prefix(re.compile(r'^moler_bash#'))
+    assert ('root@host:~$', True) == literal_prefix(re.compile(r'^root@host:~\$\s*'))
+    assert ('Passwor', False) == literal_prefix(re.compile(r'Password?:'))
+    assert ('Passw', False) == literal_prefix(re.compile(r'Passw+ord'))
+    assert ('abc', False) == literal_prefix(re.compile(r'^abc', re.MULTILINE))
+    assert ('', False) == literal_prefix(re.compile(r'abc|def'))
+    assert ('', False) == literal_prefix(re.compile(r'abc', re.IGNORECASE))
+    assert ('', False) == literal_prefix(re.compile(r'\d+ packets'))
+
+
+def test_event_without_occurrences_limit_keeps_bounded_history():
+    from moler.events.lineevent import LineEvent
+    moler_conn = ObservableConnection()
+    event = LineEvent(connection=moler_conn, till_occurs_times=-1)
+    event.detect_pattern = r'^prompt>'
+    event.history_size = 3
+    event.start()
+
+    for nb in range(10):
+        moler_conn.data_received("prompt> {}\n".format(nb))
+    assert 10 == event.occurrences_count()
+    assert ["prompt> 7", "prompt> 8", "prompt> 9"] == [occurrence["line"] for occurrence in event.get_occurrences()]
+    event.cancel()
+
+
+def test_event_without_occurrences_limit_keeps_all_occurrences_by_default():
+    from moler.events.lineevent import LineEvent
+    moler_conn = ObservableConnection()
+    event = LineEvent(connection=moler_conn, till_occurs_times=-1)
+    event.detect_pattern = r'^prompt>'
+    event.start()
+
+    for nb in range(150):
+        moler_conn.data_received("prompt> {}\n".format(nb))
+    assert 150 == event.occurrences_count()
+    assert ["prompt> {}".format(nb) for nb in range(150)] == [occurrence["line"] for occurrence in event.get_occurrences()]
+    event.cancel()
+
+
+def test_event_with_occurrences_limit_returns_all_occurrences_as_result():
+    from moler.events.lineevent import LineEvent
+    moler_conn = ObservableConnection()
+    event = LineEvent(connection=moler_conn, till_occurs_times=3)
+    event.detect_pattern = r'^prompt>'
+    event.history_size = 1
+    event.start()
+
+    for nb in range(3):
+        moler_conn.data_received("prompt> {}\n".format(nb))
+    assert ["prompt> 0", "prompt> 1", "prompt> 2"] == [occurrence["line"] for occurrence in event.result()]
+
+
+def test_occurrences_history_is_taken_from_configuration():
+    from moler.events.lineevent import LineEvent
+    from moler.config import load_event_from_config, clear
+    load_event_from_config({'EVENTS': {'OCCURRENCES_HISTORY': {'size': 2, 'compact': True}}})
+    try:
+        moler_conn = ObservableConnection()
+        event = LineEvent(connection=moler_conn)
+        event.detect_pattern = r'^prompt>'
+        event.start()
+        moler_conn.data_received("prompt> 1\nprompt> 2\nprompt> 3\n")
+        assert ["prompt> 2", "prompt> 3"] == [occurrence.line for occurrence in event.get_occurrences()]
+        event.cancel()
+    finally:
+        clear()
+    assert LineEvent().history_size is None
+
+
+def test_event_callbacks_run_by_executor_in_order_of_occurrences():
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+    from moler.events.lineevent import LineEvent
+    calls = []
+    callbacks_threads = set()
+
+    def on_event():
+        callbacks_threads.add(threading.current_thread())
+        calls.append(event.occurrences_count())
+
+    moler_conn = ObservableConnection()
+    event = LineEvent(connection=moler_conn, till_occurs_times=-1)
+    event.detect_pattern = r'^prompt>'
+    event.add_event_occurred_callback(callback=on_event)
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        event.set_callback_executor(executor)
+        event.start()
+        for nb in range(20):
+            moler_conn.data_received("prompt> {}\n".format(nb))
+    event.cancel()
+    assert 20 == len(calls)
+    assert sorted(calls) == calls
+    assert threading.current_thread() not in callbacks_threads
+
+
+def test_event_callback_may_get_batches_of_occurrences():
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+    from moler.events.lineevent import LineEvent
+    batches = []
+    callback_running = threading.Event()
+    proceed = threading.Event()
+
+    def on_event(occurrences):
+        callback_running.set()
+        proceed.wait()
+        batches.append([occurrence["line"] for occurrence in occurrences])
+
+    moler_conn = ObservableConnection()
+    event = LineEvent(connection=moler_conn, till_occurs_times=-1)
+    event.detect_pattern = r'^prompt>'
+    event.add_event_occurred_callback(callback=on_event)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        event.set_callback_executor(executor, batch_occurrences=True)
+        event.start()
+        moler_conn.data_received("prompt> 1\n")
+        callback_running.wait(timeout=1.0)
+        moler_conn.data_received("prompt> 2\nprompt> 3\n")
+        proceed.set()
+    event.cancel()
+    assert [["prompt> 1"], ["prompt> 2", "prompt> 3"]] == batches
+
+
+def test_event_callback_runs_via_notify_and_its_exception_is_logged_inline_and_by_executor():
+    from concurrent.futures import ThreadPoolExecutor
+    from moler.events.lineevent import LineEvent
+    notified = []
+
+    class NotifyingLineEvent(LineEvent):
+        def notify(self):
+            notified.append(self.occurrences_count())
+            super(NotifyingLineEvent, self).notify()
+
+    def failing_callback():
+        raise Exception("callback failed")
+
+    for executor in (None, ThreadPoolExecutor(max_workers=1)):
+        moler_conn = ObservableConnection()
+        event = NotifyingLineEvent(connection=moler_conn, till_occurs_times=-1)
+        event.detect_pattern = r'^prompt>'
+        event.add_event_occurred_callback(callback=failing_callback)
+        event.set_callback_executor(executor)
+        event.start()
+        moler_conn.data_received("prompt> 1\nprompt> 2\n")  # exception of callback doesn't break data delivery
+        if executor:
+            executor.shutdown()
+        event.cancel()
+    assert [1, 2, 1, 2] == notified
+
+
 # --------------------------- resources ---------------------------
 
 
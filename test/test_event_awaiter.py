@@ -86,3 +86,40 @@ def test_events_false_any():
     assert 0 == len(done)
     assert 2 == len(not_done)
     EventAwaiter.cancel_all_events(events)
+
+
+def test_wait_for_all_returns_as_soon_as_all_events_are_done():
+    import threading
+    import time
+    connection = ObservableConnection()
+    events = list()
+    patterns = ("aaa", "bbb")
+    for pattern in patterns:
+        event = Wait4prompt(connection=connection, till_occurs_times=1, prompt=pattern)
+        event.start()
+        events.append(event)
+    feeder = threading.Timer(0.05, lambda: connection.data_received("aaa\nbbb\n"))
+    feeder.start()
+    start_time = time.time()
+    assert EventAwaiter.wait_for_all(timeout=5, events=events) is True
+    assert time.time() - start_time < 1
+    feeder.join()
+
+
+def test_wait_reports_events_in_order_of_becoming_done():
+    import threading
+    connection = ObservableConnection()
+    events = list()
+    patterns = ("aaa", "bbb", "ccc")
+    for pattern in patterns:
+        event = Wait4prompt(connection=connection, till_occurs_times=1, prompt=pattern)
+        event.start()
+        events.append(event)
+    connection.data_received("ccc\n")
+    feeder = threading.Timer(0.05, lambda: connection.data_received("aaa\n"))
+    feeder.start()
+    done, not_done = EventAwaiter.wait(timeout=0.3, events=events)
+    feeder.join()
+    assert [events[2], events[0]] == done
+    assert [events[1]] == not_done
+    EventAwaiter.cancel_all_events(events)
@@ -36,3 +36,45 @@ def test_converterhelper_m():
     assert 300000 == bytes_value
     assert 0.3 == value_in_units
     assert 'm' == unit
+
+
+def test_overrides_any_method_detects_method_overridden_in_derived_class():
+    from moler.helpers import overrides_any_method
+
+    class Base(object):
+        def parse(self):
+            pass
+
+        def split(self):
+            pass
+
+    class Derived(Base):
+        pass
+
+    class DerivedParser(Derived):
+        def parse(self):
+            pass
+
+    assert not overrides_any_method(Derived(), Base, ['parse', 'split'])
+    assert overrides_any_method(DerivedParser(), Base, ['parse', 'split'])
+    assert not overrides_any_method(DerivedParser(), Base, ['split'])
+
+
+def test_freeze_gives_read_only_copy_of_nested_data():
+    import copy
+    import pytest
+    from moler.helpers import freeze
+    data = {'prompts': {'UNIX_LOCAL': r'^moler_bash#'}, 'states': ['NOT_CONNECTED', 'UNIX_LOCAL']}
+
+    frozen = freeze(data)
+    data['prompts']['UNIX_LOCAL'] = 'changed'
+
+    assert r'^moler_bash#' == frozen['prompts']['UNIX_LOCAL']
+    assert ('NOT_CONNECTED', 'UNIX_LOCAL') == frozen['states']
+    with pytest.raises(TypeError):
+        frozen['prompts']['UNIX_LOCAL'] = 'changed'
+    with pytest.raises(TypeError):
+        frozen.update({'states': []})
+    assert frozen == copy.deepcopy(frozen)
+    with pytest.raises(TypeError):
+        copy.copy(frozen)['prompts'] = {}
@@ -5,6 +5,7 @@ __copyright__ = 'Copyright (C) 2018, Nokia'
 __email__ = 'grzegorz.latuszek@nokia.com'
 
 import logging
+import logging.handlers
 import time
 import pytest
 
@@ -74,3 +75,54 @@ def test_multiline_formatter_puts_direction_info_into_direction_area():
                                      'created': logging_time, 'msecs': 823})
     output = formatter.format(log_rec)
     assert output == "01 19:36:09.823  |just log"
+
+
+def test_connection_skips_building_log_messages_of_disabled_levels():
+    from moler.connection import ObservableConnection
+    from moler.config.loggers import TRACE
+
+    moler_conn = ObservableConnection(logger_name="moler.test.skipping_connection")
+    moler_conn.logger.setLevel(logging.INFO)
+    assert moler_conn._is_log_enabled(logging.INFO)
+    assert not moler_conn._is_log_enabled(TRACE)
+    moler_conn.logger.setLevel(TRACE)  # directly via logging API
+    assert moler_conn._is_log_enabled(TRACE)
+
+
+@pytest.mark.skipif(not hasattr(logging.handlers, 'QueueHandler'), reason="no QueueHandler in Python 2")
+def test_async_logging_writes_logs_inside_background_thread(tmpdir):
+    import threading
+    import moler.config.loggers as logger_cfg
+
+    writing_threads = []
+    log_filename = str(tmpdir.join("async.log"))
+    logger = logging.getLogger("moler.test.async_logging")
+    logger.setLevel(logging.INFO)
+    logger_cfg.set_async_logging(active=True)
+    try:
+        file_handler = logger_cfg.setup_new_file_handler(logger_name=logger.name, log_level=logging.INFO,
+                                                         log_filename=log_filename,
+                                                         formatter=logging.Formatter(fmt="%(levelname)s|%(message)s"))
+        assert file_handler in logger.handlers
+        target_emit = file_handler.target_handler.emit
+
+        def emit(record):
+            writing_threads.append(threading.current_thread())
+            target_emit(record)
+
+        file_handler.target_handler.emit = emit
+        data = ["first"]
+        logger.info("%s", data)
+        data.append("modified after logging")
+        logger.debug("skipped")
+        logger.info("second")
+        logger.removeHandler(file_handler)
+        file_handler.close()  # closes file after writing records queued so far
+        logger_cfg.stop_async_log_writer()
+    finally:
+        logger_cfg.set_async_logging(active=False)
+    with open(log_filename) as log_file:
+        assert "INFO|['first']\nINFO|second\n" == log_file.read()
+    assert threading.current_thread() not in writing_threads
+    assert 2 == len(writing_threads)
+    assert file_handler.target_handler.stream is None
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+Testing possibilities to configure runners
+"""
+
+__author__ = 'Grzegorz Latuszek'
+__copyright__ = 'Copyright (C) 2018, Nokia'
+__email__ = 'grzegorz.latuszek@nokia.com'
+
+import pytest
+from moler.connection import ObservableConnection
+from moler.connection_observer import ConnectionObserver
+
+
+def test_connection_observers_share_single_runner():
+    moler_conn = ObservableConnection()
+    observer1 = DoNothingObserver(connection=moler_conn)
+    observer2 = DoNothingObserver(connection=moler_conn)
+    assert observer1.runner is observer2.runner
+
+
+def test_default_shared_runner_is_taken_from_configuration(runners_config):
+    from moler.runner import ThreadPoolExecutorRunner, EventDrivenRunner
+    observer = DoNothingObserver(connection=ObservableConnection())
+    assert isinstance(observer.runner, ThreadPoolExecutorRunner)
+
+    runners_config.set_default_variant('event-driven')
+    observer = DoNothingObserver(connection=ObservableConnection())
+    assert isinstance(observer.runner, EventDrivenRunner)
+
+
+def test_runner_of_connection_overwrites_shared_runner():
+    from moler.runner import EventDrivenRunner, get_runner
+    conn_runner = EventDrivenRunner()
+    moler_conn = ObservableConnection(runner=conn_runner)
+    observer = DoNothingObserver(connection=moler_conn)
+    assert observer.runner is conn_runner
+    assert observer.runner is not get_runner()
+
+
+def test_runner_given_to_observer_overwrites_runner_of_connection():
+    from moler.runner import EventDrivenRunner
+    conn_runner = EventDrivenRunner()
+    observer_runner = EventDrivenRunner()
+    moler_conn = ObservableConnection(runner=conn_runner)
+    observer = DoNothingObserver(connection=moler_conn, runner=observer_runner)
+    assert observer.runner is observer_runner
+
+
+def test_cannot_select_nonexisting_runner_variant():
+    from moler.runner import get_runner
+    with pytest.raises(KeyError) as err:
+        get_runner(variant='yedi_magic')
+    assert "'yedi_magic' variant of runner is not registered" in str(err.value)
+
+
+def test_can_select_runner_variant_from_plugin_runners(runners_config):
+    from moler.runner import EventDrivenRunner, register_runner, get_runner
+
+    class DummyRunner(EventDrivenRunner):
+        pass
+
+    register_runner(variant='dummy', constructor=DummyRunner)
+    runners_config.set_default_variant('dummy')
+    assert isinstance(get_runner(), DummyRunner)
+    assert get_runner() is get_runner(variant='dummy')
+
+
+def test_can_select_runner_variant_loaded_from_config(moler_config, runners_config):
+    moler_config.load_runner_from_config({'RUNNERS': {'default_variant': 'event-driven'}})
+    assert runners_config.default_variant == 'event-driven'
+
+
+def test_devices_permanent_events_dont_occupy_workers_of_shared_thread_pool_runner():
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+    from moler.runner import ThreadPoolExecutorRunner
+    from moler.device.unixlocal import UnixLocal
+    from moler.io.raw.memory import ThreadedFifoBuffer
+    runner = ThreadPoolExecutorRunner(executor=ThreadPoolExecutor(max_workers=2))
+    devices = [UnixLocal(io_connection=ThreadedFifoBuffer(moler_connection=ObservableConnection(runner=runner)))
+               for _ in range(5)]  # more prompts observers than workers
+    try:
+        moler_conn = devices[0].io_connection.moler_connection
+        observer = DataAwaitingObserver(connection=moler_conn)
+        observer.start(timeout=1.0)
+        data_comes = threading.Timer(0.1, moler_conn.data_received, args=("data",))  # when observer is awaited
+        data_comes.start()
+        assert "data" == observer.await_done()
+    finally:
+        for device in devices:
+            device.io_connection.close()
+        runner.shutdown()
+
+
+# --------------------------- resources ---------------------------
+
+class DoNothingObserver(ConnectionObserver):
+    def data_received(self, data):
+        pass
+
+
+class DataAwaitingObserver(ConnectionObserver):
+    def data_received(self, data):
+        if not self.done():
+            self.set_result(data)
+
+
+@pytest.yield_fixture
+def moler_config():
+    import moler.config as moler_cfg
+    yield moler_cfg
+    # restore since tests may change configuration
+    moler_cfg.clear()
+
+
+@pytest.yield_fixture
+def runners_config():
+    import moler.config.runners as runner_cfg
+    yield runner_cfg
+    # restore since tests may change configuration
+    runner_cfg.clear()